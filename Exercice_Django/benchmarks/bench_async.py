@@ -0,0 +1,187 @@
+"""Débit sous charge concurrente : vues DRF sous WSGI, vues DRF et vues ``async`` sous uvicorn (ASGI).
+
+Chaque serveur tourne dans son propre processus sur une base SQLite commune
+(fichier temporaire) ; ``--concurrency`` clients enchaînent les requêtes pendant
+``--duration`` secondes. Le serveur WSGI est ``wsgiref`` avec un thread par
+requête (comme ``runserver``) ; uvicorn est optionnel (``pip install uvicorn``),
+sans lui seuls les scénarios WSGI sont mesurés.
+
+    python -m benchmarks.bench_async --size 100000 --concurrency 1 10 50
+"""
+import argparse
+import http.client
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django, seed, summary
+
+
+# OopCompanion:suppressRename
+
+
+# (server, URL prefix) : "" is the DRF viewset, "/async" the async view
+SCENARIOS = [("wsgi", ""), ("wsgi", "/async"), ("asgi", ""), ("asgi", "/async")]
+
+
+def serve(kind, database, port):
+    """Point d'entrée du processus serveur (``--serve``)."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = database
+    settings.DEBUG = False
+    django.setup()
+
+    if kind == "asgi":
+        import uvicorn
+        from django.core.asgi import get_asgi_application
+
+        uvicorn.run(get_asgi_application(), host="127.0.0.1", port=port, log_level="warning")
+        return
+
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    from django.core.wsgi import get_wsgi_application
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    make_server("127.0.0.1", port, get_wsgi_application(), server_class=ThreadingWSGIServer,
+                handler_class=QuietHandler).serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, database):
+    port = free_port()
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_async", "--serve", kind,
+                                "--database", database, "--port", str(port)])
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, port
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+def load(port, paths, concurrency, duration):
+    """``concurrency`` clients pendant ``duration`` secondes ; retourne (latences en ms, erreurs)."""
+    deadline = time.monotonic() + duration
+    samples, errors = [], []
+    lock = threading.Lock()
+
+    def client(worker):
+        local, failed, i = [], 0, worker
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except OSError:
+                failed += 1
+                continue
+            finally:
+                connection.close()
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            samples.extend(local)
+            errors.append(failed)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return samples, sum(errors)
+
+
+def make_paths(prefix):
+    from medical.models import Patient, Prescription
+
+    patient = Patient.objects.order_by("pk").values_list("pk", flat=True)[0]
+    prescription = Prescription.objects.order_by("pk").values_list("pk", flat=True)[0]
+    return [
+        f"{prefix}/Prescription?status=valide",
+        f"{prefix}/Prescription?active_on=2026-02-01&page_size=50",
+        f"{prefix}/Prescription/{prescription}",
+        f"{prefix}/Prescription?patient={patient}",
+    ]
+
+
+def run(size, concurrency_levels, duration):
+    if importlib.util.find_spec("uvicorn") is not None:
+        kinds = ["wsgi", "asgi"]
+    else:
+        print("uvicorn is not installed: ASGI scenarios skipped (pip install uvicorn)", file=sys.stderr)
+        kinds = ["wsgi"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "bench.sqlite3")
+        setup_django(test_database=database)
+        seed(n_patients=max(size // 10, 1), n_medications=200, n_prescriptions=size)
+
+        print(f"{'server':>6} {'view':>6} {'clients':>8} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'errors':>7}  (ms)")
+        for kind in kinds:
+            process, port = start_server(kind, database)
+            try:
+                for server, prefix in SCENARIOS:
+                    if server != kind:
+                        continue
+                    paths = make_paths(prefix)
+                    load(port, paths, 1, 1)  # warm-up
+                    for concurrency in concurrency_levels:
+                        samples, errors = load(port, paths, concurrency, duration)
+                        stats = summary(samples) if samples else {"p50": 0, "p95": 0, "p99": 0}
+                        print(f"{kind:>6} {prefix.strip('/') or 'drf':>6} {concurrency:>8} "
+                              f"{len(samples) / duration:>8.0f} {stats['p50']:>8.2f} {stats['p95']:>8.2f} "
+                              f"{stats['p99']:>8.2f} {errors:>7}")
+            finally:
+                process.terminate()
+                process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per measurement.")
+    parser.add_argument("--serve", choices=["wsgi", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.database, args.port)
+    else:
+        run(args.size, args.concurrency, args.duration)
+
+
+if __name__ == "__main__":
+    main()
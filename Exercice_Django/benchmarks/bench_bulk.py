@@ -0,0 +1,61 @@
+"""Débit (lignes/s) de ``POST /Prescription`` ligne à ligne contre ``POST /Prescription/bulk``.
+
+    python -m benchmarks.bench_bulk --rows 5000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import setup_django, seed
+
+
+# OopCompanion:suppressRename
+
+
+def make_rows(count, patient_ids, medication_ids, rng):
+    return [
+        {"patient": rng.choice(patient_ids), "medication": rng.choice(medication_ids),
+         "start_date": "2026-03-01", "end_date": "2026-03-15", "status": "valide", "comment": f"Bench {i}"}
+        for i in range(count)
+    ]
+
+
+def run(rows, single_rows):
+    from rest_framework.test import APIClient
+
+    from medical.models import Patient, Medication
+
+    seed(n_patients=1000, n_medications=100, n_prescriptions=0)
+    client = APIClient()
+    rng = random.Random(0)
+    patient_ids = list(Patient.objects.values_list("id", flat=True))
+    medication_ids = list(Medication.objects.values_list("id", flat=True))
+
+    payload = make_rows(single_rows, patient_ids, medication_ids, rng)
+    started = time.perf_counter()
+    for row in payload:
+        client.post("/Prescription", row, format="json")
+    single = single_rows / (time.perf_counter() - started)
+
+    payload = make_rows(rows, patient_ids, medication_ids, rng)
+    started = time.perf_counter()
+    response = client.post("/Prescription/bulk", payload, format="json")
+    bulk = rows / (time.perf_counter() - started)
+    assert not response.json()["errors"]
+
+    print(f"single-row POST : {single:>10.0f} rows/s ({single_rows} rows)")
+    print(f"bulk POST       : {bulk:>10.0f} rows/s ({rows} rows)")
+    print(f"speed-up        : {bulk / single:>10.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--single-rows", type=int, default=1000)
+    args = parser.parse_args()
+    setup_django()
+    run(args.rows, args.single_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Charge mixte lecture/écriture concurrente selon le profil de base de données.
+
+Pendant ``--duration`` secondes, ``--readers`` threads lisent des pages de
+``/Prescription`` pendant que ``--writers`` threads créent et modifient des
+prescriptions. Chaque profil tourne dans son propre processus (les réglages sont
+lus au démarrage) :
+
+- ``sqlite`` : journal par défaut (``DELETE``) ;
+- ``sqlite-wal`` : ``DJANGO_SQLITE_TUNING=1`` (WAL, ``synchronous=NORMAL``, mmap, busy_timeout) ;
+- ``postgresql`` / ``postgresql-pool`` : ``DJANGO_DB_ENGINE=postgresql`` avec connexions
+  persistantes ou pool ; les paramètres de connexion (``DJANGO_DB_NAME``, ``DJANGO_DB_HOST``...)
+  sont lus dans l'environnement et une base de test y est créée.
+
+    python -m benchmarks.bench_db --profiles sqlite sqlite-wal --readers 8 --writers 4
+    DJANGO_DB_HOST=localhost DJANGO_DB_USER=postgres python -m benchmarks.bench_db --profiles postgresql postgresql-pool
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import setup_django, seed, summary
+
+
+# OopCompanion:suppressRename
+
+
+PROFILES = {
+    "sqlite": {"DJANGO_DB_ENGINE": "sqlite", "DJANGO_SQLITE_TUNING": "0"},
+    "sqlite-wal": {"DJANGO_DB_ENGINE": "sqlite", "DJANGO_SQLITE_TUNING": "1"},
+    "postgresql": {"DJANGO_DB_ENGINE": "postgresql", "DJANGO_DB_POOL_MAX_SIZE": "0"},
+    "postgresql-pool": {"DJANGO_DB_ENGINE": "postgresql", "DJANGO_DB_POOL_MAX_SIZE": "20"},
+}
+
+
+def worker(kind, deadline, ids, results, seed_value):
+    """Boucle d'un thread ; ``results[kind]`` reçoit ses latences (ms) et son nombre d'erreurs."""
+    import random
+
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    client = APIClient(raise_request_exception=False)
+    rng = random.Random(seed_value)
+    samples, errors = [], 0
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            if kind == "read":
+                response = client.get("/Prescription", {"patient": rng.choice(ids["patients"])})
+                expected = 200
+            elif rng.random() < 0.5:
+                response = client.post("/Prescription", {
+                    "patient": rng.choice(ids["patients"]), "medication": rng.choice(ids["medications"]),
+                    "start_date": "2026-03-01", "end_date": "2026-03-15", "comment": "bench"}, format="json")
+                expected = 201
+            else:
+                response = client.patch(f"/Prescription/{rng.choice(ids['prescriptions'])}",
+                                        {"comment": f"bench {rng.random()}"}, format="json")
+                expected = 200
+            if response.status_code == expected:
+                samples.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+    finally:
+        connection.close()
+    with results["lock"]:
+        results[kind]["samples"].extend(samples)
+        results[kind]["errors"] += errors
+
+
+def run_profile(profile, size, readers, writers, duration):
+    """Exécuté dans le processus du profil : retourne les mesures par type de requête."""
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite = PROFILES[profile]["DJANGO_DB_ENGINE"] == "sqlite"
+        setup_django(test_database=os.path.join(directory, "bench.sqlite3") if sqlite else None)
+        seed(n_patients=max(size // 10, 1), n_medications=200, n_prescriptions=size)
+
+        from django.db import connection
+
+        from medical.models import Patient, Medication, Prescription
+
+        ids = {name: list(model.objects.values_list("pk", flat=True)[:1000])
+               for name, model in [("patients", Patient), ("medications", Medication),
+                                   ("prescriptions", Prescription)]}
+        connection.close()
+
+        results = {"lock": threading.Lock(), "read": {"samples": [], "errors": 0},
+                   "write": {"samples": [], "errors": 0}}
+        deadline = time.monotonic() + duration
+        threads = [threading.Thread(target=worker, args=(kind, deadline, ids, results, i))
+                   for i, kind in enumerate(["read"] * readers + ["write"] * writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    report = {}
+    for kind in ("read", "write"):
+        samples = results[kind]["samples"]
+        report[kind] = {**(summary(samples) if samples else {"p50": 0, "p95": 0, "p99": 0}),
+                        "throughput": len(samples) / duration, "errors": results[kind]["errors"]}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=["sqlite", "sqlite-wal"])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--run", choices=list(PROFILES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_profile(args.run, args.size, args.readers, args.writers, args.duration)))
+        return
+
+    print(f"{'profile':>16} {'kind':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}  (ms)")
+    for profile in args.profiles:
+        command = [sys.executable, "-m", "benchmarks.bench_db", "--run", profile, "--size", str(args.size),
+                   "--readers", str(args.readers), "--writers", str(args.writers), "--duration", str(args.duration)]
+        output = subprocess.run(command, env={**os.environ, **PROFILES[profile]}, check=True,
+                                capture_output=True, text=True).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        for kind, stats in report.items():
+            print(f"{profile:>16} {kind:>6} {stats['throughput']:>8.0f} {stats['p50']:>8.2f} {stats['p95']:>8.2f} "
+                  f"{stats['p99']:>8.2f} {stats['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Prescriptions actives à une date / sur une période : bornes ``start_date__lte`` + ``end_date__gte``
+contre ``active_on=`` / ``overlaps=`` (index par classe de durée).
+
+Chaque requête est mesurée sur le compte complet (``/Prescription/stats``), sur la
+première page de ``/Prescription`` et pour un seul patient.
+
+    python -m benchmarks.bench_intervals --rows 5000000
+"""
+import argparse
+
+from benchmarks.common import setup_django, seed, measure, summary
+
+
+# OopCompanion:suppressRename
+
+
+WINDOWS = [("2022-01-01", "2022-01-01"), ("2024-06-15", "2024-06-15"),
+           ("2024-06-01", "2024-06-30"), ("2023-01-01", "2023-12-31")]
+
+
+def run(sizes, repeat):
+    from rest_framework.test import APIClient
+
+    from medical.models import Prescription
+
+    client = APIClient()
+    print(f"{'rows':>10} {'window':>23} {'query':>8} {'bounds p50':>11} {'interval p50':>13} {'matches':>9}  (ms)")
+    for size in sizes:
+        seed(n_patients=max(size // 50, 1), n_medications=500, n_prescriptions=size)
+        patient = Prescription.objects.order_by("patient_id").values_list("patient_id", flat=True).first()
+        for start, end in WINDOWS:
+            bounds = {"start_date__lte": end, "end_date__gte": start}
+            interval = {"active_on": start} if start == end else {"overlaps": f"{start},{end}"}
+            matches = client.get("/Prescription/stats", interval).json()["results"][0]["count"]
+            for label, url, extra in [("count", "/Prescription/stats", {}), ("page 1", "/Prescription", {}),
+                                      ("patient", "/Prescription", {"patient": patient})]:
+                slow = summary(measure(lambda: client.get(url, {**bounds, **extra}), repeat))
+                fast = summary(measure(lambda: client.get(url, {**interval, **extra}), repeat))
+                print(f"{size:>10} {start + '..' + end:>23} {label:>8} {slow['p50']:>11.2f} {fast['p50']:>13.2f} "
+                      f"{matches:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[5_000_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    setup_django()
+    run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
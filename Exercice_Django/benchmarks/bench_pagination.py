@@ -0,0 +1,51 @@
+"""Latence d'une page de ``GET /Prescription`` selon la taille de la table.
+
+Compare la première page, une page profonde via curseur (keyset) et la même
+page profonde via ``OFFSET`` pour montrer que le coût du keyset reste plat.
+
+    python -m benchmarks.bench_pagination --sizes 10000 100000 1000000
+"""
+import argparse
+
+from benchmarks.common import setup_django, seed, measure, summary
+
+
+# OopCompanion:suppressRename
+
+
+def run(sizes, page_size, repeat):
+    from rest_framework.test import APIClient
+
+    from medical.models import Prescription
+    from medical.pagination import KeysetPagination
+
+    client = APIClient()
+    print(f"{'rows':>10} {'page 1 p50':>12} {'keyset deep p50':>16} {'offset deep p50':>16}  (ms)")
+    for size in sizes:
+        seed(n_patients=max(size // 10, 1), n_medications=200, n_prescriptions=size)
+        ordering = KeysetPagination.get_ordering(Prescription.objects.all())
+        deep_offset = max(size - 2 * page_size, 0)
+        position = list(Prescription.objects.order_by(*ordering).values_list(*ordering)[deep_offset])
+        cursor = KeysetPagination.make_cursor(position)
+
+        first = measure(lambda: client.get("/Prescription", {"page_size": page_size}), repeat)
+        keyset = measure(lambda: client.get("/Prescription", {"page_size": page_size, "cursor": cursor}), repeat)
+        offset = measure(
+            lambda: list(Prescription.objects.order_by(*ordering)[deep_offset:deep_offset + page_size]), repeat
+        )
+        print(f"{size:>10} {summary(first)['p50']:>12.2f} {summary(keyset)['p50']:>16.2f} "
+              f"{summary(offset)['p50']:>16.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    run(args.sizes, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
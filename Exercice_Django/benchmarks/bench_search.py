@@ -0,0 +1,52 @@
+"""Latence de la recherche de patients : ``?nom=`` (``icontains``) contre ``?q=`` (index de recherche).
+
+    python -m benchmarks.bench_search --patients 100000 300000
+"""
+import argparse
+
+from benchmarks.common import setup_django, seed, measure, summary
+
+
+# OopCompanion:suppressRename
+
+
+TERMS = ["mart", "lef", "nicolas", "zzz"]
+
+
+def run(sizes, repeat):
+    from rest_framework.test import APIClient
+
+    from medical.caching import response_cache
+    from medical.models import Patient
+
+    client = APIClient()
+    print(f"{'patients':>10} {'term':>10} {'icontains p50':>14} {'q= p50':>10}  (ms)")
+    for size in sizes:
+        seed(n_patients=size, n_medications=1, n_prescriptions=0)
+        for term in TERMS:
+            def bypass_cache():
+                # Every call must hit the database; the bump itself is not timed
+                response_cache.bump(Patient)
+
+            def icontains():
+                client.get("/Patient", {"nom": term})
+
+            def indexed():
+                client.get("/Patient", {"q": term})
+
+            slow = summary(measure(icontains, repeat, setup=bypass_cache))
+            fast = summary(measure(indexed, repeat, setup=bypass_cache))
+            print(f"{size:>10} {term:>10} {slow['p50']:>14.2f} {fast['p50']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, nargs="+", default=[100_000, 300_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    run(args.patients, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
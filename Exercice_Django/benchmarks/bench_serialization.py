@@ -0,0 +1,68 @@
+"""Débit de sérialisation des listes : ``ModelSerializer`` + ``JSONRenderer`` contre le chemin rapide.
+
+Mesure la sérialisation seule (page déjà lue) puis ``GET /Prescription`` de bout en bout.
+
+    python -m benchmarks.bench_serialization --rows 100000 --page-size 1000
+"""
+import argparse
+from unittest import mock
+
+from benchmarks.common import setup_django, seed, measure, summary
+
+
+# OopCompanion:suppressRename
+
+
+def run(rows, page_size, repeat):
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+
+    from medical import fastpath, renderers
+    from medical.models import Prescription
+    from medical.serializers import PrescriptionSerializer
+
+    seed(n_patients=max(rows // 10, 1), n_medications=200, n_prescriptions=rows)
+    client = APIClient()
+    representation = fastpath.compile_serializer(PrescriptionSerializer())
+    instances = list(Prescription.objects.all()[:page_size])
+    values = list(Prescription.objects.values(*representation.columns)[:page_size])
+
+    def drf():
+        JSONRenderer().render(PrescriptionSerializer(instances, many=True).data)
+
+    def fast_json():
+        with mock.patch.object(renderers, "orjson", None):
+            renderers.FastJSONRenderer().render(representation.to_representation(values))
+
+    def fast_orjson():
+        renderers.FastJSONRenderer().render(representation.to_representation(values))
+
+    def endpoint():
+        client.get("/Prescription", {"page_size": page_size})
+
+    def endpoint_drf():
+        with mock.patch.object(fastpath, "compile_serializer", return_value=None):
+            client.get("/Prescription", {"page_size": page_size})
+
+    print(f"{'case':>32} {'p50 (ms)':>10} {'rows/s':>12}")
+    for label, func in [("ModelSerializer + JSONRenderer", drf),
+                        ("fast path + json", fast_json),
+                        ("fast path + orjson" if renderers.orjson else "fast path (orjson missing)", fast_orjson),
+                        ("GET /Prescription, DRF path", endpoint_drf),
+                        ("GET /Prescription, fast path", endpoint)]:
+        p50 = summary(measure(func, repeat))["p50"]
+        print(f"{label:>32} {p50:>10.2f} {page_size / p50 * 1000:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    run(args.rows, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Outils partagés par les benchmarks (``python -m benchmarks.<module>``)."""
+import io
+import os
+import statistics
+import time
+
+
+# OopCompanion:suppressRename
+
+
+def setup_django(test_database=None):
+    """Configure Django et crée une base de test jetable (SQLite en mémoire par défaut).
+
+    ``test_database`` : fichier SQLite à utiliser à la place, pour la partager
+    avec des serveurs lancés dans d'autres processus.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    from django.conf import settings
+
+    if test_database:
+        settings.DATABASES["default"]["TEST"] = {"NAME": str(test_database)}
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def seed(n_patients, n_medications, n_prescriptions, rng_seed=0):
+    """Remplace les données par un jeu reproductible généré par ``seed_demo``."""
+    from django.core.management import call_command
+
+    call_command("seed_demo", flush=True, patients=n_patients, medications=n_medications,
+                 prescriptions=n_prescriptions, seed=rng_seed, stdout=io.StringIO())
+
+
+def measure(func, repeat=20, warmup=2, setup=None):
+    """Exécute ``func`` et retourne les durées en millisecondes ; ``setup`` précède chaque appel, hors mesure."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summary(samples):
+    return {
+        "p50": statistics.median(samples),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
@@ -0,0 +1,208 @@
+"""Suite de référence de l'API : latence (p50/p95/p99) et débit par jeu de données.
+
+Pour chaque taille (nombre de prescriptions, généré par ``seed_demo``), mesure
+liste, filtre, détail, création et mise à jour des trois ressources, via le
+client de test en mémoire et via un serveur HTTP local, puis écrit les
+résultats en JSON. Avec ``--baseline``, compare à un précédent fichier de
+résultats et sort en erreur si un cas ralentit de plus de ``--threshold``.
+
+    python -m benchmarks.suite --sizes 10000 100000 1000000 --output results.json
+    python -m benchmarks.suite --sizes 10000 --baseline results.json --threshold 0.25
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+from benchmarks.common import setup_django, seed, measure, summary
+
+
+# OopCompanion:suppressRename
+
+
+class InProcessTransport:
+    name = "client"
+
+    def __init__(self):
+        from rest_framework.test import APIClient
+
+        self.client = APIClient()
+
+    def request(self, method, path, body=None):
+        response = self.client.generic(method, path, json.dumps(body) if body is not None else "",
+                                       content_type="application/json")
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """Serveur WSGI local dans un thread (la base de test SQLite en mémoire est partagée entre connexions)."""
+
+    name = "server"
+
+    def __init__(self):
+        from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+        from django.core.wsgi import get_wsgi_application
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        self.server = make_server("127.0.0.1", 0, get_wsgi_application(), handler_class=QuietHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+TRANSPORTS = {"client": InProcessTransport, "server": HTTPTransport}
+
+
+def make_cases():
+    """``(nom, méthode, chemin, corps, statut attendu)`` ; les chemins et corps sont des fonctions de l'itération."""
+    from medical.models import Patient, Medication, Prescription
+
+    patient = Patient.objects.order_by("pk").values_list("pk", flat=True)[0]
+    medication = Medication.objects.order_by("pk").values_list("pk", flat=True)[0]
+    prescription = Prescription.objects.order_by("pk").values_list("pk", flat=True)[0]
+
+    def new_prescription(i):
+        return {"patient": patient, "medication": medication, "start_date": "2026-03-01",
+                "end_date": "2026-03-15", "status": "valide", "comment": f"Bench {i}"}
+
+    return [
+        ("patient-list", "GET", lambda i: "/Patient", None, 200),
+        ("patient-filter", "GET", lambda i: "/Patient?nom=mar", None, 200),
+        ("patient-detail", "GET", lambda i: f"/Patient/{patient}", None, 200),
+        ("medication-list", "GET", lambda i: "/Medication", None, 200),
+        ("medication-filter", "GET", lambda i: "/Medication?status=actif", None, 200),
+        ("medication-detail", "GET", lambda i: f"/Medication/{medication}", None, 200),
+        ("prescription-list", "GET", lambda i: "/Prescription", None, 200),
+        ("prescription-filter", "GET", lambda i: "/Prescription?status=valide&start_date__gte=2025-01-01",
+         None, 200),
+        ("prescription-detail", "GET", lambda i: f"/Prescription/{prescription}", None, 200),
+        ("prescription-create", "POST", lambda i: "/Prescription", new_prescription, 201),
+        ("prescription-update", "PATCH", lambda i: f"/Prescription/{prescription}",
+         lambda i: {"comment": f"Bench {i}"}, 200),
+    ]
+
+
+def run_case(transport, case, repeat, warmup, use_cache):
+    from medical.caching import response_cache
+    from medical.models import Patient, Medication, Prescription
+
+    name, method, path, body, expected = case
+    counter = iter(range(sys.maxsize))
+
+    def bypass_cache():
+        # Measure the database path, not a response cache hit; the bumps themselves are not timed
+        for model in (Patient, Medication, Prescription):
+            response_cache.bump(model)
+
+    def call():
+        i = next(counter)
+        status = transport.request(method, path(i), body(i) if body else None)
+        if status != expected:
+            raise RuntimeError(f"{name}: HTTP {status}, expected {expected}")
+
+    samples = measure(call, repeat=repeat, warmup=warmup, setup=None if use_cache else bypass_cache)
+    return {**summary(samples), "throughput": len(samples) / (sum(samples) / 1000)}
+
+
+def run(sizes, transports, repeat, warmup, use_cache):
+    results = []
+    print(f"{'rows':>9} {'transport':>9} {'case':>20} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8}  (ms)")
+    for size in sizes:
+        seed(n_patients=max(size // 10, 1), n_medications=200, n_prescriptions=size)
+        cases = make_cases()
+        for transport_name in transports:
+            transport = TRANSPORTS[transport_name]()
+            try:
+                for case in cases:
+                    stats = run_case(transport, case, repeat, warmup, use_cache)
+                    results.append({"size": size, "transport": transport_name, "case": case[0], **stats})
+                    print(f"{size:>9} {transport_name:>9} {case[0]:>20} {stats['p50']:>8.2f} {stats['p95']:>8.2f} "
+                          f"{stats['p99']:>8.2f} {stats['throughput']:>8.0f}")
+            finally:
+                transport.close()
+    return results
+
+
+def environment():
+    import django
+
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+    }
+
+
+def regressions(results, baseline, metric, threshold):
+    """Cas présents dans les deux fichiers dont ``metric`` a augmenté de plus de ``threshold`` (relatif)."""
+    previous = {(r["size"], r["transport"], r["case"]): r[metric] for r in baseline["results"]}
+    slower = []
+    for result in results:
+        before = previous.get((result["size"], result["transport"], result["case"]))
+        if before and (result[metric] - before) / before > threshold:
+            slower.append({**result, "baseline": before})
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--transports", nargs="+", choices=list(TRANSPORTS), default=list(TRANSPORTS))
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep the response cache (Patient/Medication reads become cache hits).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare against.")
+    parser.add_argument("--metric", choices=["p50", "p95", "p99"], default="p95")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative slow-down before failing (0.2 = +20%%).")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.sizes, args.transports, args.repeat, args.warmup, args.cache)
+    report = {"environment": environment(), "metric": args.metric, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            slower = regressions(results, json.load(baseline), args.metric, args.threshold)
+        for result in slower:
+            print(f"REGRESSION {result['size']} {result['transport']} {result['case']}: "
+                  f"{args.metric} {result['baseline']:.2f} -> {result[args.metric]:.2f} ms", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import os
 from pathlib import Path
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+
 
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -33,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so that its timings cover the whole stack; removes itself when PERF_INSTRUMENTATION is off
+    "medical.instrumentation.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,14 +68,62 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
-
-# Database: SQLite for simplicity
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Tests: clears the in-process caches between tests
+TEST_RUNNER = "medical.tests.runner.TestRunner"
+
+
+# Database: SQLite by default, PostgreSQL with DJANGO_DB_ENGINE=postgresql
+DB_ENGINE = os.environ.get("DJANGO_DB_ENGINE", "sqlite")
+DB_ENGINES = ("sqlite", "postgresql")
+if DB_ENGINE not in DB_ENGINES:
+    # A typo must not silently point the application at a local SQLite file
+    raise ImproperlyConfigured(f"Unknown DJANGO_DB_ENGINE {DB_ENGINE!r}: expected one of {', '.join(DB_ENGINES)}.")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DJANGO_DB_NAME", "medical"),
+            "USER": os.environ.get("DJANGO_DB_USER", ""),
+            "PASSWORD": os.environ.get("DJANGO_DB_PASSWORD", ""),
+            "HOST": os.environ.get("DJANGO_DB_HOST", ""),
+            "PORT": os.environ.get("DJANGO_DB_PORT", ""),
+            # Persistent connections, checked before reuse after an idle period or a server restart
+            "CONN_MAX_AGE": int(os.environ.get("DJANGO_DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
     }
-}
+    DB_POOL_MAX_SIZE = int(os.environ.get("DJANGO_DB_POOL_MAX_SIZE", "0"))
+    if DB_POOL_MAX_SIZE:
+        # psycopg 3 pool (Django >= 5.1, pip install "psycopg[pool]"): replaces persistent connections
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DJANGO_DB_POOL_MIN_SIZE", "2")),
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": float(os.environ.get("DJANGO_DB_POOL_TIMEOUT", "10")),
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DJANGO_DB_NAME", str(BASE_DIR / "db.sqlite3")),
+            "OPTIONS": {},
+        }
+    }
+
+# Single-node SQLite tuning, applied on every new connection (medical.signals): readers no longer wait for
+# the writer (WAL), commits skip the fsync of each transaction, and a locked database is retried for a while
+SQLITE_TUNING = DB_ENGINE == "sqlite" and os.environ.get("DJANGO_SQLITE_TUNING", "0") == "1"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.environ.get("DJANGO_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": int(os.environ.get("DJANGO_SQLITE_BUSY_TIMEOUT", "5000")),
+} if SQLITE_TUNING else {}
+if SQLITE_TUNING and django.VERSION >= (5, 1):
+    # Take the write lock at BEGIN: a deferred transaction upgrading to a write gets SQLITE_BUSY at once
+    DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
 
 
 # Password validation
@@ -94,6 +147,81 @@ STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
 
+# Cache: local memory by default (LRU culling once MAX_ENTRIES is reached); DJANGO_REDIS_URL (e.g.
+# "redis://localhost:6379/0", needs the redis package) shares it between workers and commands instead
+REDIS_URL = os.environ.get("DJANGO_REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "medical",
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.environ.get("DJANGO_CACHE_MAX_ENTRIES", "1000")),
+                "CULL_FREQUENCY": 10,
+            },
+        }
+    }
+
+# Versioned response cache of the read-only endpoints (medical.caching)
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("DJANGO_RESPONSE_CACHE_TIMEOUT", "300"))
+# Where the data versions live: "cache" (no SQL on a cached read, needs a cache shared by every process)
+# or "database" (one query per response, right even with a per-process cache)
+DATA_VERSIONS_STORE = os.environ.get("DJANGO_DATA_VERSIONS_STORE", "cache" if REDIS_URL else "database")
+if DATA_VERSIONS_STORE not in ("cache", "database"):
+    raise ImproperlyConfigured(
+        f"Unknown DJANGO_DATA_VERSIONS_STORE {DATA_VERSIONS_STORE!r}: expected one of cache, database."
+    )
+
+# Identical concurrent GET list requests share one computation (medical.coalescing); the result is
+# reused for COALESCE_TTL seconds (0: only while in flight)
+COALESCE_LIST_REQUESTS = os.environ.get("DJANGO_COALESCE_LIST_REQUESTS", "1") == "1"
+COALESCE_TTL = float(os.environ.get("DJANGO_COALESCE_TTL", "0.5"))
+
+# Cohort leaf results kept in memory by each process (medical.cohort.leaf_cache); 0 entries disables it
+COHORT_CACHE_MAX_ENTRIES = int(os.environ.get("DJANGO_COHORT_CACHE_MAX_ENTRIES", "256"))
+COHORT_CACHE_MAX_BYTES = int(os.environ.get("DJANGO_COHORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+# POST /<Resource>/batch_get: most ids accepted in one request (read by IN queries of 500)
+BATCH_GET_MAX_IDS = int(os.environ.get("DJANGO_BATCH_GET_MAX_IDS", "10000"))
+
+
+# GET /Prescription/changes (medical.changes): log entries older than this are purged and their cursors expire
+PRESCRIPTION_CHANGES_RETENTION_DAYS = int(os.environ.get("DJANGO_PRESCRIPTION_CHANGES_RETENTION_DAYS", "30"))
+# Entries younger than this are not served yet: with concurrent writers (PostgreSQL), a transaction still open
+# may commit an entry with a lower id than one already read
+PRESCRIPTION_CHANGES_SETTLE_SECONDS = float(os.environ.get(
+    "DJANGO_PRESCRIPTION_CHANGES_SETTLE_SECONDS", "2" if DB_ENGINE == "postgresql" else "0"))
+
+
+# Materialized monthly rollup behind GET /Prescription/stats (medical.stats)
+PRESCRIPTION_ROLLUP_ENABLED = os.environ.get("DJANGO_PRESCRIPTION_ROLLUP", "0") == "1"
+
+
+# Per-request SQL / serialization metrics: Server-Timing header and JSON lines on the "medical.perf" logger
+PERF_INSTRUMENTATION = os.environ.get("DJANGO_PERF_INSTRUMENTATION", "0") == "1"
+# Same SQL (parameters aside) run more often than this within one request is reported as N+1
+PERF_N_PLUS_ONE_THRESHOLD = int(os.environ.get("DJANGO_PERF_N_PLUS_ONE_THRESHOLD", "10"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "medical.perf": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -108,4 +236,12 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
         "rest_framework.filters.SearchFilter",
     ],
+    # JSONRenderer, with orjson for the fast list path when it is installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "medical.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    # Keyset pagination on Meta.ordering: every page costs the same as the first one
+    "DEFAULT_PAGINATION_CLASS": "medical.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.environ.get("DJANGO_PAGE_SIZE", "100")),
 }
@@ -0,0 +1,110 @@
+"""Lecture asynchrone (ASGI) des trois ressources : ``/async/<Ressource>`` et ``/async/<Ressource>/<id>``.
+
+Sous ASGI, une vue DRF (synchrone) occupe un thread du pool ``sync_to_async``
+pendant toute la requête. Ces vues Django ``async`` ne rendent la main qu'aux
+requêtes SQL, exécutées par l'ORM asynchrone (``aiterator()``, ``aget()``).
+Mêmes FilterSets, même pagination par curseur, même JSON que les vues DRF
+(lignes ``values()`` converties par :mod:`medical.fastpath`) ; ni cache de
+réponses, ni GET conditionnel, ni ``expand=``/``fields=``.
+"""
+from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .fastpath import compile_serializer
+from .filters import PatientFilter, MedicationFilter, PrescriptionFilter
+from .models import Patient, Medication, Prescription
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .search import RankedSearchMixin
+from .serializers import PatientSerializer, MedicationSerializer, PrescriptionSerializer
+
+
+# OopCompanion:suppressRename
+
+
+class AsyncReadView(View):
+    """Liste (``pk`` absent) ou détail d'une ressource, en lecture seule."""
+
+    queryset = None
+    serializer_class = None
+    filterset_class = None
+    pagination_class = KeysetPagination
+    renderer_class = FastJSONRenderer
+
+    async def get(self, request, pk=None):
+        # DRF request: query_params for the FilterSet and the paginator, as in the sync views
+        request = Request(request)
+        headers = {}
+        try:
+            representation = self.get_representation(request)
+            queryset = await self.filter_queryset(request, self.queryset.all())
+            if pk is None:
+                paginator = self.pagination_class()
+                page = await paginator.apaginate_values(queryset, representation.columns, request, view=self)
+                data = representation.to_representation(page)
+                link = paginator.get_link_header()
+                if link:
+                    headers["Link"] = link
+            else:
+                data = representation.to_representation([await self.get_row(queryset, representation, pk)])[0]
+        except (APIException, Http404) as exc:
+            return self.handle_exception(request, exc)
+        return self.render(data, headers=headers)
+
+    def get_representation(self, request):
+        representation = compile_serializer(self.serializer_class(context={"request": request, "view": self}))
+        if representation is None:
+            raise ImproperlyConfigured(f"{self.serializer_class.__name__} is not supported by the values() path.")
+        return representation
+
+    async def filter_queryset(self, request, queryset):
+        filterset = self.filterset_class(request.query_params, queryset=queryset, request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        if hasattr(filterset, "aprepare"):
+            # Queries a FilterSet runs while building qs are not allowed in async code
+            await filterset.aprepare()
+        return filterset.qs
+
+    async def get_row(self, queryset, representation, pk):
+        model = queryset.model
+        try:
+            return await queryset.values(*representation.columns).aget(pk=pk)
+        except model.DoesNotExist:
+            raise Http404(f"No {model._meta.object_name} matches the given query.")
+        except (TypeError, ValueError, DjangoValidationError):
+            # Malformed id: same bare 404 as rest_framework.generics.get_object_or_404
+            raise Http404
+
+    def handle_exception(self, request, exc):
+        """Même corps et même statut que le gestionnaire d'exceptions de DRF."""
+        response = api_settings.EXCEPTION_HANDLER(exc, {"view": self, "request": request})
+        headers = {name: value for name, value in response.items() if name.lower() != "content-type"}
+        return self.render(response.data, status=response.status_code, headers=headers)
+
+    def render(self, data, status=200, headers=None):
+        renderer = self.renderer_class()
+        return HttpResponse(renderer.render(data), status=status, headers=headers,
+                            content_type=renderer.media_type)
+
+
+class AsyncPatientView(RankedSearchMixin, AsyncReadView):
+    queryset = Patient.objects.all()
+    serializer_class = PatientSerializer
+    filterset_class = PatientFilter
+
+
+class AsyncMedicationView(RankedSearchMixin, AsyncReadView):
+    queryset = Medication.objects.all()
+    serializer_class = MedicationSerializer
+    filterset_class = MedicationFilter
+
+
+class AsyncPrescriptionView(AsyncReadView):
+    queryset = Prescription.objects.all()
+    serializer_class = PrescriptionSerializer
+    filterset_class = PrescriptionFilter
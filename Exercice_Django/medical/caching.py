@@ -0,0 +1,185 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from rest_framework.response import Response
+
+from .models import DataVersion
+
+
+# OopCompanion:suppressRename
+
+
+class ResponseCache:
+    """Cache de réponses versionné, adossé au framework de cache de Django.
+
+    La clé combine la ressource, l'action, la query string normalisée et le
+    numéro de version de chaque modèle dont dépend la réponse. Une écriture
+    sur un modèle incrémente sa version (voir :mod:`medical.signals`) : les
+    anciennes entrées ne sont plus jamais lues et sortent du cache par
+    éviction LRU ou expiration.
+
+    ``DATA_VERSIONS_STORE`` choisit où vivent les versions :
+
+    - ``"cache"`` : dans le cache lui-même, lues avec les entrées (aucune
+      requête SQL sur un ``HIT``) et incrémentées par ``cache.incr``. Le
+      cache doit être partagé (Redis) : avec un cache par processus,
+      l'écriture d'un autre worker ou d'une commande resterait invisible.
+      La base (:class:`~medical.models.DataVersion`) ne sert qu'à repartir
+      d'une version jamais donnée quand la clé a disparu du cache ;
+    - ``"database"`` (défaut sans Redis) : dans ``DataVersion``, une
+      requête par réponse et un ``UPDATE`` par écriture, mais juste même
+      avec ``LocMemCache``.
+    """
+
+    key_prefix = "medical:response:"
+    version_prefix = "medical:version:"
+    # Gap between two seeds of a version in the cache: increments in between never reach the next seed
+    version_seed_step = 1 << 32
+    # Responses only carry pagination links besides the body
+    kept_headers = ("Link",)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+    @property
+    def timeout(self):
+        return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300)
+
+    @property
+    def versions_in_cache(self):
+        return getattr(settings, "DATA_VERSIONS_STORE", "database") == "cache"
+
+    def versions(self, models, request=None):
+        """Versions de ``models``, lues une seule fois par requête HTTP si ``request`` est donné.
+
+        Validateurs, clé de cache et clé de regroupement d'une même réponse voient
+        ainsi le même état.
+        """
+        labels = tuple(model._meta.label_lower for model in models)
+        memo = getattr(request, "_data_versions", {})
+        if labels not in memo:
+            memo[labels] = self.read_versions(labels)
+            if request is not None:
+                request._data_versions = memo
+        return memo[labels]
+
+    def read_versions(self, labels):
+        if not self.versions_in_cache:
+            found = dict(DataVersion.objects.filter(model__in=labels).values_list("model", "version"))
+            return [found.get(label, 0) for label in labels]
+        keys = [self.version_prefix + label for label in labels]
+        found = self.cache.get_many(keys)
+        return [found[key] if key in found else self.seed_version(label) for label, key in zip(labels, keys)]
+
+    def seed_version(self, label):
+        """Remet la version de ``label`` dans le cache, au-dessus de toutes celles déjà données (SQL)."""
+        with transaction.atomic():
+            if not DataVersion.objects.filter(model=label).update(version=F("version") + self.version_seed_step):
+                # A time-based start never reuses a version seen before the table was emptied
+                DataVersion.objects.bulk_create(
+                    [DataVersion(model=label, version=time.time_ns())], ignore_conflicts=True
+                )
+            version = DataVersion.objects.filter(model=label).values_list("version", flat=True).get()
+        key = self.version_prefix + label
+        if not self.cache.add(key, version, timeout=None):
+            # Seeded meanwhile by another process: keep the shared value
+            version = self.cache.get(key, version)
+        return version
+
+    def bump(self, model):
+        """Incrémente la version de ``model`` ; à appeler une fois l'écriture validée."""
+        label = model._meta.label_lower
+        if self.versions_in_cache:
+            try:
+                self.cache.incr(self.version_prefix + label)
+            except ValueError:
+                # Evicted or never read: the new seed is already above every version handed out
+                self.seed_version(label)
+        elif not DataVersion.objects.filter(model=label).update(version=F("version") + 1):
+            DataVersion.objects.bulk_create([DataVersion(model=label, version=time.time_ns())], ignore_conflicts=True)
+
+    @staticmethod
+    def normalize(query_params, ignored=("format",)):
+        """Query string canonique : clés et valeurs triées, paramètres de rendu ignorés."""
+        return "&".join(
+            f"{name}={value}"
+            for name in sorted(query_params)
+            if name not in ignored
+            for value in sorted(query_params.getlist(name))
+        )
+
+    def key(self, resource, action, lookup, request, models):
+        versions = ".".join(str(v) for v in self.versions(models, request))
+        digest = hashlib.sha1(self.normalize(request.query_params).encode()).hexdigest()
+        return f"{self.key_prefix}{resource}:{action}:{lookup}:{versions}:{digest}"
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key, response):
+        headers = {name: response[name] for name in self.kept_headers if response.has_header(name)}
+        self.cache.set(key, (response.data, headers), timeout=self.timeout)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+response_cache = ResponseCache()
+
+
+class VersionedCacheMixin:
+    """Met en cache ``list`` et ``retrieve`` tant que les modèles de ``cache_models`` n'ont pas changé."""
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_models(self):
+        return self.cache_models or (self.get_queryset().model,)
+
+    def cached(self, handler, request, *args, **kwargs):
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field, "")
+        key = response_cache.key(self.basename, self.action, lookup, request, self.get_cache_models())
+        entry = response_cache.get(key)
+        if entry is not None:
+            data, headers = entry
+            response = Response(data, headers=headers)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, response)
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,173 @@
+"""Regroupement (*single-flight*) des listes identiques demandées en même temps.
+
+Des requêtes concurrentes avec les mêmes paramètres normalisés, le même format
+de rendu et les mêmes versions de données (:mod:`medical.caching`) partagent
+un seul calcul : la première exécute SQL et sérialisation, les autres attendent
+et renvoient les mêmes octets. Pendant ``COALESCE_TTL`` secondes après la fin
+du calcul, une requête identique reçoit encore ce résultat ; une écriture
+change les versions, donc la clé, et n'est jamais masquée.
+
+Le regroupement se fait entre threads d'un même processus.
+"""
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from .caching import response_cache
+from .instrumentation import current_metrics
+
+
+# OopCompanion:suppressRename
+
+
+LEADER = "leader"
+IN_FLIGHT = "in_flight"
+RECENT = "recent"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class SingleFlight:
+    """Un calcul en vol par clé ; son résultat est gardé ``ttl`` secondes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._recent = {}
+        self.leaders = 0
+        self.in_flight = 0
+        self.recent = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, "COALESCE_TTL", 0.5)
+
+    def do(self, key, compute):
+        """``(résultat, LEADER | IN_FLIGHT | RECENT)``.
+
+        ``compute()`` retourne ``(valeur, partagé)`` ; une valeur non partagée
+        (erreur, réponse non 200) n'est pas donnée aux requêtes en attente, qui
+        font alors leur propre calcul.
+        """
+        with self._lock:
+            now = time.monotonic()
+            recent = self._recent.get(key)
+            if recent is not None and recent[0] > now:
+                self.recent += 1
+                return recent[1], RECENT
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.result is not None:
+                with self._lock:
+                    self.in_flight += 1
+                return call.result, IN_FLIGHT
+            value, _ = compute()
+            with self._lock:
+                self.leaders += 1
+            return value, LEADER
+
+        value, shared = None, False
+        try:
+            value, shared = compute()
+        finally:
+            with self._lock:
+                self.leaders += 1
+                del self._calls[key]
+                now = time.monotonic()
+                self._recent = {k: entry for k, entry in self._recent.items() if entry[0] > now}
+                if shared:
+                    call.result = value
+                    if self.ttl > 0:
+                        self._recent[key] = (now + self.ttl, value)
+            call.done.set()
+        return value, LEADER
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+
+    def stats(self):
+        with self._lock:
+            coalesced = self.in_flight + self.recent
+            total = coalesced + self.leaders
+            return {
+                "computed": self.leaders,
+                "coalesced_in_flight": self.in_flight,
+                "coalesced_recent": self.recent,
+                "coalesced_ratio": round(coalesced / total, 4) if total else None,
+                "in_flight": len(self._calls),
+                "ttl": self.ttl,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.leaders = self.in_flight = self.recent = 0
+
+
+single_flight = SingleFlight()
+
+
+class SharedResponse(Response):
+    """Réponse dont le corps est déjà rendu : les requêtes regroupées renvoient les mêmes octets."""
+
+    def __init__(self, data, content, content_type, headers):
+        super().__init__(data, headers=headers)
+        self.shared_content = content
+        self.shared_content_type = content_type
+
+    @property
+    def rendered_content(self):
+        self["Content-Type"] = self.shared_content_type
+        return self.shared_content
+
+
+class CoalescedListMixin:
+    """Regroupe les ``list`` identiques concurrentes (voir :mod:`medical.coalescing`).
+
+    Les requêtes conditionnelles (``If-None-Match`` / ``If-Modified-Since``), dont
+    la réponse dépend du client, et l'API navigable ne sont pas regroupées.
+    """
+
+    # Headers of the list response handed out with the shared body
+    shared_headers = ("Link", "ETag")
+
+    def list(self, request, *args, **kwargs):
+        if (not getattr(settings, "COALESCE_LIST_REQUESTS", True)
+                or request.accepted_renderer.format == "api"
+                or "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META):
+            return super().list(request, *args, **kwargs)
+
+        get_models = getattr(self, "get_cache_models", None)
+        versions = response_cache.versions(get_models() if get_models else (self.get_queryset().model,), request)
+        key = (self.basename, request.accepted_media_type, response_cache.normalize(request.query_params, ()),
+               *versions)
+
+        def compute():
+            response = super(CoalescedListMixin, self).list(request, *args, **kwargs)
+            if type(response) is not Response or response.status_code != 200 or response.exception:
+                return response, False
+            renderer = request.accepted_renderer
+            content = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            content_type = f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else \
+                renderer.media_type
+            headers = {name: response[name] for name in self.shared_headers if response.has_header(name)}
+            return (response.data, content, content_type, headers), True
+
+        result, role = single_flight.do(key, compute)
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.coalesced = role
+        if isinstance(result, tuple):
+            return SharedResponse(*result)
+        return result
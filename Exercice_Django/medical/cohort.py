@@ -0,0 +1,366 @@
+"""Comptage de cohortes : critères booléens (ET / OU / NON) sur patients et prescriptions.
+
+Un critère est un arbre JSON ; chaque feuille reprend les filtres de
+``GET /Patient`` ou ``GET /Prescription`` :
+
+    {"and": [
+        {"prescription": {"medication": 12, "status": "valide", "overlaps": "2025-01-01,2025-12-31"}},
+        {"patient": {"birth_date__lte": "1959-12-31"}},
+        {"not": {"prescription": {"medication": 34}}}
+    ]}
+
+Chaque feuille est évaluée par une seule requête SQL qui renvoie des IDs de
+patients, rangés dans un :class:`PatientSet` (bitmap) ; les ensembles sont
+ensuite combinés en mémoire. Un ``not`` sous un ``and`` devient une
+différence ; ailleurs, il est pris par rapport à l'ensemble de tous les
+patients (une requête de plus).
+
+Les résultats des feuilles sont gardés dans :data:`leaf_cache` (LRU borné),
+sous une empreinte des filtres validés : affiner une cohorte ne réévalue que
+les feuilles nouvelles.
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.http import QueryDict
+
+from .caching import response_cache
+from .filters import PatientFilter, PrescriptionFilter
+from .models import Patient, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+MAX_LEAVES = 32
+MAX_DEPTH = 8
+
+
+class CriteriaError(ValueError):
+    """Critère invalide ; ``detail`` : ``{chemin: [messages]}``."""
+
+    def __init__(self, path, messages):
+        super().__init__(path)
+        self.detail = {path: messages if isinstance(messages, (list, dict)) else [messages]}
+
+
+class PatientSet:
+    """Ensemble d'IDs de patients : bit ``n`` d'un entier Python pour le patient ``n``.
+
+    Intersection, union et différence sont des opérations binaires sur l'entier
+    (en C), le cardinal un ``bit_count()``.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def from_ids(cls, ids):
+        buffer = bytearray()
+        for pk in ids:
+            index = pk >> 3
+            if index >= len(buffer):
+                buffer.extend(bytes(max(index + 1 - len(buffer), len(buffer))))
+            buffer[index] |= 1 << (pk & 7)
+        return cls(int.from_bytes(buffer, "little"))
+
+    def __and__(self, other):
+        return PatientSet(self.bits & other.bits)
+
+    def __or__(self, other):
+        return PatientSet(self.bits | other.bits)
+
+    def __sub__(self, other):
+        return PatientSet(self.bits & ~other.bits)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __eq__(self, other):
+        return isinstance(other, PatientSet) and self.bits == other.bits
+
+    def __iter__(self):
+        return self.ids()
+
+    def ids(self, after=None):
+        """IDs croissants, strictement supérieurs à ``after`` s'il est donné."""
+        start = 0 if after is None else after + 1
+        bits = self.bits >> start
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        for index, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                yield start + index * 8 + low.bit_length() - 1
+                byte ^= low
+
+
+class LeafCache:
+    """LRU des ensembles de patients par feuille, borné en entrées et en octets.
+
+    Chaque entrée retient les versions (:mod:`medical.caching`, en base) des
+    modèles lus par la feuille au moment de la requête : une écriture validée
+    sur l'un d'eux la rend obsolète, y compris depuis un autre processus. Dans
+    le processus de l'écriture, :meth:`invalidate` libère aussi tout de suite
+    les entrées concernées (voir :mod:`medical.signals`).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def max_entries(self):
+        return getattr(settings, "COHORT_CACHE_MAX_ENTRIES", 256)
+
+    @property
+    def max_bytes(self):
+        return getattr(settings, "COHORT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+    def get(self, key, versions):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] != versions:
+                self._drop(key)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, models, versions, patients):
+        size = sys.getsizeof(patients.bits)
+        if not self.max_entries or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = ({model._meta.label_lower for model in models}, versions, patients, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, model):
+        """Retire les entrées des feuilles qui lisent ``model``."""
+        label = model._meta.label_lower
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if label in entry[0]]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+
+    def _drop(self, key):
+        self.bytes -= self._entries.pop(key)[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+leaf_cache = LeafCache()
+
+
+# FilterSet, base queryset, patient id column, models whose writes can change the result. Deleting a
+# patient or a medication cascades to its prescriptions, which send their own post_delete.
+LEAVES = {
+    "patient": (PatientFilter, lambda: Patient.objects.order_by(), "id", (Patient,)),
+    "prescription": (PrescriptionFilter, lambda: Prescription.objects.order_by(), "patient_id", (Prescription,)),
+}
+
+
+def canonical(value):
+    """Valeur nettoyée d'un filtre → valeur JSON stable."""
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+    return str(value)
+
+
+class Leaf:
+    def __init__(self, path, resource, criteria):
+        self.path = path
+        self.resource = resource
+        self.criteria = criteria
+        filterset_class, queryset, self.column, self.models = LEAVES[resource]
+        data = QueryDict(mutable=True)
+        for name, value in criteria.items():
+            # Same syntax as the query string: lists become comma-separated values
+            data[name] = ",".join(map(str, value)) if isinstance(value, list) else str(value)
+        unknown = set(criteria).difference(filterset_class.base_filters)
+        if unknown:
+            raise CriteriaError(path, f"Unknown {resource} filter: {', '.join(sorted(unknown))}. "
+                                      f"Allowed: {', '.join(filterset_class.base_filters)}.")
+        self.filterset = filterset_class(data, queryset=queryset())
+        if isinstance(self.filterset, PrescriptionFilter):
+            # The whole matching set is read: always use the interval index
+            self.filterset.interval_probe = None
+        if not self.filterset.is_valid():
+            raise CriteriaError(path, self.filterset.errors)
+        # Equivalent spellings ("2025-1-1", " 12") clean to the same values, hence the same key
+        cleaned = self.filterset.form.cleaned_data
+        normalized = sorted((name, canonical(cleaned[name]))
+                            for name in criteria if cleaned.get(name) not in (None, ""))
+        self.key = hashlib.sha1(json.dumps([resource, normalized], separators=(",", ":")).encode()).hexdigest()
+
+    def leaves(self):
+        yield self
+
+    def queryset(self):
+        queryset = self.filterset.qs.values_list(self.column, flat=True)
+        return queryset if self.column == "id" else queryset.distinct()
+
+    def evaluate(self, run):
+        return run.leaf(self)
+
+
+class And:
+    def __init__(self, children):
+        self.children = children
+
+    def leaves(self):
+        for child in self.children:
+            yield from child.leaves()
+
+    def evaluate(self, run):
+        include = [child for child in self.children if not isinstance(child, Not)]
+        exclude = [child.child for child in self.children if isinstance(child, Not)]
+        result = None
+        for child in include:
+            result = child.evaluate(run) if result is None else result & child.evaluate(run)
+        if result is None:
+            result = run.universe()
+        for child in exclude:
+            result = result - child.evaluate(run)
+        return result
+
+
+class Or:
+    def __init__(self, children):
+        self.children = children
+
+    def leaves(self):
+        for child in self.children:
+            yield from child.leaves()
+
+    def evaluate(self, run):
+        result = PatientSet()
+        for child in self.children:
+            result = result | child.evaluate(run)
+        return result
+
+
+class Not:
+    def __init__(self, child):
+        self.child = child
+
+    def leaves(self):
+        return self.child.leaves()
+
+    def evaluate(self, run):
+        return run.universe() - self.child.evaluate(run)
+
+
+def parse(node, path="criteria", depth=0):
+    """Arbre de critères JSON → nœuds ; lève :class:`CriteriaError`."""
+    if depth > MAX_DEPTH:
+        raise CriteriaError(path, f"Criteria nested deeper than {MAX_DEPTH} levels.")
+    if not isinstance(node, dict) or len(node) != 1:
+        raise CriteriaError(path, 'Expected an object with a single key: "and", "or", "not", "patient" '
+                                  'or "prescription".')
+    (key, value), = node.items()
+    if key in ("and", "or"):
+        if not isinstance(value, list) or not value:
+            raise CriteriaError(f"{path}.{key}", "Expected a non-empty list of criteria.")
+        children = [parse(child, f"{path}.{key}[{index}]", depth + 1) for index, child in enumerate(value)]
+        return And(children) if key == "and" else Or(children)
+    if key == "not":
+        return Not(parse(value, f"{path}.not", depth + 1))
+    if key in LEAVES:
+        if not isinstance(value, dict):
+            raise CriteriaError(f"{path}.{key}", "Expected an object of filters.")
+        return Leaf(f"{path}.{key}", key, value)
+    raise CriteriaError(path, f"Unknown operator: {key}.")
+
+
+def build(criteria):
+    """Valide et compile un arbre de critères."""
+    tree = parse(criteria)
+    count = sum(1 for _ in tree.leaves())
+    if count > MAX_LEAVES:
+        raise CriteriaError("criteria", f"At most {MAX_LEAVES} criteria, got {count}.")
+    return tree
+
+
+class CohortRun:
+    """Évaluation d'un arbre : une requête par feuille absente du cache, durées et cardinaux de chacune."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.timings = []
+        self._universe = None
+        self.versions = {}
+
+    def evaluate(self):
+        started = time.perf_counter()
+        # Read once, before any leaf query: a write committed meanwhile makes the new entries stale
+        models = {Patient, *(model for leaf in self.tree.leaves() for model in leaf.models)}
+        self.versions = dict(zip(models, response_cache.versions(models)))
+        result = self.tree.evaluate(self)
+        self.total_ms = (time.perf_counter() - started) * 1000
+        return result
+
+    def leaf(self, leaf):
+        started = time.perf_counter()
+        versions = [self.versions[model] for model in leaf.models]
+        result = leaf_cache.get(leaf.key, versions)
+        cached = result is not None
+        if not cached:
+            result = PatientSet.from_ids(leaf.queryset().iterator(chunk_size=10000))
+            leaf_cache.set(leaf.key, leaf.models, versions, result)
+        self.timings.append({"path": leaf.path, "resource": leaf.resource, "count": len(result), "cached": cached,
+                             "ms": round((time.perf_counter() - started) * 1000, 3)})
+        return result
+
+    def universe(self):
+        if self._universe is None:
+            self._universe = self.leaf(Leaf("universe", "patient", {}))
+        return self._universe
@@ -0,0 +1,115 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .caching import response_cache
+
+
+# OopCompanion:suppressRename
+
+
+class ConditionalGetMixin:
+    """GET conditionnel (``If-None-Match`` / ``If-Modified-Since``).
+
+    - détail : ETag fort, liste : ETag faible (la représentation dépend de la pagination).
+    - avec ``last_modified_field`` : ETag de liste tiré des couples ``(id, updated_at)``
+      de la page que ``list()`` vient de lire (la colonne est ajoutée à sa requête) et
+      de ses liens de pagination ; il est comparé après le traitement, sans seconde
+      lecture : un ``304`` coûte la requête de la page, pas plus. Sans pagination,
+      ``max(updated_at)`` et nombre de lignes du queryset filtré. ``Last-Modified``
+      pour le détail seulement : une date de page ne voit pas les suppressions ;
+    - sans : validateurs tirés des versions du cache de réponses, vérifiés avant toute lecture.
+    """
+
+    last_modified_field = None
+
+    def list(self, request, *args, **kwargs):
+        if self.last_modified_field is None:
+            etag = f'W/"{self.fingerprint(request, *self.get_versions(request))}"'
+            return self.conditional(request, etag, None, super().list, *args, **kwargs)
+
+        # Filled by paginate_values() / paginate_queryset() while list() reads the page
+        self.page_keys = None
+        response = super().list(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        etag = f'W/"{self.fingerprint(request, *self.get_list_parts())}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response["ETag"] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_detail_validators(request, kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return self.conditional(request, etag, last_modified, super().retrieve, *args, **kwargs)
+
+    def conditional(self, request, etag, last_modified, handler, *args, **kwargs):
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            if etag:
+                response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def fingerprint(self, request, *parts):
+        """Condensé des validateurs, de la query string et du format de rendu."""
+        text = "|".join([*map(str, parts), response_cache.normalize(request.query_params),
+                         request.accepted_renderer.format or ""])
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def paginate_values(self, queryset, columns):
+        """Page lue par le chemin rapide, avec la clé primaire et ``last_modified_field`` en plus."""
+        if self.last_modified_field is None:
+            return super().paginate_values(queryset, columns)
+        pk = queryset.model._meta.pk.attname
+        extra = [name for name in (pk, self.last_modified_field) if name not in columns]
+        rows = super().paginate_values(queryset, [*columns, *extra])
+        self.page_keys = [(row[pk], row[self.last_modified_field]) for row in rows]
+        return rows
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        # A deferred column (?fields=) would cost one query per row: the summary is read instead
+        if (page is not None and self.last_modified_field is not None
+                and all(self.last_modified_field not in obj.get_deferred_fields() for obj in page)):
+            self.page_keys = [(obj.pk, getattr(obj, self.last_modified_field)) for obj in page]
+        return page
+
+    def get_list_parts(self):
+        """Éléments de l'ETag de liste, une fois la page lue."""
+        if self.page_keys is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            summary = queryset.order_by().aggregate(last=Max(self.last_modified_field), count=Count("pk"))
+            return [summary["count"], summary["last"]]
+        # Only the requested page matters, and its links: a row appended after a full last page adds a
+        # next link, not a row
+        get_links = getattr(self.paginator, "get_link_header", None)
+        return [*self.page_keys, get_links() if get_links else None]
+
+    def get_detail_validators(self, request, lookup):
+        if self.last_modified_field is None:
+            return f'"{self.fingerprint(request, lookup, *self.get_versions(request))}"', None
+
+        try:
+            last = self.get_queryset().filter(**{self.lookup_field: lookup}).values_list(
+                self.last_modified_field, flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            last = None
+        if last is None:
+            # Unknown object: let retrieve() answer 404
+            return None, None
+        return f'"{self.fingerprint(request, lookup, last.isoformat())}"', int(last.timestamp())
+
+    def get_versions(self, request):
+        # Same dependencies as the response cache when the view also uses VersionedCacheMixin
+        get_models = getattr(self, "get_cache_models", None)
+        return response_cache.versions(get_models() if get_models else (self.get_queryset().model,), request)
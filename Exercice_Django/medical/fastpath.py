@@ -0,0 +1,115 @@
+"""Chemin rapide des listes : représentation DRF calculée depuis des lignes ``values()``.
+
+Pour les serializers dont tous les champs sont simples (entiers, textes, choix,
+dates, clés étrangères en ID), chaque champ est compilé une fois en une colonne
+SQL et une fonction de conversion ; une page est ensuite produite sans instancier
+de modèle ni passer par ``Field.to_representation``. Le résultat est identique à
+celui du serializer. Dès qu'un champ sort de ces cas (serializer imbriqué,
+champ calculé, source composée...), :func:`compile_serializer` renvoie ``None``
+et la vue garde le chemin DRF habituel.
+"""
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+# OopCompanion:suppressRename
+
+
+class Rows(list):
+    """Liste de dicts produite par le chemin rapide : uniquement des ``str``, ``int`` et ``None``."""
+
+
+def _identity(value):
+    return value
+
+
+def _date_converter(field):
+    output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+    if output_format is None:
+        return _identity
+    if output_format.lower() == ISO_8601:
+        return lambda value: value if isinstance(value, str) else value.isoformat()
+    return lambda value: value if isinstance(value, str) else value.strftime(output_format)
+
+
+def _big_integer_converter(field):
+    return str if getattr(field, "coerce_to_string", api_settings.COERCE_BIGINT_TO_STRING) else int
+
+
+def _choice_converter(field):
+    choices = field.choice_strings_to_values
+    return lambda value: value if value == "" else choices.get(str(value), value)
+
+
+# Exact field classes only: a subclass may override to_representation()
+CONVERTERS = {
+    serializers.IntegerField: lambda field: int,
+    serializers.CharField: lambda field: str,
+    serializers.ChoiceField: _choice_converter,
+    serializers.DateField: _date_converter,
+    serializers.PrimaryKeyRelatedField: lambda field: _identity,
+}
+if hasattr(serializers, "BigIntegerField"):  # DRF >= 3.15 maps BigAutoField to it
+    CONVERTERS[serializers.BigIntegerField] = _big_integer_converter
+
+
+class ValuesRepresentation:
+    """Champs compilés d'un serializer : ``columns`` à lire et ``to_representation(rows)``."""
+
+    def __init__(self, names, columns, converters):
+        self.names = names
+        self.columns = columns
+        self.converters = converters
+
+    def to_representation(self, rows):
+        plan = list(zip(self.names, self.columns, self.converters))
+        return Rows(
+            {name: None if (value := row[column]) is None else convert(value) for name, column, convert in plan}
+            for row in rows
+        )
+
+
+def compile_serializer(serializer):
+    """:class:`ValuesRepresentation` équivalente à ``serializer`` (instance), ou ``None`` si non supporté."""
+    model = serializer.Meta.model
+    names, columns, converters = [], [], []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        factory = CONVERTERS.get(type(field))
+        if factory is None or field.source == "*" or "." in field.source:
+            return None
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return None
+            column = model._meta.get_field(field.source).attname
+        else:
+            column = field.source
+        names.append(name)
+        columns.append(column)
+        converters.append(factory(field))
+    return ValuesRepresentation(names, columns, converters)
+
+
+class FastListMixin:
+    """``list`` lit ``values()`` et sérialise via :class:`ValuesRepresentation` quand le serializer s'y prête."""
+
+    def list(self, request, *args, **kwargs):
+        representation = compile_serializer(self.get_serializer())
+        if representation is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, "paginate_values"):
+            page = self.paginate_values(queryset, representation.columns)
+            return paginator.get_paginated_response(representation.to_representation(page))
+        if paginator is not None:
+            # Unknown paginator: it expects a queryset of model instances
+            return super().list(request, *args, **kwargs)
+        return Response(representation.to_representation(queryset.values(*representation.columns)))
+
+    def paginate_values(self, queryset, columns):
+        """Page de dicts ``values()`` des colonnes ``columns`` (au moins)."""
+        return self.paginator.paginate_values(queryset, columns, self.request, view=self)
@@ -0,0 +1,158 @@
+"""Lecture des ressources FHIR R4 (export *bulk data* NDJSON) : Patient, Medication, MedicationRequest.
+
+Une ligne NDJSON devient un tuple prêt pour ``bulk_create``, sans accès à la
+base : les références (``Patient/<id>``, ``Medication/<id>``) restent des
+identifiants FHIR, résolus par la commande ``import_fhir``. Comme
+:mod:`medical.seeding`, le module n'importe pas les modèles pour rester
+importable dans les processus du pool.
+"""
+import json
+from datetime import date
+
+
+# OopCompanion:suppressRename
+
+
+PATIENT = "Patient"
+MEDICATION = "Medication"
+MEDICATION_REQUEST = "MedicationRequest"
+# Import order: a MedicationRequest refers to a Patient and a Medication
+RESOURCE_TYPES = (PATIENT, MEDICATION, MEDICATION_REQUEST)
+
+MEDICATION_STATUSES = {"active": "actif", "inactive": "suppr", "entered-in-error": "suppr"}
+REQUEST_STATUSES = {
+    "active": "valide",
+    "completed": "valide",
+    "draft": "en_attente",
+    "on-hold": "en_attente",
+    "unknown": "en_attente",
+    "cancelled": "suppr",
+    "stopped": "suppr",
+    "entered-in-error": "suppr",
+}
+
+
+class FHIRError(ValueError):
+    pass
+
+
+def parse_date(value, partial=False):
+    """Date (ou début de ``dateTime``) FHIR ; date partielle (``1950``, ``1950-07``) → ``None`` si ``partial``."""
+    if not value:
+        return None
+    if partial and len(value) < 10:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        raise FHIRError(f"Invalid date: {value!r}.")
+
+
+def reference_id(reference, resource_type):
+    """``{"reference": "Patient/123"}`` → ``"123"``."""
+    value = (reference or {}).get("reference") or ""
+    prefix, _, pk = value.rpartition("/")
+    if not pk or prefix.rsplit("/", 1)[-1] != resource_type:
+        raise FHIRError(f"Expected a reference to a {resource_type}, got {value!r}.")
+    return pk
+
+
+def coding(concept):
+    """``(code, libellé)`` d'un ``CodeableConcept`` : premier ``coding`` qui a un code."""
+    concept = concept or {}
+    for item in concept.get("coding") or []:
+        if item.get("code"):
+            return item["code"][:64], (concept.get("text") or item.get("display") or item["code"])[:255]
+    raise FHIRError("CodeableConcept without a coded value.")
+
+
+def patient_row(resource):
+    """``(fhir_id, last_name, first_name, birth_date)``."""
+    names = resource.get("name") or []
+    name = next((n for n in names if n.get("use") == "official"), names[0] if names else None)
+    if not name or not (name.get("family") or name.get("given")):
+        raise FHIRError("Patient without a name.")
+    return (resource["id"], (name.get("family") or "")[:150], " ".join(name.get("given") or [])[:150],
+            parse_date(resource.get("birthDate"), partial=True))
+
+
+def medication_row(resource):
+    """``(fhir_id, code, label, status)``."""
+    code, label = coding(resource.get("code"))
+    return resource["id"], code, label, MEDICATION_STATUSES.get(resource.get("status"), "actif")
+
+
+def medication_request_row(resource):
+    """``(fhir_id, patient, medication, status, start_date, end_date, comment)``.
+
+    ``medication`` est l'identifiant FHIR de la ressource Medication
+    (``medicationReference``) ou un couple ``(code, libellé)``
+    (``medicationCodeableConcept``).
+    """
+    patient = reference_id(resource.get("subject"), PATIENT)
+    if resource.get("medicationReference"):
+        medication = reference_id(resource["medicationReference"], MEDICATION)
+    else:
+        medication = coding(resource.get("medicationCodeableConcept"))
+
+    # Treatment period: dosage bounds, then dispense validity, then the authoring date
+    period = {}
+    for dosage in resource.get("dosageInstruction") or []:
+        period = ((dosage.get("timing") or {}).get("repeat") or {}).get("boundsPeriod") or {}
+        if period:
+            break
+    if not period:
+        period = (resource.get("dispenseRequest") or {}).get("validityPeriod") or {}
+    start = parse_date(period.get("start") or resource.get("authoredOn"))
+    if start is None:
+        raise FHIRError("MedicationRequest without a start date (boundsPeriod, validityPeriod or authoredOn).")
+    end = parse_date(period.get("end")) or start
+    if end < start:
+        raise FHIRError("End date cannot be before start date.")
+
+    notes = [note["text"] for note in resource.get("note") or [] if note.get("text")]
+    status = REQUEST_STATUSES.get(resource.get("status"), "en_attente")
+    return resource["id"], patient, medication, status, start, end, " ".join(notes)[:255]
+
+
+ROWS = {PATIENT: patient_row, MEDICATION: medication_row, MEDICATION_REQUEST: medication_request_row}
+
+
+def resource_type(line):
+    """Type de ressource d'une ligne NDJSON, ``None`` si elle n'en a pas."""
+    try:
+        return json.loads(line).get("resourceType")
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_chunk(offset, lines):
+    """Lignes brutes lues à partir de l'octet ``offset`` → ``(fin, lignes, erreurs, ignorées)``.
+
+    ``lignes`` : ``{type: [tuple, ...]}`` ; ``erreurs`` : ``[(offset de la ligne, message), ...]`` ;
+    ``ignorées`` : lignes vides ou d'un autre type de ressource.
+    """
+    rows = {name: [] for name in RESOURCE_TYPES}
+    errors = []
+    skipped = 0
+    for line in lines:
+        start, offset = offset, offset + len(line)
+        if not line.strip():
+            skipped += 1
+            continue
+        try:
+            resource = json.loads(line)
+            if not isinstance(resource, dict):
+                raise FHIRError("Expected a JSON object.")
+            to_row = ROWS.get(resource.get("resourceType"))
+            if to_row is None:
+                skipped += 1
+                continue
+            if not resource.get("id"):
+                raise FHIRError("Resource without an id.")
+            rows[resource["resourceType"]].append(to_row(resource))
+        except FHIRError as exc:
+            errors.append((start, str(exc)))
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            errors.append((start, f"Invalid resource: {exc!r}."))
+    return offset, rows, errors, skipped
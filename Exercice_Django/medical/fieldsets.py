@@ -0,0 +1,60 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+
+# OopCompanion:suppressRename
+
+
+class SparseFieldsMixin:
+    """``?fields=a,b`` : ne renvoie que ces champs et ne lit que leurs colonnes.
+
+    En lecture seulement (``GET``/``HEAD``). Le serializer est réduit aux champs
+    demandés ; le queryset est restreint par ``only()`` à leurs colonnes, à la
+    clé primaire et aux colonnes de tri (le curseur de pagination en a besoin).
+    Le chemin rapide des listes lit alors ``values()`` sur ces seules colonnes.
+    """
+
+    fields_query_param = "fields"
+
+    def get_sparse_fields(self):
+        """Champs demandés (dans l'ordre du serializer), ou ``None`` pour tous ; 400 si un nom est inconnu."""
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = None
+            raw = self.request.query_params.get(self.fields_query_param, "") if self.request else ""
+            requested = {name.strip() for name in raw.split(",") if name.strip()}
+            if requested and self.request.method in ("GET", "HEAD"):
+                serializer = self.get_serializer_class()(context=self.get_serializer_context())
+                readable = {name: field for name, field in serializer.fields.items() if not field.write_only}
+                unknown = requested.difference(readable)
+                if unknown:
+                    raise ValidationError({self.fields_query_param: [
+                        f"Unknown field: {', '.join(sorted(unknown))}. Allowed: {', '.join(readable)}."]})
+                self._sparse_fields = {name: readable[name].source for name in readable if name in requested}
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            target = getattr(serializer, "child", serializer)
+            for name in [name for name in target.fields if name not in fields]:
+                target.fields.pop(name)
+        return serializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        model = queryset.model
+        columns = {model._meta.pk.name}
+        columns.update(model._meta.get_field(name.lstrip("-")).name for name in model._meta.ordering)
+        for source in fields.values():
+            try:
+                field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            # Reverse relations and many-to-many have no column to select
+            if field.concrete and not field.many_to_many:
+                columns.add(field.name)
+        return queryset.only(*columns)
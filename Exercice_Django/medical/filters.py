@@ -1,28 +1,61 @@
 import django_filters
+from django import forms
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
 
+from .batch import chunk_size
+from .intervals import overlapping
 from .models import Patient, Medication, Prescription
+from .search import search
 
 
 # OopCompanion:suppressRename
 
 
+class IdListWidget(django_filters.widgets.CSVWidget):
+    """``id=1,2`` et aussi ``id=1&id=2``."""
+
+    def value_from_datadict(self, data, files, name):
+        if hasattr(data, "getlist") and len(data.getlist(name)) > 1:
+            return [value for item in data.getlist(name) for value in item.split(",")]
+        return super().value_from_datadict(data, files, name)
+
+
+class IdListFilter(django_filters.BaseInFilter, django_filters.Filter):
+    """``id=1,2,3`` : une requête ``IN`` ; 400 si une valeur n'est pas un entier ou s'il y en a trop.
+
+    Une liste vide (``id=`` ou ``id=,``) ne renvoie rien, jamais toute la table.
+    """
+
+    field_class = forms.IntegerField
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("field_name", "pk")
+        kwargs.setdefault("widget", IdListWidget)
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value is None:
+            return qs
+        ids = list(dict.fromkeys(v for v in value if v is not None))
+        limit = chunk_size(qs)
+        if len(ids) > limit:
+            raise ValidationError({"id": [f"At most {limit} ids per request, got {len(ids)}. "
+                                          f"Use POST batch_get for more."]})
+        return qs.filter(**{f"{self.field_name}__in": ids}) if ids else qs.none()
+
+
 class PatientFilter(django_filters.FilterSet):
     nom = django_filters.CharFilter(field_name="last_name", lookup_expr="icontains")
     prenom = django_filters.CharFilter(field_name="first_name", lookup_expr="icontains")
     date_naissance = django_filters.DateFilter(field_name="birth_date")
-    id = django_filters.CharFilter(method="filter_ids")
-
-    def filter_ids(self, queryset, name, value):
-        request = getattr(self, "request", None)
-        values = []
-        if request is not None:
-            repeated = request.GET.getlist("id")
-            for v in repeated:
-                values.extend(v.split(","))
-        if not values and value:
-            values = value.split(",")
-        ids = [int(v) for v in values if str(v).strip().isdigit()]
-        return queryset.filter(id__in=ids) if ids else queryset
+    birth_date__gte = django_filters.DateFilter(field_name="birth_date", lookup_expr="gte")
+    birth_date__lte = django_filters.DateFilter(field_name="birth_date", lookup_expr="lte")
+    id = IdListFilter()
+    q = django_filters.CharFilter(method="filter_search")
+
+    def filter_search(self, queryset, name, value):
+        return search(queryset, value, ["last_name", "first_name"])
 
     class Meta:
         model = Patient
@@ -30,16 +63,26 @@ class PatientFilter(django_filters.FilterSet):
 
 
 class MedicationFilter(django_filters.FilterSet):
+    id = IdListFilter()
     code = django_filters.CharFilter(field_name="code", lookup_expr="icontains")
     label = django_filters.CharFilter(field_name="label", lookup_expr="icontains")
     status = django_filters.CharFilter(field_name="status", lookup_expr="exact")
+    q = django_filters.CharFilter(method="filter_search")
+
+    def filter_search(self, queryset, name, value):
+        return search(queryset, value, ["code", "label"])
 
     class Meta:
         model = Medication
         fields = ["code", "label", "status"]
 
 
+class DateRangeFilter(django_filters.BaseRangeFilter, django_filters.DateFilter):
+    """``A,B`` : deux dates séparées par une virgule."""
+
+
 class PrescriptionFilter(django_filters.FilterSet):
+    id = IdListFilter()
     status = django_filters.CharFilter(field_name="status", lookup_expr="exact")
     patient = django_filters.NumberFilter(field_name="patient_id", lookup_expr="exact")
     medication = django_filters.NumberFilter(field_name="medication_id", lookup_expr="exact")
@@ -53,6 +96,63 @@ class PrescriptionFilter(django_filters.FilterSet):
     end_date__gte = django_filters.DateFilter(field_name="end_date", lookup_expr="gte")
     end_date__lte = django_filters.DateFilter(field_name="end_date", lookup_expr="lte")
 
+    active_on = django_filters.DateFilter(method="filter_active_on")
+    overlaps = DateRangeFilter(method="filter_overlaps")
+
+    # Beyond this many matches, a page ordered by (patient, id) is cheaper to read along the
+    # ordering index with plain date bounds than to collect and sort from the interval index.
+    # None always uses the interval index (counts, aggregates).
+    interval_probe = 10000
+    # (start, end) -> dense, probed once per request (see get_interval_plans()) or by aprepare()
+    interval_plans = None
+
+    def filter_active_on(self, queryset, name, value):
+        return self.filter_interval(queryset, value, value)
+
+    def filter_overlaps(self, queryset, name, value):
+        start, end = value
+        return self.filter_interval(queryset, start, end)
+
+    def filter_interval(self, queryset, start, end):
+        bounds = Q(start_date__lte=end, end_date__gte=start)
+        if self.form.cleaned_data.get("patient") is not None:
+            # A single patient's history is small: the (patient, start_date) index is enough
+            return queryset.filter(bounds)
+        if isinstance(self.interval_plans, list):
+            # aprepare() collects the queries to run; bounds select the same rows without a query
+            self.interval_plans.append((queryset, start, end))
+            return queryset.filter(bounds)
+        dense = False
+        if self.interval_probe is not None:
+            plans = self.get_interval_plans()
+            if (start, end) not in plans:
+                plans[start, end] = overlapping(queryset, start, end).order_by()[self.interval_probe:].exists()
+            dense = plans[start, end]
+        return queryset.filter(bounds) if dense else overlapping(queryset, start, end)
+
+    def get_interval_plans(self):
+        """Plans déjà sondés, gardés sur la requête HTTP (un filterset par appel à ``filter_queryset()``)."""
+        if self.interval_plans is None:
+            self.interval_plans = getattr(self.request, "_interval_plans", None)
+            if self.interval_plans is None:
+                self.interval_plans = {}
+                if self.request is not None:
+                    self.request._interval_plans = self.interval_plans
+        return self.interval_plans
+
+    async def aprepare(self):
+        """Exécute par l'ORM asynchrone les requêtes de :meth:`filter_interval` ; ``qs`` n'en fait plus."""
+        self.interval_plans = pending = []
+        try:
+            if self.is_valid():
+                self.filter_queryset(self.queryset.all())
+        finally:
+            self.interval_plans = {}
+        for queryset, start, end in pending:
+            if self.interval_probe is not None:
+                self.interval_plans[start, end] = await overlapping(
+                    queryset, start, end).order_by()[self.interval_probe:].aexists()
+
     class Meta:
         model = Prescription
         fields = ["patient", "medication",
@@ -0,0 +1,152 @@
+"""Mesures par requête : nombre de requêtes SQL, temps base de données, sérialisation, taille.
+
+Activées par ``PERF_INSTRUMENTATION``. Désactivé, le middleware se retire de la
+chaîne au démarrage (``MiddlewareNotUsed``) et :class:`InstrumentedViewMixin`
+ne fait qu'une lecture de ``ContextVar`` par appel.
+
+Les mesures sont renvoyées dans l'en-tête ``Server-Timing`` et journalisées en
+JSON sur le logger ``medical.perf``. Une même requête SQL (paramètres exclus)
+exécutée plus de ``PERF_N_PLUS_ONE_THRESHOLD`` fois est signalée comme N+1.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+# OopCompanion:suppressRename
+
+
+logger = logging.getLogger("medical.perf")
+
+_current = ContextVar("medical_request_metrics", default=None)
+
+# "IN (%s, %s, %s)" and bulk "VALUES (...), (...)" vary with the number of values, not the query shape
+_PLACEHOLDERS = re.compile(r"%s(?:\s*,\s*%s)+")
+_VALUES = re.compile(r"(\([^()]*\))(?:\s*,\s*\([^()]*\))+")
+
+
+def sql_template(sql):
+    return _VALUES.sub(r"\1", _PLACEHOLDERS.sub("%s, ...", sql))
+
+
+def current_metrics():
+    """Mesures de la requête HTTP en cours, ou ``None`` si l'instrumentation est désactivée."""
+    return _current.get()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.templates = Counter()
+        # Role of a coalesced list request (medical.coalescing): leader, in_flight or recent
+        self.coalesced = None
+        self._serializer_started = None
+        self._serializer_db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper`` : compte et chronomètre chaque requête SQL."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.templates[sql_template(sql)] += 1
+
+    def start_serializer(self):
+        if self._serializer_started is None:
+            self._serializer_started = time.perf_counter()
+            self._serializer_db_time = self.db_time
+
+    def stop_serializer(self):
+        if self._serializer_started is not None:
+            # Queries run while serializing (lazy relations, saves) count as database time
+            elapsed = time.perf_counter() - self._serializer_started
+            self.serializer_time += elapsed - (self.db_time - self._serializer_db_time)
+            self._serializer_started = None
+
+    def repeated_queries(self, threshold):
+        return [{"sql": sql, "count": count} for sql, count in self.templates.most_common() if count > threshold]
+
+
+class PerformanceMiddleware:
+    """Mesure chaque requête et ajoute ``Server-Timing`` à la réponse."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, "PERF_N_PLUS_ONE_THRESHOLD", 10)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.stop_serializer()
+        total = time.perf_counter() - metrics.started
+
+        # Streaming bodies are produced after this point: their size and queries are not measured
+        size = None if response.streaming else len(response.content)
+        repeated = metrics.repeated_queries(self.threshold)
+        timings = [
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f"serialize;dur={metrics.serializer_time * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ]
+        if size is not None:
+            timings.append(f'size;desc="{size} bytes"')
+        if metrics.coalesced is not None:
+            timings.append(f'coalesced;desc="{metrics.coalesced}"')
+        response["Server-Timing"] = ", ".join(timings)
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "serialize_ms": round(metrics.serializer_time * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            "size": size,
+        }
+        if metrics.coalesced is not None:
+            record["coalesced"] = metrics.coalesced
+        if repeated:
+            record["n_plus_one"] = repeated
+            logger.warning(json.dumps(record), extra={"perf": record})
+        else:
+            logger.info(json.dumps(record), extra={"perf": record})
+        return response
+
+
+class InstrumentedViewMixin:
+    """Chronomètre la sérialisation : du premier ``get_serializer()`` à la réponse, hors temps SQL."""
+
+    def get_serializer(self, *args, **kwargs):
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.start_serializer()
+        return super().get_serializer(*args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.stop_serializer()
+        return super().finalize_response(request, response, *args, **kwargs)
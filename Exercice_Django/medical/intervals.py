@@ -0,0 +1,50 @@
+"""Recherche des prescriptions qui chevauchent une période ``[start, end]``.
+
+Un intervalle ``[start_date, end_date]`` chevauche ``[start, end]`` si
+``start_date <= end`` et ``end_date >= start`` : deux bornes ouvertes, qu'un
+index B-tree ne sait pas parcourir efficacement. Chaque prescription est donc
+rangée dans une classe de durée (``span_class``, ``k`` tel que la durée en
+jours est inférieure à ``2**k``) ; dans une classe, ``start_date`` est aussi
+bornée par le bas (``start - 2**k + 1``) et la recherche devient, par classe,
+un parcours d'intervalle de l'index ``(span_class, start_date, end_date)``.
+
+Toutes les classes possibles sont parcourues (:data:`MAX_SPAN_CLASS`) : une
+classe vide ne coûte qu'une descente d'index, moins qu'une requête ``MAX()``
+par lecture pour connaître la plus grande classe présente.
+"""
+from datetime import date, timedelta
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+
+# OopCompanion:suppressRename
+
+
+def as_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def span_class(start_date, end_date):
+    """Classe de durée d'une prescription : nombre de bits de ``end_date - start_date`` en jours."""
+    return max((as_date(end_date) - as_date(start_date)).days, 0).bit_length()
+
+
+# Class of the longest representable interval, date.min to date.max (22)
+MAX_SPAN_CLASS = (date.max - date.min).days.bit_length()
+
+
+def lower_bound(start, span):
+    try:
+        return start - timedelta(days=(1 << span) - 1)
+    except OverflowError:
+        return date.min
+
+
+def overlapping(queryset, start, end):
+    """Prescriptions de ``queryset`` actives au moins un jour entre ``start`` et ``end`` (inclus)."""
+    return queryset.filter(reduce(or_, (
+        Q(span_class=span, start_date__gte=lower_bound(start, span), start_date__lte=end, end_date__gte=start)
+        for span in range(MAX_SPAN_CLASS + 1)
+    )))
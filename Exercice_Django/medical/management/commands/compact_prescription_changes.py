@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from medical.changes import compact, purge
+
+
+# OopCompanion:suppressRename
+
+
+class Command(BaseCommand):
+    help = ("Compact the prescription change log (keep the latest entry per prescription) and purge entries "
+            "older than PRESCRIPTION_CHANGES_RETENTION_DAYS")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--no-compact", action="store_true",
+                            help="Only purge expired entries, keep superseded ones.")
+
+    def handle(self, *args, **options):
+        purged = purge()
+        compacted = 0 if options["no_compact"] else compact()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired and {compacted} superseded change(s)."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, OutputWrapper
+from rest_framework.utils.encoders import JSONEncoder
+
+from medical.overlaps import KIND_CONCURRENT, KIND_DUPLICATE, all_overlaps
+
+
+# OopCompanion:suppressRename
+
+
+class Command(BaseCommand):
+    help = "Stream every patient's overlapping prescriptions as NDJSON (one line per flagged patient)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=None, help="NDJSON file to write (default: stdout).")
+        parser.add_argument("--kind", choices=[KIND_DUPLICATE, KIND_CONCURRENT], default=None,
+                            help="Only report this kind of overlap.")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Prescriptions fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        kind = options["kind"]
+        encoder = JSONEncoder(ensure_ascii=False)
+        output = open(options["output"], "w", encoding="utf-8") if options["output"] else None
+        out = OutputWrapper(output) if output else self.stdout
+        patients = pairs = 0
+        try:
+            for patient_id, overlaps in all_overlaps(chunk_size=max(options["chunk_size"], 1)):
+                if kind:
+                    overlaps = [overlap for overlap in overlaps if overlap["kind"] == kind]
+                    if not overlaps:
+                        continue
+                out.write(encoder.encode({"patient": patient_id, "overlaps": overlaps}))
+                patients += 1
+                pairs += len(overlaps)
+        finally:
+            if output:
+                output.close()
+        # stderr keeps stdout valid NDJSON
+        self.stderr.write(self.style.SUCCESS(f"{patients} patient(s) flagged, {pairs} overlapping pair(s)."))
@@ -0,0 +1,205 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from medical import fhir
+from medical.batch import batched, chunk_size as query_chunk_size, pool_map
+from medical.changes import record
+from medical.intervals import span_class
+from medical.models import Patient, Medication, Prescription, PrescriptionChange
+from medical.signals import invalidate_on_commit
+from medical.stats import mark_dirty
+
+
+# OopCompanion:suppressRename
+
+
+def read_chunks(handle, offset, size):
+    """``(offset, lignes)`` : lots de ``size`` lignes brutes lues à partir de l'octet ``offset``."""
+    lines = []
+    for line in handle:
+        lines.append(line)
+        if len(lines) >= size:
+            yield offset, lines
+            offset += sum(map(len, lines))
+            lines = []
+    if lines:
+        yield offset, lines
+
+
+def first_resource_type(path):
+    with open(path, "rb") as handle:
+        for line in handle:
+            if line.strip():
+                return fhir.resource_type(line)
+    return None
+
+
+def prescription_ids(fhir_ids):
+    """Identifiants FHIR → clés primaires des prescriptions existantes parmi ``fhir_ids``."""
+    queryset = Prescription.objects.all()
+    found = {}
+    for batch in batched(fhir_ids, query_chunk_size(queryset)):
+        found.update(queryset.filter(fhir_id__in=batch).values_list("fhir_id", "pk"))
+    return found
+
+
+class IdMaps:
+    """Identifiants FHIR → clés primaires, chargés en un parcours de chaque table puis complétés à l'import.
+
+    Une ressource déjà importée (reprise après interruption, fichier rejoué)
+    est reconnue et n'est pas recréée.
+    """
+
+    def __init__(self):
+        self.patients = dict(Patient.objects.exclude(fhir_id=None).values_list("fhir_id", "pk").iterator(10000))
+        self.medications = dict(Medication.objects.exclude(fhir_id=None).values_list("fhir_id", "pk"))
+        self.codes = dict(Medication.objects.values_list("code", "pk"))
+
+
+class Command(BaseCommand):
+    help = "Import FHIR R4 bulk-data NDJSON files (Patient, Medication, MedicationRequest)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+",
+                            help="NDJSON files; imported in dependency order (Patient, Medication, MedicationRequest).")
+        parser.add_argument("--chunk-size", type=int, default=10_000,
+                            help="Lines parsed and inserted per transaction.")
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Parse lines in a process pool of this size (0 = in-process).")
+        parser.add_argument("--checkpoint", default=None,
+                            help="JSON file of the byte offset reached in each file; an interrupted import resumes "
+                                 "from it.")
+
+    def handle(self, *args, **options):
+        chunk_size = max(options["chunk_size"], 1)
+        order = {name: index for index, name in enumerate(fhir.RESOURCE_TYPES)}
+        files = sorted((os.path.abspath(path) for path in options["files"]),
+                       key=lambda path: order.get(first_resource_type(path), len(order)))
+        self.checkpoint_path = options["checkpoint"]
+        self.checkpoint = {}
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as checkpoint:
+                self.checkpoint = json.load(checkpoint)
+
+        self.maps = IdMaps()
+        self.counts = {"patients": 0, "medications": 0, "prescriptions": 0, "errors": 0, "skipped": 0}
+        try:
+            for path in files:
+                self.import_file(path, chunk_size, options["workers"])
+        finally:
+            # bulk_create sends no signals
+            invalidate_on_commit(Patient, Medication, Prescription)
+
+        counts = self.counts
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts['patients']} patients, {counts['medications']} medications and "
+            f"{counts['prescriptions']} prescriptions ({counts['errors']} errors, {counts['skipped']} lines skipped)."
+        ))
+
+    def import_file(self, path, chunk_size, workers):
+        size = os.path.getsize(path)
+        offset = self.checkpoint.get(path, 0)
+        if offset > size:
+            raise CommandError(f"{path}: checkpoint offset {offset} is past the end of the file ({size} bytes).")
+        if offset == size:
+            self.stdout.write(f"{path}: already imported.")
+            return
+        if offset:
+            self.stdout.write(f"{path}: resuming at byte {offset}.")
+
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            for end, rows, errors, skipped in pool_map(fhir.parse_chunk, read_chunks(handle, offset, chunk_size),
+                                                       workers):
+                with transaction.atomic():
+                    self.write_patients(rows[fhir.PATIENT])
+                    self.write_medications(rows[fhir.MEDICATION])
+                    errors.extend(self.write_prescriptions(rows[fhir.MEDICATION_REQUEST], chunk_size))
+                # Only once committed: a chunk replayed after a crash is recognized by its FHIR ids
+                self.save_checkpoint(path, end)
+                self.counts["skipped"] += skipped
+                self.report(path, errors)
+
+    def write_patients(self, rows):
+        new = {}
+        for fhir_id, last_name, first_name, birth_date in rows:
+            if fhir_id not in self.maps.patients:
+                new[fhir_id] = Patient(fhir_id=fhir_id, last_name=last_name, first_name=first_name,
+                                       birth_date=birth_date)
+        created = Patient.objects.bulk_create(new.values())
+        self.maps.patients.update((patient.fhir_id, patient.pk) for patient in created)
+        self.counts["patients"] += len(created)
+
+    def write_medications(self, rows):
+        new = {}
+        for fhir_id, code, label, status in rows:
+            if fhir_id in self.maps.medications:
+                continue
+            if code in self.maps.codes:
+                # Already known under the same code (created through the API or another FHIR id)
+                self.maps.medications[fhir_id] = self.maps.codes[code]
+            elif code not in new:
+                new[code] = Medication(fhir_id=fhir_id, code=code, label=label, status=status)
+        self.create_medications(new.values())
+        for fhir_id, code, _, _ in rows:
+            self.maps.medications.setdefault(fhir_id, self.maps.codes[code])
+
+    def create_medications(self, medications):
+        created = Medication.objects.bulk_create(medications)
+        self.maps.codes.update((medication.code, medication.pk) for medication in created)
+        self.maps.medications.update((medication.fhir_id, medication.pk) for medication in created
+                                     if medication.fhir_id)
+        self.counts["medications"] += len(created)
+
+    def write_prescriptions(self, rows, chunk_size):
+        """Crée les prescriptions dont les références sont connues ; retourne les erreurs des autres."""
+        if not rows:
+            return []
+        # Medications only given by code (medicationCodeableConcept) are created on first use
+        concepts = {}
+        for row in rows:
+            if isinstance(row[2], tuple) and row[2][0] not in self.maps.codes:
+                code, label = row[2]
+                concepts.setdefault(code, Medication(code=code, label=label))
+        self.create_medications(concepts.values())
+
+        prescriptions, errors = [], []
+        for fhir_id, patient, medication, status, start_date, end_date, comment in rows:
+            patient_id = self.maps.patients.get(patient)
+            medication_id = (self.maps.codes[medication[0]] if isinstance(medication, tuple)
+                             else self.maps.medications.get(medication))
+            if patient_id is None or medication_id is None:
+                missing = f"Patient/{patient}" if patient_id is None else f"Medication/{medication}"
+                errors.append((None, f"MedicationRequest/{fhir_id}: unknown {missing}."))
+                continue
+            prescriptions.append(Prescription(
+                fhir_id=fhir_id, patient_id=patient_id, medication_id=medication_id, status=status,
+                start_date=start_date, end_date=end_date, comment=comment,
+                span_class=span_class(start_date, end_date)))
+        # Rows of a chunk replayed after a crash already exist: their fhir_id conflicts and is skipped.
+        # ignore_conflicts returns no primary keys, so the inserted rows are those whose fhir_id was
+        # absent before the insert
+        existing = prescription_ids({prescription.fhir_id for prescription in prescriptions})
+        Prescription.objects.bulk_create(prescriptions, batch_size=chunk_size, ignore_conflicts=True)
+        inserted = prescription_ids({prescription.fhir_id for prescription in prescriptions} - existing.keys())
+        # bulk_create sends no signals: log the creations in the chunk's transaction
+        record(inserted.values(), PrescriptionChange.ACTION_CREATE)
+        mark_dirty({prescription.start_date for prescription in prescriptions if prescription.fhir_id in inserted})
+        self.counts["prescriptions"] += len(inserted)
+        return errors
+
+    def save_checkpoint(self, path, offset):
+        if not self.checkpoint_path:
+            return
+        self.checkpoint[path] = offset
+        with open(f"{self.checkpoint_path}.partial", "w", encoding="utf-8") as checkpoint:
+            json.dump(self.checkpoint, checkpoint, indent=2)
+        os.replace(f"{self.checkpoint_path}.partial", self.checkpoint_path)
+
+    def report(self, path, errors):
+        for offset, message in errors:
+            self.stderr.write(f"{path}" + (f" (byte {offset})" if offset is not None else "") + f": {message}")
+        self.counts["errors"] += len(errors)
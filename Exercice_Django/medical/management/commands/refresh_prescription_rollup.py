@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from medical.stats import refresh_rollup, rollup_built_at
+
+
+# OopCompanion:suppressRename
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly prescription rollup used by GET /Prescription/stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true",
+                            help="Rebuild every month instead of only the months marked dirty.")
+
+    def handle(self, *args, **options):
+        months = refresh_rollup(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {months} month(s)."))
+        if rollup_built_at() is None:
+            self.stderr.write(self.style.WARNING(
+                "The rollup has never been fully built, or a write happened while it was disabled: "
+                "/Prescription/stats counts live until refresh_prescription_rollup --full is run."))
@@ -1,115 +1,112 @@
 import random
-import string
-from datetime import date, timedelta
 
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
 
-from medical.models import Patient, Medication, Prescription
+from medical import seeding
+from medical.batch import pool_map
+from medical.changes import record
+from medical.intervals import span_class
+from medical.models import (Patient, Medication, Prescription, PrescriptionChange, PrescriptionRollup,
+                            PrescriptionRollupDirtyMonth)
+from medical.signals import invalidate_on_commit
+from medical.stats import mark_dirty
 
 
 # OopCompanion:suppressRename
 
 
-def random_date(start_year=1940, end_year=2025):
-    start_dt = date(start_year, 1, 1)
-    end_dt = date(end_year, 12, 31)
-    days = (end_dt - start_dt).days
-    return start_dt + timedelta(days=random.randint(0, days))
-
-
 class Command(BaseCommand):
-    Patient.objects.all().delete()
-    Medication.objects.all().delete()
-    Prescription.objects.all().delete()
     help = "Seed the database with demo Patients and Medications and Prescriptions"
 
     def add_arguments(self, parser):
         parser.add_argument("--patients", type=int, default=10)
         parser.add_argument("--medications", type=int, default=5)
         parser.add_argument("--prescriptions", type=int, default=30)
+        parser.add_argument("--chunk-size", type=int, default=10_000,
+                            help="Rows generated and inserted per bulk_create batch.")
+        parser.add_argument("--seed", type=int, default=None,
+                            help="Random seed for reproducible data (printed when omitted).")
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Generate rows in a process pool of this size (0 = in-process).")
+        parser.add_argument("--flush", action="store_true",
+                            help="Delete existing patients, medications and prescriptions first.")
 
     def handle(self, *args, **options):
         n_patients = options["patients"]
         n_meds = options["medications"]
         n_prescriptions = options["prescriptions"]
-
-        last_names = [
-            "Martin", "Bernard", "Thomas", "Petit", "Robert",
-            "Richard", "Durand", "Dubois", "Moreau", "Laurent",
-            "Michel", "Garcia", "David", "Bertrand", "Roux",
-            "Vincent", "Fournier", "Morel", "Lefebvre", "Mercier",
-            "Dupont", "Lambert", "Bonnet", "Francois", "Martinez",
-            "Legrand", "Garnier", "Faure", "Andre", "Rousseau",
-            "Simon", "Leroy", "Roux", "Girard", "Colin",
-            "Lefevre", "Boyer", "Chevalier", "Robin", "Masson",
-            "Picard", "Blanc", "Gautier", "Nicolas", "Henry",
-            "Perrin", "Morin", "Mathieu", "Clement", "Gauthier",
-            "Dumont", "Lopez", "Fontaine", "Schmitt", "Rodriguez",
-            "Dufour", "Blanchard", "Meunier", "Brunet", "Roy"
-        ]
-        first_names = [
-            "Jean", "Jeanne", "Marie", "Luc", "Lucie",
-            "Paul", "Camille", "Pierre", "Sophie", "Emma",
-            "Louis", "Louise", "Alice", "Gabriel", "Jules",
-            "Lucas", "Hugo", "Arthur", "Adam", "Raphael",
-            "Leo", "Nathan", "Tom", "Zoe", "Chloe",
-            "Ines", "Lea", "Lena", "Eva", "Nina",
-            "Ethan", "Noah", "Liam", "Rose", "Anna",
-            "Jade", "Maeva", "Sarah", "Laura", "Clara",
-            "Julie", "Nicolas", "Thomas", "Antoine", "Emilie",
-            "Mathilde", "Charlotte", "Manon", "Julia", "Elise",
-            "Victor", "Alex", "Samuel", "Valentin", "Axel",
-            "Simon", "Romain", "Vincent", "Marc", "David"
-        ]
-
-        created_patients = []
-        for _ in range(n_patients):
-            p = Patient.objects.create(
-                last_name=random.choice(last_names),
-                first_name=random.choice(first_names),
-                birth_date=random_date(),
+        chunk_size = max(options["chunk_size"], 1)
+        workers = options["workers"]
+        seed = options["seed"]
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+            self.stdout.write(f"Using --seed {seed}")
+
+        if n_prescriptions and (not n_patients or not n_meds):
+            self.stderr.write("Prescriptions need at least one patient and one medication.")
+            return
+
+        with transaction.atomic():
+            if options["flush"]:
+                self.flush()
+
+            patient_ids = []
+            specs = [(seed, index, count) for index, count, _ in seeding.chunks(n_patients, chunk_size)]
+            for rows in pool_map(seeding.patient_chunk, specs, workers):
+                created = Patient.objects.bulk_create(
+                    [Patient(last_name=ln, first_name=fn, birth_date=bd) for ln, fn, bd in rows],
+                    batch_size=chunk_size,
+                )
+                patient_ids.extend(p.pk for p in created)
+
+            # A rerun with the same seed generates the same codes: existing medications are reused
+            medication_rows = seeding.medication_rows(seed, n_meds)
+            codes = dict(Medication.objects.filter(code__in=[code for code, _, _ in medication_rows])
+                         .values_list("code", "pk"))
+            created_meds = Medication.objects.bulk_create(
+                [Medication(code=code, label=label, status=status)
+                 for code, label, status in medication_rows if code not in codes],
+                batch_size=chunk_size,
             )
-            created_patients.append(p)
-
-        base_labels = [
-            "Paracetamol", "Ibuprofen", "Amoxicillin", "Aspirin", "Omeprazole",
-            "Metformin", "Loratadine", "Cetirizine", "Azithromycin", "Atorvastatin",
-            "Simvastatin", "Lisinopril", "Amlodipine", "Metoprolol", "Sertraline",
-            "Fluoxetine", "Escitalopram", "Gabapentin", "Pregabalin", "Tramadol",
-            "Oxycodone", "Hydrocodone", "Morphine", "Diazepam", "Alprazolam",
-            "Clonazepam", "Zolpidem", "Trazodone", "Cyclobenzaprine", "Meloxicam",
-            "Prednisone", "Methylprednisolone", "Hydrocortisone", "Fluticasone", "Montelukast",
-            "Albuterol", "Fluconazole", "Terbinafine", "Metronidazole", "Ciprofloxacin",
-            "Doxycycline", "Cephalexin", "Nitrofurantoin", "Pantoprazole", "Ranitidine",
-            "Famotidine", "Dicyclomine", "Ondansetron", "Promethazine", "Meclizine",
-        ]
-        created_meds = []
-        for i in range(n_meds):
-            code = f"MED{random.randint(1000, 9999)}{random.choice(string.ascii_uppercase)}"
-            label = f"{random.choice(base_labels)} {random.choice([15, 20, 25, 50, 100, 200, 250, 300, 400, 500, 800, 1000])}" + random.choice(
-                ["mg", "g", "µg"])
-            status = random.choices([Medication.STATUS_ACTIF, Medication.STATUS_SUPPR], weights=[0.8, 0.2])[0]
-            m = Medication.objects.create(code=code, label=label, status=status)
-            created_meds.append(m)
-
-        created_prescriptions = []
-
-        for i in range(n_prescriptions):
-            patient = random.choice(created_patients)
-            medication = random.choice(created_meds)
-            status = random.choices(
-                [Prescription.STATUS_VALIDE, Prescription.STATUS_EN_ATTENTE, Prescription.STATUS_SUPPR],
-                weights=[0.7, 0.1, 0.1],
-                k=1
-            )[0]
-            start_date = random_date(2022, 2026)
-            end_date = start_date + timedelta(days=random.randint(1, 100))
-            comment = f"Demo comment {i + 1}" if random.random() < 0.7 else ""
-            pr = Prescription.objects.create(patient=patient, medication=medication, status=status,
-                                             start_date=start_date, end_date=end_date, comment=comment)
-            created_prescriptions.append(pr)
+            codes.update((m.code, m.pk) for m in created_meds)
+            medication_ids = [codes[code] for code, _, _ in medication_rows]
+
+            n_created = 0
+            specs = [(seed, index, count, first) for index, count, first in seeding.chunks(n_prescriptions, chunk_size)]
+            for rows in pool_map(seeding.prescription_chunk, specs, workers, seeding.init_worker,
+                                 (patient_ids, medication_ids)):
+                created = Prescription.objects.bulk_create(
+                    [Prescription(patient_id=patient_id, medication_id=medication_id, status=status,
+                                  start_date=start_date, end_date=end_date, comment=comment,
+                                  span_class=span_class(start_date, end_date))
+                     for patient_id, medication_id, status, start_date, end_date, comment in rows],
+                    batch_size=chunk_size,
+                )
+                record((p.pk for p in created), PrescriptionChange.ACTION_CREATE)
+                n_created += len(rows)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"  {n_created}/{n_prescriptions} prescriptions")
+
+            # bulk_create and raw deletes send no signals: the change log is written above
+            mark_dirty(Prescription.objects.dates("start_date", "month"))
+        invalidate_on_commit(Patient, Medication, Prescription)
 
         self.stdout.write(self.style.SUCCESS(
-            f"Created {len(created_patients)} patients, {len(created_meds)} medications "
-            f"and {len(created_prescriptions)} prescriptions."
+            f"Created {len(patient_ids)} patients, {len(created_meds)} medications "
+            f"({len(medication_ids) - len(created_meds)} already present) and {n_created} prescriptions."
         ))
+
+    def flush(self):
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            # One delete entry per prescription, written by the database like the deletes below
+            cursor.execute(
+                f"INSERT INTO {quote(PrescriptionChange._meta.db_table)} (prescription_id, action, changed_at) "
+                f"SELECT id, %s, %s FROM {quote(Prescription._meta.db_table)}",
+                [PrescriptionChange.ACTION_DELETE, connection.ops.adapt_datetimefield_value(timezone.now())])
+            # Children first so the deletes never have to cascade. Set-based deletes skip the
+            # per-row post_delete signals, which would load every row in memory.
+            for model in (PrescriptionRollup, PrescriptionRollupDirtyMonth, Prescription, Patient, Medication):
+                cursor.execute(f"DELETE FROM {quote(model._meta.db_table)}")
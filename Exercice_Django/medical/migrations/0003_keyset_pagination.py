@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0002_prescription'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='prescription',
+            options={'ordering': ['patient_id', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='patient_ordering_idx'),
+        ),
+    ]
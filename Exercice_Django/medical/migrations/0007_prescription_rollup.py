@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0006_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrescriptionRollupDirtyMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PrescriptionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('status', models.CharField(choices=[('valide', 'valide'), ('en_attente', 'en_attente'), ('suppr', 'suppr')], max_length=16)),
+                ('count', models.PositiveIntegerField()),
+                ('medication', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='medical.medication')),
+            ],
+            options={
+                'ordering': ['month', 'status', 'medication'],
+                'constraints': [models.UniqueConstraint(fields=('month', 'status', 'medication'), name='prescription_rollup_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:48
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def span_class(start_date, end_date):
+    # Frozen copy of medical.intervals.span_class as of this migration: replays must give the same classes
+    return max((end_date - start_date).days, 0).bit_length()
+
+
+def fill_span_class(apps, schema_editor):
+    Prescription = apps.get_model("medical", "Prescription")
+    last = 0
+    while True:
+        # Walk the primary key in windows instead of updating under an open cursor
+        rows = list(Prescription.objects.filter(pk__gt=last).order_by("pk")
+                    .values_list("id", "start_date", "end_date")[:10000])
+        if not rows:
+            return
+        update_span_class(Prescription, rows)
+        last = rows[-1][0]
+
+
+def update_span_class(Prescription, rows):
+    # One UPDATE per duration class and batch; class 0 is the column default
+    by_class = defaultdict(list)
+    for pk, start_date, end_date in rows:
+        by_class[span_class(start_date, end_date)].append(pk)
+    by_class.pop(0, None)
+    for span, ids in by_class.items():
+        Prescription.objects.filter(pk__in=ids).update(span_class=span)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0007_prescription_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prescription',
+            name='span_class',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_span_class, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['span_class', 'start_date', 'end_date'], name='prescription_span_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0008_prescription_span_class'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrescriptionChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prescription_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('create', 'create'), ('update', 'update'), ('delete', 'delete')], max_length=8)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['prescription_id', 'id'], name='prescription_change_idx'), models.Index(fields=['changed_at'], name='prescription_change_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0009_prescription_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medication',
+            name='fhir_id',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='fhir_id',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='fhir_id',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='medication',
+            constraint=models.UniqueConstraint(condition=models.Q(('fhir_id__isnull', False)), fields=('fhir_id',), name='medication_fhir_id_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='patient',
+            constraint=models.UniqueConstraint(condition=models.Q(('fhir_id__isnull', False)), fields=('fhir_id',), name='patient_fhir_id_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='prescription',
+            constraint=models.UniqueConstraint(condition=models.Q(('fhir_id__isnull', False)), fields=('fhir_id',), name='prescription_fhir_id_unique'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0011_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrescriptionRollupBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('built_at', models.DateTimeField()),
+            ],
+        ),
+    ]
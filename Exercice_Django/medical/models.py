@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
+from .intervals import span_class
+
 
 # OopCompanion:suppressRename
 
@@ -11,9 +14,21 @@ class Patient(models.Model):
     last_name = models.CharField(max_length=150)
     first_name = models.CharField(max_length=150)
     birth_date = models.DateField(null=True, blank=True)
+    # Logical id of the FHIR resource the row was imported from (import_fhir)
+    fhir_id = models.CharField(max_length=64, null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["last_name", "first_name", "id"]
+        indexes = [
+            # Matches the ordering so keyset pagination is an index range scan
+            models.Index(fields=["last_name", "first_name", "id"], name="patient_ordering_idx"),
+        ]
+        constraints = [
+            # Partial: rows not imported from FHIR stay out of the index. A conditional constraint is also
+            # created in place by SQLite, where a plain UNIQUE column would rebuild the table (and its triggers)
+            models.UniqueConstraint(fields=["fhir_id"], condition=models.Q(fhir_id__isnull=False),
+                                    name="patient_fhir_id_unique"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple repr
         return f"{self.last_name} {self.first_name}"
@@ -32,9 +47,14 @@ class Medication(models.Model):
     code = models.CharField(max_length=64, unique=True)
     label = models.CharField(max_length=255)
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_ACTIF)
+    fhir_id = models.CharField(max_length=64, null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["code"]
+        constraints = [
+            models.UniqueConstraint(fields=["fhir_id"], condition=models.Q(fhir_id__isnull=False),
+                                    name="medication_fhir_id_unique"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple repr
         return f"{self.code} - {self.label} ({self.status})"
@@ -60,21 +80,128 @@ class Prescription(models.Model):
     medication = models.ForeignKey(
         "Medication",
         on_delete=models.CASCADE,
-        related_name="prescriptions"
+        related_name="prescriptions",
+        # Covered by the (medication, end_date) composite index below
+        db_index=False,
     )
     start_date = models.DateField()
     end_date = models.DateField()
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_VALIDE)
     comment = models.CharField(max_length=255, null=True, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+    fhir_id = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    # Duration class used by the active_on / overlaps filters (see medical.intervals)
+    span_class = models.PositiveSmallIntegerField(default=0, editable=False)
 
     def clean(self):
         # End date cannot be before start date
         if self.end_date < self.start_date:
             raise ValidationError({"end_date": "End date cannot be before start date."})
 
+    def save(self, *args, **kwargs):
+        self.span_class = span_class(self.start_date, self.end_date)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"start_date", "end_date"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "span_class"}
+        # The change log entry (post_save receiver) commits or rolls back with the row
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
     class Meta:
-        ordering = ["patient"]
+        ordering = ["patient_id", "id"]
+        # Composite indexes matching the PrescriptionFilter query shapes: an equality
+        # column first, then the date range column.
+        indexes = [
+            models.Index(fields=["patient", "start_date"], name="prescription_patient_start_idx"),
+            models.Index(fields=["medication", "end_date"], name="prescription_med_end_idx"),
+            models.Index(fields=["status", "start_date"], name="prescription_status_start_idx"),
+            models.Index(fields=["start_date"], name="prescription_start_idx"),
+            models.Index(fields=["end_date"], name="prescription_end_idx"),
+            # Interval lookups: one bounded start_date range per duration class
+            models.Index(fields=["span_class", "start_date", "end_date"], name="prescription_span_idx"),
+        ]
+        constraints = [
+            # import_fhir skips already imported requests on conflict (resumed imports)
+            models.UniqueConstraint(fields=["fhir_id"], condition=models.Q(fhir_id__isnull=False),
+                                    name="prescription_fhir_id_unique"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple repr
         return f"{self.medication} for {self.patient} from {self.start_date} to {self.end_date} " \
                f"- {self.status} {self.comment}"
+
+
+class PrescriptionRollup(models.Model):
+    """Nombre de prescriptions par mois de début, statut et médicament (agrégat matérialisé)."""
+
+    month = models.DateField()
+    status = models.CharField(max_length=16, choices=Prescription.STATUS_CHOICES)
+    medication = models.ForeignKey("Medication", on_delete=models.CASCADE, related_name="+")
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["month", "status", "medication"]
+        constraints = [
+            models.UniqueConstraint(fields=["month", "status", "medication"], name="prescription_rollup_unique"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"{self.month:%Y-%m} {self.status} {self.medication_id}: {self.count}"
+
+
+class PrescriptionRollupDirtyMonth(models.Model):
+    """Mois dont l'agrégat doit être recalculé avant d'être lu."""
+
+    month = models.DateField(unique=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"{self.month:%Y-%m}"
+
+
+class PrescriptionRollupBuild(models.Model):
+    """Dernière reconstruction complète de l'agrégat ; supprimée dès qu'une écriture n'y est plus suivie."""
+
+    built_at = models.DateTimeField()
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"built {self.built_at:%Y-%m-%d %H:%M}"
+
+
+class DataVersion(models.Model):
+    """Version des données d'un modèle, incrémentée après chaque écriture validée (:mod:`medical.caching`)."""
+
+    # app_label.model_name
+    model = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"{self.model} v{self.version}"
+
+
+class PrescriptionChange(models.Model):
+    """Écriture d'une prescription, lue par ``GET /Prescription/changes`` (voir :mod:`medical.changes`)."""
+
+    ACTION_CREATE = "create"
+    ACTION_UPDATE = "update"
+    ACTION_DELETE = "delete"
+    ACTION_CHOICES = (
+        (ACTION_CREATE, "create"),
+        (ACTION_UPDATE, "update"),
+        (ACTION_DELETE, "delete"),
+    )
+
+    # No foreign key: the entry must outlive a deleted prescription
+    prescription_id = models.BigIntegerField()
+    action = models.CharField(max_length=8, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # Compaction looks for a newer entry of the same prescription
+            models.Index(fields=["prescription_id", "id"], name="prescription_change_idx"),
+            models.Index(fields=["changed_at"], name="prescription_change_at_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"#{self.pk} {self.action} {self.prescription_id} at {self.changed_at:%Y-%m-%d %H:%M:%S}"
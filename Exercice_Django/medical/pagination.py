@@ -0,0 +1,188 @@
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+# OopCompanion:suppressRename
+
+
+class KeysetPagination(BasePagination):
+    """Pagination par curseur opaque sur la clé complète de ``Meta.ordering``.
+
+    Le curseur encode les valeurs de tri de la dernière (ou première) ligne
+    servie : la page suivante est un simple ``WHERE (a, b, c) > (x, y, z)``
+    qui profite de l'index de tri, quel que soit le rang de la page.
+    Le corps de la réponse reste une liste ; les liens ``next``/``prev`` sont
+    exposés dans l'en-tête ``Link``. Une vue peut imposer sa propre clé (par
+    exemple un rang de recherche annoté) via ``get_keyset_ordering(queryset)``.
+    """
+
+    page_size = api_settings.PAGE_SIZE or 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None, values=None):
+        """Page de ``queryset`` ; avec ``values`` (colonnes), des dicts ``values()`` au lieu d'instances."""
+        queryset = self.page_queryset(queryset, request, view, values)
+        return self.page_rows(list(queryset))
+
+    def paginate_values(self, queryset, columns, request, view=None):
+        return self.paginate_queryset(queryset, request, view, values=columns)
+
+    async def apaginate_values(self, queryset, columns, request, view=None):
+        """:meth:`paginate_values` pour les vues asynchrones (lecture par ``aiterator()``)."""
+        queryset = self.page_queryset(queryset, request, view, columns)
+        return self.page_rows([row async for row in queryset.aiterator()])
+
+    def page_queryset(self, queryset, request, view=None, values=None):
+        """Requête (non exécutée) de la page demandée, une ligne de plus que la taille de page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        get_view_ordering = getattr(view, "get_keyset_ordering", None)
+        self.ordering = (get_view_ordering and get_view_ordering(queryset)) or self.get_ordering(queryset)
+        # Annotations (e.g. a search rank) have no model field: their values are used as is
+        self.fields = [self.get_field(queryset.model, name) for name in self.ordering]
+
+        self.position, self.reverse = self.decode_cursor(request)
+
+        if self.reverse:
+            queryset = queryset.order_by(*("-" + name for name in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self.keyset_filter(self.position, self.reverse))
+
+        if values is not None:
+            # The cursor needs the ordering columns even when the caller does not
+            keys = [field.attname if field else name for field, name in zip(self.fields, self.ordering)]
+            queryset = queryset.values(*values, *(key for key in keys if key not in values))
+
+        # Fetch one extra row to know whether another page follows
+        return queryset[:self.page_size + 1]
+
+    def page_rows(self, rows):
+        """Lignes lues par :meth:`page_queryset` : retire la ligne de trop et prépare les liens."""
+        position = self.position
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.first_position = self.get_position(rows[0]) if rows else position
+        self.last_position = self.get_position(rows[-1]) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        link = self.get_link_header()
+        return Response(data, headers={"Link": link} if link else None)
+
+    def get_link_header(self):
+        links = []
+        next_link = self.get_next_link()
+        if next_link:
+            links.append(f'<{next_link}>; rel="next"')
+        previous_link = self.get_previous_link()
+        if previous_link:
+            links.append(f'<{previous_link}>; rel="prev"')
+        return ", ".join(links) or None
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            size = int(value)
+        except ValueError:
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    @staticmethod
+    def get_ordering(queryset):
+        ordering = list(queryset.model._meta.ordering)
+        # The primary key closes the ordering so the cursor is always unique
+        if "id" not in ordering and "pk" not in ordering:
+            ordering.append("id")
+        return ordering
+
+    @staticmethod
+    def get_field(model, name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def keyset_filter(self, position, reverse):
+        """Construit ``(a > x) OR (a = x AND b > y) OR ...`` sur la clé de tri."""
+        lookup = "lt" if reverse else "gt"
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            branch = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(self.ordering[:index], position[:index]):
+                branch &= Q(**{previous: value})
+            condition |= branch
+        # Redundant bound on the leading column so the planner does a range scan on the index
+        return Q(**{f"{self.ordering[0]}__{lookup}e": position[0]}) & condition
+
+    def get_position(self, obj):
+        keys = (field.attname if field else name for field, name in zip(self.fields, self.ordering))
+        if isinstance(obj, dict):
+            return [obj[key] for key in keys]
+        return [getattr(obj, key) for key in keys]
+
+    @staticmethod
+    def make_cursor(position, reverse=False):
+        """Jeton opaque (base64 d'un JSON) pour une position dans la clé de tri."""
+        values = [value.isoformat() if hasattr(value, "isoformat") else value for value in position]
+        payload = json.dumps({"p": values, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def encode_cursor(self, position, reverse):
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.make_cursor(position, reverse)
+        base_url = self.request.build_absolute_uri(self.request.path)
+        return f"{base_url}?{urlencode(sorted(params.lists()), doseq=True)}"
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values = payload["p"]
+            reverse = bool(payload.get("r", 0))
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) if field else value for field, value in zip(self.fields, values)]
+        except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError, AttributeError,
+                DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
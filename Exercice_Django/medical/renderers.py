@@ -0,0 +1,79 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .fastpath import Rows
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# OopCompanion:suppressRename
+
+
+class _Echo:
+    """Pseudo-fichier : ``csv.writer`` écrit une ligne et on la récupère telle quelle."""
+
+    def write(self, value):
+        return value
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` de DRF ; les listes du chemin rapide sont encodées par orjson s'il est installé.
+
+    Ces listes ne contiennent que des ``str``, ``int`` et ``None`` : la sortie
+    d'orjson est alors identique, octet pour octet, à celle de ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or type(data) is not Rows
+                or self.get_indent(accepted_media_type or "", renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these two for JavaScript compatibility
+        return orjson.dumps(data).replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Un objet JSON par ligne (``?format=ndjson``)."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return "".join(json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + "\n" for row in rows).encode()
+
+    def stream(self, fields, rows):
+        """Génère les lignes NDJSON à partir de tuples ``values_list``."""
+        encoder = JSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV avec une ligne d'en-tête (``?format=csv``)."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not data:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0])
+        return "".join(self.stream(fields, ([row.get(f) for f in fields] for row in rows))).encode()
+
+    def stream(self, fields, rows):
+        """Génère l'en-tête puis une ligne CSV par tuple ``values_list``."""
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
@@ -0,0 +1,63 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .pagination import KeysetPagination
+
+
+# OopCompanion:suppressRename
+
+
+RANK = "search_rank"
+MAX_TERMS = 8
+
+
+def terms(query):
+    """Mots de la recherche, en minuscules (au plus ``MAX_TERMS``)."""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def search(queryset, query, columns):
+    """Filtre ``queryset`` sur les lignes dont chaque mot commence un mot de ``columns``.
+
+    Les candidats viennent de l'index de recherche (table FTS5 sous SQLite,
+    index trigramme GIN sous PostgreSQL, voir la migration ``0006``), puis
+    sont classés dans l'annotation ``search_rank`` : 0 si la première colonne
+    commence par le premier mot, 1 si c'est la seconde, 2 sinon.
+    """
+    words = terms(query)
+    if not words:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        fts = f"{queryset.model._meta.db_table}_fts"
+        # Every word as a quoted prefix query; \w tokens never contain quotes
+        match = " ".join(f'"{word}"*' for word in words)
+        queryset = queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match]))
+    else:
+        # ~* '\mword' (start of a word) is served by the pg_trgm GIN indexes
+        lookup = "iregex" if vendor == "postgresql" else "icontains"
+        for word in words:
+            pattern = rf"\m{word}" if vendor == "postgresql" else word
+            queryset = queryset.filter(reduce(or_, (Q(**{f"{column}__{lookup}": pattern}) for column in columns)))
+
+    rank = Case(
+        *(When(**{f"{column}__istartswith": words[0]}, then=Value(index)) for index, column in enumerate(columns)),
+        default=Value(len(columns)),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(**{RANK: rank})
+
+
+class RankedSearchMixin:
+    """Pagine les résultats de ``?q=`` par pertinence puis par l'ordre habituel du modèle."""
+
+    def get_keyset_ordering(self, queryset):
+        if RANK in queryset.query.annotations:
+            return [RANK, *KeysetPagination.get_ordering(queryset)]
+        return None
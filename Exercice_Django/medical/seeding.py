@@ -0,0 +1,124 @@
+"""Génération des données de démonstration, sans accès à la base.
+
+Chaque lot (chunk) est produit par son propre générateur aléatoire dérivé de
+``(seed, type, numéro de lot)`` : le résultat ne dépend que de la graine, pas
+du nombre de processus utilisés. Le module n'importe pas les modèles pour
+rester importable dans les processus du pool.
+"""
+import random
+import string
+from datetime import date, timedelta
+
+
+# OopCompanion:suppressRename
+
+
+LAST_NAMES = [
+    "Martin", "Bernard", "Thomas", "Petit", "Robert",
+    "Richard", "Durand", "Dubois", "Moreau", "Laurent",
+    "Michel", "Garcia", "David", "Bertrand", "Roux",
+    "Vincent", "Fournier", "Morel", "Lefebvre", "Mercier",
+    "Dupont", "Lambert", "Bonnet", "Francois", "Martinez",
+    "Legrand", "Garnier", "Faure", "Andre", "Rousseau",
+    "Simon", "Leroy", "Roux", "Girard", "Colin",
+    "Lefevre", "Boyer", "Chevalier", "Robin", "Masson",
+    "Picard", "Blanc", "Gautier", "Nicolas", "Henry",
+    "Perrin", "Morin", "Mathieu", "Clement", "Gauthier",
+    "Dumont", "Lopez", "Fontaine", "Schmitt", "Rodriguez",
+    "Dufour", "Blanchard", "Meunier", "Brunet", "Roy"
+]
+FIRST_NAMES = [
+    "Jean", "Jeanne", "Marie", "Luc", "Lucie",
+    "Paul", "Camille", "Pierre", "Sophie", "Emma",
+    "Louis", "Louise", "Alice", "Gabriel", "Jules",
+    "Lucas", "Hugo", "Arthur", "Adam", "Raphael",
+    "Leo", "Nathan", "Tom", "Zoe", "Chloe",
+    "Ines", "Lea", "Lena", "Eva", "Nina",
+    "Ethan", "Noah", "Liam", "Rose", "Anna",
+    "Jade", "Maeva", "Sarah", "Laura", "Clara",
+    "Julie", "Nicolas", "Thomas", "Antoine", "Emilie",
+    "Mathilde", "Charlotte", "Manon", "Julia", "Elise",
+    "Victor", "Alex", "Samuel", "Valentin", "Axel",
+    "Simon", "Romain", "Vincent", "Marc", "David"
+]
+BASE_LABELS = [
+    "Paracetamol", "Ibuprofen", "Amoxicillin", "Aspirin", "Omeprazole",
+    "Metformin", "Loratadine", "Cetirizine", "Azithromycin", "Atorvastatin",
+    "Simvastatin", "Lisinopril", "Amlodipine", "Metoprolol", "Sertraline",
+    "Fluoxetine", "Escitalopram", "Gabapentin", "Pregabalin", "Tramadol",
+    "Oxycodone", "Hydrocodone", "Morphine", "Diazepam", "Alprazolam",
+    "Clonazepam", "Zolpidem", "Trazodone", "Cyclobenzaprine", "Meloxicam",
+    "Prednisone", "Methylprednisolone", "Hydrocortisone", "Fluticasone", "Montelukast",
+    "Albuterol", "Fluconazole", "Terbinafine", "Metronidazole", "Ciprofloxacin",
+    "Doxycycline", "Cephalexin", "Nitrofurantoin", "Pantoprazole", "Ranitidine",
+    "Famotidine", "Dicyclomine", "Ondansetron", "Promethazine", "Meclizine",
+]
+DOSES = [15, 20, 25, 50, 100, 200, 250, 300, 400, 500, 800, 1000]
+UNITS = ["mg", "g", "µg"]
+
+MEDICATION_STATUSES = ["actif", "suppr"]
+PRESCRIPTION_STATUSES = ["valide", "en_attente", "suppr"]
+
+
+def chunk_rng(seed, kind, index):
+    """Générateur propre à un lot : reproductible quel que soit l'ordre d'exécution."""
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def random_date(start_year=1940, end_year=2025, rng=random):
+    start_dt = date(start_year, 1, 1)
+    end_dt = date(end_year, 12, 31)
+    days = (end_dt - start_dt).days
+    return start_dt + timedelta(days=rng.randint(0, days))
+
+
+def patient_chunk(seed, index, count):
+    """Tuples ``(last_name, first_name, birth_date)``."""
+    rng = chunk_rng(seed, "patient", index)
+    return [(rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES), random_date(rng=rng)) for _ in range(count)]
+
+
+def medication_rows(seed, count):
+    """Tuples ``(code, label, status)`` avec des codes uniques."""
+    rng = chunk_rng(seed, "medication", 0)
+    space = 9000 * len(string.ascii_uppercase)
+    if count <= space:
+        codes = [f"MED{1000 + n // 26}{string.ascii_uppercase[n % 26]}" for n in rng.sample(range(space), count)]
+    else:
+        codes = [f"MED{n:08d}" for n in range(count)]
+    return [
+        (code,
+         f"{rng.choice(BASE_LABELS)} {rng.choice(DOSES)}{rng.choice(UNITS)}",
+         rng.choices(MEDICATION_STATUSES, weights=[0.8, 0.2])[0])
+        for code in codes
+    ]
+
+
+# Referenced ids, set once per worker process by init_worker()
+_patient_ids = []
+_medication_ids = []
+
+
+def init_worker(patient_ids, medication_ids):
+    global _patient_ids, _medication_ids
+    _patient_ids = patient_ids
+    _medication_ids = medication_ids
+
+
+def prescription_chunk(seed, index, count, first_number):
+    """Tuples ``(patient_id, medication_id, status, start_date, end_date, comment)``."""
+    rng = chunk_rng(seed, "prescription", index)
+    rows = []
+    for number in range(first_number, first_number + count):
+        status = rng.choices(PRESCRIPTION_STATUSES, weights=[0.7, 0.1, 0.1], k=1)[0]
+        start_date = random_date(2022, 2026, rng=rng)
+        end_date = start_date + timedelta(days=rng.randint(1, 100))
+        comment = f"Demo comment {number}" if rng.random() < 0.7 else ""
+        rows.append((rng.choice(_patient_ids), rng.choice(_medication_ids), status, start_date, end_date, comment))
+    return rows
+
+
+def chunks(total, size):
+    """Découpe ``total`` lignes en ``(index, count, first_number)``."""
+    for index, start in enumerate(range(0, total, size)):
+        yield index, min(size, total - start), start + 1
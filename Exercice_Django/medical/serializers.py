@@ -19,25 +19,42 @@ class PrescriptionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("End date cannot be before start date")
         return data
 
-    def validate_patient(self, value):
-        if not Patient.objects.filter(id=value.id).exists():
-            raise serializers.ValidationError("Patient does not exist.")
-        return value
 
-    def validate_medication(self, value):
-        if not Medication.objects.filter(id=value.id).exists():
-            raise serializers.ValidationError("Medication does not exist.")
-        return value
+class PrescriptionBulkSerializer(PrescriptionSerializer):
+    """Ligne d'un import en masse : les clés étrangères restent des IDs bruts.
+
+    L'existence des patients et médicaments est vérifiée par lot (une requête
+    ``IN`` par lot) dans :mod:`medical.bulk`, pas ligne par ligne.
+    """
+
+    id = serializers.IntegerField(required=False)
+    patient = serializers.IntegerField(source="patient_id")
+    medication = serializers.IntegerField(source="medication_id")
 
 
 class PatientSerializer(serializers.ModelSerializer):
+    """Patient ; ``context["expand"]`` ajoute ``prescriptions`` (et leur ``medication``) imbriquées."""
+
     class Meta:
         model = Patient
         fields = ["id", "last_name", "first_name", "birth_date"]
-        prescriptions = PrescriptionSerializer(many=True, read_only=True)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = self.context.get("expand", ())
+        if "prescriptions.medication" in expand:
+            self.fields["prescriptions"] = PrescriptionMedicationSerializer(many=True, read_only=True)
+        elif "prescriptions" in expand:
+            self.fields["prescriptions"] = PrescriptionSerializer(many=True, read_only=True)
 
 
 class MedicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Medication
         fields = ["id", "code", "label", "status"]
+
+
+class PrescriptionMedicationSerializer(PrescriptionSerializer):
+    """Prescription en lecture avec le médicament imbriqué."""
+
+    medication = MedicationSerializer(read_only=True)
@@ -0,0 +1,76 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .caching import response_cache
+from .changes import record
+from .cohort import leaf_cache
+from .models import Patient, Medication, Prescription, PrescriptionChange
+from .stats import mark_dirty, rollup_enabled
+
+
+# OopCompanion:suppressRename
+
+
+def invalidate(*models):
+    """Invalide les réponses en cache et les feuilles de cohorte qui lisent ``models``."""
+    for model in models:
+        response_cache.bump(model)
+        leaf_cache.invalidate(model)
+
+
+def invalidate_on_commit(*models):
+    """:func:`invalidate` une fois la transaction en cours validée (tout de suite hors transaction).
+
+    Avant la validation, une lecture concurrente voit encore les anciennes
+    lignes : avec une version déjà incrémentée, elle les mettrait en cache sous
+    la nouvelle.
+    """
+    transaction.on_commit(partial(invalidate, *models))
+
+
+@receiver([post_save, post_delete], sender=Patient)
+@receiver([post_save, post_delete], sender=Medication)
+@receiver([post_save, post_delete], sender=Prescription)
+def invalidate_cached_reads(sender, **kwargs):
+    """Toute écriture invalide les réponses et feuilles de cohorte en cache qui dépendent du modèle."""
+    invalidate_on_commit(sender)
+
+
+@receiver(pre_save, sender=Prescription)
+def remember_rollup_month(sender, instance, **kwargs):
+    """Mémorise l'ancienne date de début : son mois doit aussi être recalculé."""
+    if rollup_enabled() and instance.pk is not None:
+        instance._previous_start_date = Prescription.objects.filter(pk=instance.pk).values_list(
+            "start_date", flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Prescription)
+def mark_rollup_months_dirty(sender, instance, **kwargs):
+    mark_dirty([instance.start_date, getattr(instance, "_previous_start_date", None)])
+
+
+@receiver(post_save, sender=Prescription)
+def log_prescription_save(sender, instance, created, raw=False, **kwargs):
+    """Journalise l'écriture (dans la transaction ouverte par ``Prescription.save()``)."""
+    if not raw:
+        record([instance.pk], PrescriptionChange.ACTION_CREATE if created else PrescriptionChange.ACTION_UPDATE)
+
+
+@receiver(post_delete, sender=Prescription)
+def log_prescription_delete(sender, instance, **kwargs):
+    record([instance.pk], PrescriptionChange.ACTION_DELETE)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Applique ``SQLITE_PRAGMAS`` (WAL, synchronous...) à chaque nouvelle connexion SQLite."""
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None)
+    if pragmas and connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,342 @@
+"""Instantanés Parquet de Patient, Medication et Prescription pour les traitements analytiques (Spark).
+
+Arborescence écrite par :func:`write_snapshot` :
+
+    <dossier>/patient.parquet
+    <dossier>/medication.parquet
+    <dossier>/prescription/start_year=2025/part-00001.parquet
+    <dossier>/prescription_deleted/part-00002.parquet
+    <dossier>/_manifest.json
+
+Les lignes sont lues par l'ORM en tuples (``values_list(...).iterator()``) et
+écrites par groupes de ``batch_size`` lignes (un *record batch* Arrow, un
+*row group* Parquet) : la mémoire ne dépend que de ``batch_size``.
+
+Un instantané complet remplace tout le dossier ``prescription``. Un instantané
+incrémental n'écrit que les prescriptions du journal des changements
+(:mod:`medical.changes`) postérieures au précédent : les lignes créées ou
+modifiées dans de nouveaux fichiers ``part-<n>``, les suppressions dans
+``prescription_deleted``. Chaque ligne porte le numéro ``snapshot`` de
+l'instantané qui l'a écrite ; l'état courant d'une prescription est sa ligne de
+plus grand ``snapshot``, sauf si une suppression de numéro supérieur existe.
+Patients et médicaments, sans journal, sont réécrits à chaque fois.
+
+``pyarrow`` est optionnel : sans lui, :data:`pa` vaut ``None``.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+from django.db import models
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .batch import batched, chunk_size
+from .changes import retention, settle_delay
+from .models import Patient, Medication, Prescription, PrescriptionChange
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+
+# OopCompanion:suppressRename
+
+
+BATCH_SIZE = 50000
+MANIFEST = "_manifest.json"
+
+PATIENT_FIELDS = ["id", "last_name", "first_name", "birth_date"]
+MEDICATION_FIELDS = ["id", "code", "label", "status"]
+PRESCRIPTION_FIELDS = ["id", "patient_id", "medication_id", "start_date", "end_date", "status", "comment",
+                       "updated_at"]
+
+
+def arrow_type(field):
+    """Type Arrow d'un champ de modèle (clé étrangère : type de la clé primaire cible)."""
+    if isinstance(field, models.ForeignKey):
+        field = field.target_field
+    if isinstance(field, (models.AutoField, models.IntegerField)):
+        return pa.int64()
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    return pa.string()
+
+
+def arrow_schema(model, names):
+    """Schéma Arrow des colonnes ``values_list(*names)`` de ``model``."""
+    fields = [model._meta.get_field(name) for name in names]
+    return pa.schema([pa.field(name, arrow_type(field), nullable=field.null) for name, field in zip(names, fields)])
+
+
+def record_batch(schema, rows):
+    """Tuples ``values_list`` → ``RecordBatch`` conforme à ``schema``."""
+    columns = list(zip(*rows)) or [()] * len(schema)
+    return pa.RecordBatch.from_arrays([pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                                      schema=schema)
+
+
+class _Sink:
+    """Pseudo-fichier en écriture seule : les octets écrits sont récupérés par :meth:`drain`."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(schema, rows, batch_size=BATCH_SIZE):
+    """Génère un fichier Parquet par morceaux : un *row group* de ``batch_size`` lignes à la fois."""
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in batched(rows, batch_size):
+            writer.write_batch(record_batch(schema, batch))
+            yield sink.drain()
+    yield sink.drain()
+
+
+class ParquetRenderer(BaseRenderer):
+    """Fichier Parquet (``?format=parquet``, si ``pyarrow`` est installé), écrit par *row groups*.
+
+    Les erreurs (``400``) n'ont pas de forme tabulaire : elles sont renvoyées en JSON.
+    """
+
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    charset = None
+    render_style = "binary"
+    batch_size = 2000
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = "application/json"
+        return JSONRenderer().render(data)
+
+    def stream(self, fields, rows, model):
+        """Génère le fichier à partir de tuples ``values_list`` des champs ``fields`` de ``model``."""
+        yield from stream_parquet(arrow_schema(model, fields), rows, self.batch_size)
+
+
+def write_table(path, schema, rows, batch_size):
+    """Écrit ``rows`` dans ``path`` (remplacé en une fois) ; retourne le nombre de lignes."""
+    count = 0
+    partial = f"{path}.partial"
+    with pq.ParquetWriter(partial, schema) as writer:
+        for batch in batched(rows, batch_size):
+            writer.write_batch(record_batch(schema, batch))
+            count += len(batch)
+    os.replace(partial, path)
+    return count
+
+
+class PartitionedWriter:
+    """Fichiers ``start_year=<année>/<nom>`` ouverts à la demande, un *row group* par ``batch_size`` lignes.
+
+    Avec ``ordered`` (lignes triées par date de début), le fichier d'une année est
+    complété et fermé dès la première ligne de l'année suivante : un seul tampon
+    et un seul fichier ouvert à la fois.
+    """
+
+    def __init__(self, directory, schema, filename, batch_size, ordered=False):
+        self.directory = directory
+        self.schema = schema
+        self.filename = filename
+        self.batch_size = batch_size
+        self.ordered = ordered
+        self.year_column = schema.names.index("start_date")
+        self.writers = {}
+        self.buffers = {}
+        self.year = None
+        self.count = 0
+
+    def write(self, row):
+        year = row[self.year_column].year
+        if self.ordered and year != self.year:
+            if self.year is not None:
+                self.finish(self.year)
+            self.year = year
+        buffer = self.buffers.setdefault(year, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(year)
+
+    def flush(self, year):
+        if year not in self.writers:
+            directory = os.path.join(self.directory, f"start_year={year}")
+            os.makedirs(directory, exist_ok=True)
+            self.writers[year] = pq.ParquetWriter(os.path.join(directory, self.filename), self.schema)
+        self.writers[year].write_batch(record_batch(self.schema, self.buffers[year]))
+        self.count += len(self.buffers[year])
+        self.buffers[year] = []
+
+    def finish(self, year):
+        """Écrit le reste du tampon de ``year`` et ferme son fichier."""
+        if self.buffers.get(year):
+            self.flush(year)
+        self.buffers.pop(year, None)
+        writer = self.writers.pop(year, None)
+        if writer is not None:
+            writer.close()
+
+    def close(self):
+        for year in {*self.buffers, *self.writers}:
+            self.finish(year)
+        return self.count
+
+
+class DeletedWriter:
+    """Identifiants des prescriptions supprimées, avec le numéro de l'instantané ; fichier créé au premier."""
+
+    def __init__(self, path, number, batch_size):
+        self.path = path
+        self.number = number
+        self.batch_size = batch_size
+        self.schema = pa.schema([pa.field("id", pa.int64(), nullable=False),
+                                 pa.field("snapshot", pa.int32(), nullable=False)])
+        self.writer = None
+        self.buffer = []
+        self.count = 0
+
+    def write(self, pk):
+        self.buffer.append((pk, self.number))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_batch(record_batch(self.schema, self.buffer))
+        self.count += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        if self.buffer:
+            self.flush()
+        if self.writer is not None:
+            self.writer.close()
+        return self.count
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return {"snapshots": []}
+
+
+def write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(f"{path}.partial", "w", encoding="utf-8") as output:
+        json.dump(manifest, output, indent=2)
+    os.replace(f"{path}.partial", path)
+
+
+def head_change_id(now):
+    """Dernière entrée du journal sûre à lire (voir ``PRESCRIPTION_CHANGES_SETTLE_SECONDS``)."""
+    entries = PrescriptionChange.objects.filter(changed_at__lte=now - settle_delay())
+    return entries.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def incremental_base(manifest, now):
+    """Instantané précédent à compléter, ou ``None`` si un instantané complet est nécessaire."""
+    if not manifest["snapshots"]:
+        return None
+    previous = manifest["snapshots"][-1]
+    # Log entries older than the retention may have been purged
+    if datetime.fromisoformat(previous["created_at"]) < now - retention():
+        return None
+    return previous
+
+
+def write_snapshot(directory, incremental=False, batch_size=BATCH_SIZE):
+    """Écrit un instantané dans ``directory`` ; retourne son entrée du manifeste."""
+    os.makedirs(directory, exist_ok=True)
+    manifest = read_manifest(directory)
+    now = timezone.now()
+    # Read before any row: a write committed meanwhile is exported again by the next snapshot
+    head = head_change_id(now)
+    previous = incremental_base(manifest, now) if incremental else None
+    number = manifest["snapshots"][-1]["snapshot"] + 1 if manifest["snapshots"] else 1
+    filename = f"part-{number:05d}.parquet"
+
+    rows = {
+        "patient": write_table(os.path.join(directory, "patient.parquet"), arrow_schema(Patient, PATIENT_FIELDS),
+                               Patient.objects.order_by("id").values_list(*PATIENT_FIELDS).iterator(batch_size),
+                               batch_size),
+        "medication": write_table(os.path.join(directory, "medication.parquet"),
+                                  arrow_schema(Medication, MEDICATION_FIELDS),
+                                  Medication.objects.order_by("id").values_list(*MEDICATION_FIELDS).iterator(
+                                      batch_size), batch_size),
+    }
+    schema = arrow_schema(Prescription, PRESCRIPTION_FIELDS).append(pa.field("snapshot", pa.int32(), nullable=False))
+    # The snapshot number is a constant column added to each row
+    prescription_rows = (Prescription.objects.annotate(snapshot=models.Value(number, models.IntegerField()))
+                         .values_list(*PRESCRIPTION_FIELDS, "snapshot"))
+
+    if previous is None:
+        target = os.path.join(directory, "prescription")
+        partial, old = f"{target}.partial", f"{target}.old"
+        shutil.rmtree(partial, ignore_errors=True)
+        # Start date order: one year partition is filled, then closed, at a time
+        writer = PartitionedWriter(partial, schema, filename, batch_size, ordered=True)
+        for row in prescription_rows.order_by("start_date", "id").iterator(batch_size):
+            writer.write(row)
+        rows["prescription"] = writer.close()
+        rows["deleted"] = 0
+        os.makedirs(partial, exist_ok=True)
+        if os.path.exists(target):
+            os.replace(target, old)
+        os.replace(partial, target)
+        for name in (old, os.path.join(directory, "prescription_deleted")):
+            shutil.rmtree(name, ignore_errors=True)
+    else:
+        writer = PartitionedWriter(os.path.join(directory, "prescription"), schema, filename, batch_size)
+        deleted = DeletedWriter(os.path.join(directory, "prescription_deleted", filename), number, batch_size)
+        changed = (PrescriptionChange.objects.filter(id__gt=previous["cursor"], id__lte=head)
+                   .order_by("prescription_id").values_list("prescription_id", flat=True).distinct())
+        for ids in batched(changed.iterator(batch_size), chunk_size(prescription_rows)):
+            found = set()
+            for row in prescription_rows.filter(pk__in=ids).order_by():
+                writer.write(row)
+                found.add(row[0])
+            for pk in ids:
+                if pk not in found:
+                    deleted.write(pk)
+        rows["prescription"] = writer.close()
+        rows["deleted"] = deleted.close()
+
+    entry = {"snapshot": number, "mode": "full" if previous is None else "incremental", "cursor": head,
+             "created_at": now.isoformat(), "rows": rows}
+    manifest["snapshots"] = [entry] if previous is None else [*manifest["snapshots"], entry]
+    write_manifest(directory, manifest)
+    return entry
@@ -0,0 +1,170 @@
+"""Statistiques de prescriptions calculées en SQL, et leur agrégat mensuel matérialisé.
+
+L'agrégat (:class:`~medical.models.PrescriptionRollup`) est optionnel
+(``PRESCRIPTION_ROLLUP_ENABLED``). Chaque écriture marque le mois de début
+concerné comme « sale ». Une lecture reste en lecture seule : elle prend les
+mois à jour dans l'agrégat et compte directement les mois sales, que
+``manage.py refresh_prescription_rollup`` (à lancer périodiquement) recalcule.
+
+L'agrégat n'est lu qu'après une reconstruction complète (``--full``, qui
+enregistre une :class:`~medical.models.PrescriptionRollupBuild`). Agrégat
+désactivé, une écriture ne marque aucun mois et supprime cette ligne : jusqu'à
+la prochaine reconstruction, les statistiques sont calculées directement.
+"""
+from collections import Counter
+from datetime import date
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Prescription, PrescriptionRollup, PrescriptionRollupBuild, PrescriptionRollupDirtyMonth
+
+
+# OopCompanion:suppressRename
+
+
+# group_by name -> column of the values() query
+GROUPS = {"status": "status", "medication": "medication_id", "patient": "patient_id", "month": "month"}
+ROLLUP_GROUPS = {"status", "medication", "month"}
+ROLLUP_FILTERS = {"status", "medication"}
+
+
+def rollup_enabled():
+    return getattr(settings, "PRESCRIPTION_ROLLUP_ENABLED", False)
+
+
+def parse_group_by(values):
+    """``group_by=a,b`` ou ``group_by=a&group_by=b`` ; lève ``ValueError`` sur un nom inconnu."""
+    groups = []
+    for value in values:
+        for name in value.split(","):
+            name = name.strip()
+            if not name:
+                continue
+            if name not in GROUPS:
+                raise ValueError(name)
+            if name not in groups:
+                groups.append(name)
+    return groups
+
+
+def format_rows(rows, groups):
+    results = []
+    for row in rows:
+        item = {group: row[GROUPS[group]] for group in groups}
+        if "month" in item:
+            item["month"] = item["month"].strftime("%Y-%m")
+        item["count"] = row["count"]
+        results.append(item)
+    return results
+
+
+def grouped_counts(queryset, groups):
+    """Requête ``GROUP BY`` (non exécutée) des prescriptions de ``queryset``, triée par groupe."""
+    if "month" in groups:
+        queryset = queryset.annotate(month=TruncMonth("start_date"))
+    columns = [GROUPS[group] for group in groups]
+    return queryset.order_by().values(*columns).annotate(count=Count("pk")).order_by(*columns)
+
+
+def live_stats(queryset, groups, limit=None, offset=0):
+    """Agrégats ``GROUP BY`` sur le queryset filtré, en une requête ; groupes ``offset`` à ``offset + limit``."""
+    if not groups:
+        return [queryset.order_by().aggregate(count=Count("pk"))]
+    rows = grouped_counts(queryset, groups)
+    if limit is not None:
+        rows = rows[offset:offset + limit]
+    return format_rows(rows, groups)
+
+
+def rollup_built_at():
+    """Date de la dernière reconstruction complète encore valable, ou ``None``."""
+    return PrescriptionRollupBuild.objects.values_list("built_at", flat=True).first()
+
+
+def rollup_stats(groups, status=None, medication=None):
+    """Mêmes agrégats : table matérialisée pour les mois à jour, calcul direct pour les mois sales.
+
+    ``None`` si l'agrégat n'a pas été reconstruit depuis la dernière écriture non suivie.
+    """
+    if rollup_built_at() is None:
+        return None
+    filters = {}
+    if status:
+        filters["status"] = status
+    if medication is not None:
+        filters["medication_id"] = medication
+    dirty = list(PrescriptionRollupDirtyMonth.objects.values_list("month", flat=True))
+    stored = PrescriptionRollup.objects.order_by().exclude(month__in=dirty).filter(**filters)
+    live = Prescription.objects.filter(months_filter(dirty), **filters) if dirty else None
+    if not groups:
+        count = stored.aggregate(count=Sum("count"))["count"] or 0
+        return [{"count": count + (live.count() if live is not None else 0)}]
+
+    columns = [GROUPS[group] for group in groups]
+    counts = Counter()
+    for rows in (stored.values(*columns).annotate(count=Sum("count")),
+                 grouped_counts(live, groups) if live is not None else ()):
+        for row in rows:
+            counts[tuple(row[column] for column in columns)] += row["count"]
+    return format_rows(({**dict(zip(columns, key)), "count": count} for key, count in sorted(counts.items())),
+                       groups)
+
+
+def month_start(value):
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.replace(day=1)
+
+
+def next_month(month):
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def months_filter(months):
+    """Prescriptions dont la date de début tombe dans l'un des mois ``months``."""
+    return reduce(or_, (Q(start_date__gte=month, start_date__lt=next_month(month)) for month in months))
+
+
+def mark_dirty(dates):
+    """Marque les mois de ``dates`` à recalculer ; agrégat désactivé, le déclare à reconstruire entièrement."""
+    if not rollup_enabled():
+        # One DELETE on a table of at most one row: the untracked write must not be missed once re-enabled
+        PrescriptionRollupBuild.objects.all().delete()
+        return
+    months = {month_start(value) for value in dates if value}
+    if months:
+        PrescriptionRollupDirtyMonth.objects.bulk_create(
+            [PrescriptionRollupDirtyMonth(month=month) for month in months], ignore_conflicts=True)
+
+
+def refresh_rollup(full=False):
+    """Recalcule les mois sales (ou tout l'agrégat) ; retourne le nombre de mois recalculés."""
+    with transaction.atomic():
+        if full:
+            PrescriptionRollup.objects.all().delete()
+            PrescriptionRollupDirtyMonth.objects.all().delete()
+            source = Prescription.objects.all()
+        else:
+            months = list(PrescriptionRollupDirtyMonth.objects.values_list("month", flat=True))
+            if not months:
+                return 0
+            # Markers go first: a write committed meanwhile marks its month again
+            PrescriptionRollupDirtyMonth.objects.filter(month__in=months).delete()
+            PrescriptionRollup.objects.filter(month__in=months).delete()
+            source = Prescription.objects.filter(months_filter(months))
+
+        rows = (source.order_by().annotate(month=TruncMonth("start_date"))
+                .values("month", "status", "medication_id").annotate(count=Count("pk")))
+        PrescriptionRollup.objects.bulk_create((PrescriptionRollup(**row) for row in rows.iterator()),
+                                               batch_size=1000)
+        if full:
+            PrescriptionRollupBuild.objects.all().delete()
+            PrescriptionRollupBuild.objects.create(built_at=timezone.now())
+            return PrescriptionRollup.objects.values("month").distinct().count()
+        return len(months)
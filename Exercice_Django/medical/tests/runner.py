@@ -0,0 +1,31 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import iter_test_cases
+
+from medical.caching import response_cache
+from medical.coalescing import single_flight
+from medical.cohort import leaf_cache
+
+
+# OopCompanion:suppressRename
+
+
+def clear_process_caches():
+    response_cache.cache.clear()
+    leaf_cache.clear()
+    single_flight.clear()
+
+
+class TestRunner(DiscoverRunner):
+    """Vide les caches du processus après chaque test.
+
+    Les versions des données ne bougent qu'à la validation d'une transaction,
+    jamais atteinte dans un ``TestCase``, et reviennent en arrière avec la base
+    à la fin du test : sans cela, un test pourrait lire les réponses mises en
+    cache par un autre sur d'autres données.
+    """
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        for test in iter_test_cases(suite):
+            test.addCleanup(clear_process_caches)
+        return suite
@@ -0,0 +1,104 @@
+import random
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.caching import response_cache
+from medical.filters import PrescriptionFilter
+from medical.models import Patient, Medication, Prescription
+from medical.tests.test_pagination import link_cursor
+
+
+# OopCompanion:suppressRename
+
+
+class AsyncReadViewTests(TestCase):
+    """Les vues ``/async/...`` renvoient exactement les octets des vues DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.meds = [Medication.objects.create(code=f"MED{i:02d}", label=f"Médicament {i}",
+                                              status=Medication.STATUS_SUPPR if i % 4 == 0 else Medication.STATUS_ACTIF)
+                    for i in range(8)]
+        cls.patients = [Patient.objects.create(last_name=name, first_name=f"Prénom{i}",
+                                               birth_date="1980-02-29" if i % 2 else None)
+                        for i, name in enumerate(["Martin", "Martinez", "Lefèvre", "Dupont", "Durand"] * 3)]
+        for _ in range(120):
+            start = date(2025, 1, 1) + timedelta(days=rng.randint(0, 500))
+            Prescription.objects.create(
+                patient=rng.choice(cls.patients), medication=rng.choice(cls.meds), start_date=start,
+                end_date=start + timedelta(days=rng.choice([0, 3, 30, 400])),
+                status=rng.choice([Prescription.STATUS_VALIDE, Prescription.STATUS_EN_ATTENTE]))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def sync_get(self, basename, params, pk=None):
+        for model in (Patient, Medication, Prescription):
+            response_cache.bump(model)
+        url = reverse(f"{basename}-detail", args=[pk]) if pk is not None else reverse(f"{basename}-list")
+        return self.client.get(url, params)
+
+    async def async_get(self, basename, params, pk=None):
+        name = f"async-{basename}-detail" if pk is not None else f"async-{basename}-list"
+        return await self.async_client.get(reverse(name, args=[pk] if pk is not None else []), params)
+
+    async def assertParity(self, basename, params, pk=None):
+        with self.subTest(basename=basename, params=params, pk=pk):
+            expected = await self.sync_get_async(basename, params, pk)
+            response = await self.async_get(basename, params, pk)
+            self.assertEqual(response.status_code, expected.status_code)
+            self.assertEqual(response.content, expected.content)
+            self.assertEqual(response.get("Link", "").replace("/async", ""), expected.get("Link", ""))
+            return response
+
+    async def sync_get_async(self, basename, params, pk=None):
+        from asgiref.sync import sync_to_async
+
+        return await sync_to_async(self.sync_get)(basename, params, pk)
+
+    async def test_lists_and_filters(self):
+        cases = [
+            ("patient", {}), ("patient", {"nom": "mart"}), ("patient", {"q": "dup"}),
+            ("patient", {"id": f"{self.patients[0].pk},{self.patients[3].pk}"}),
+            ("patient", {"date_naissance": "1980-02-29", "page_size": 3}),
+            ("medication", {}), ("medication", {"status": "suppr"}), ("medication", {"q": "med0"}),
+            ("prescription", {}), ("prescription", {"status": "valide", "page_size": 7}),
+            ("prescription", {"patient": self.patients[1].pk, "active_on": "2025-06-01"}),
+            ("prescription", {"active_on": "2025-06-01"}),
+            ("prescription", {"overlaps": "2025-03-01,2025-04-30", "medication": self.meds[2].pk}),
+            ("prescription", {"start_date__gte": "2025-05-01", "end_date__lte": "2025-12-31"}),
+        ]
+        for basename, params in cases:
+            await self.assertParity(basename, params)
+
+    async def test_interval_probe_both_paths(self):
+        for probe in (None, 5):
+            with mock.patch.object(PrescriptionFilter, "interval_probe", probe):
+                await self.assertParity("prescription", {"active_on": "2025-09-01", "page_size": 1000})
+                await self.assertParity("prescription", {"active_on": "2025-09-01", "overlaps": "2025-08-01,2025-10-01"})
+
+    async def test_cursor_pages(self):
+        response = await self.assertParity("prescription", {"page_size": 25})
+        cursor = link_cursor(response, "next")
+        response = await self.assertParity("prescription", {"page_size": 25, "cursor": cursor})
+        await self.assertParity("prescription", {"page_size": 25, "cursor": link_cursor(response, "prev")})
+        await self.assertParity("patient", {"q": "mart", "page_size": 2, "cursor": cursor})
+
+    async def test_detail(self):
+        await self.assertParity("patient", {}, pk=self.patients[2].pk)
+        await self.assertParity("medication", {}, pk=self.meds[3].pk)
+        prescription = await Prescription.objects.afirst()
+        await self.assertParity("prescription", {}, pk=prescription.pk)
+        # Filters apply to the detail too
+        await self.assertParity("prescription", {"status": "annule"}, pk=prescription.pk)
+
+    async def test_errors(self):
+        await self.assertParity("patient", {}, pk=0)
+        await self.assertParity("patient", {}, pk="abc")
+        await self.assertParity("prescription", {"active_on": "not-a-date"})
+        await self.assertParity("prescription", {"cursor": "garbage"})
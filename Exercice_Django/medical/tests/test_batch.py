@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical import batch
+from medical.caching import response_cache
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+class IdFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.patients = [Patient.objects.create(last_name=f"Nom{i}", first_name="Jean") for i in range(6)]
+        cls.prescriptions = [Prescription.objects.create(patient=p, medication=cls.med, start_date="2026-02-01",
+                                                         end_date="2026-02-10") for p in cls.patients]
+
+    def setUp(self):
+        self.client = APIClient()
+        for model in (Patient, Medication, Prescription):
+            response_cache.bump(model)
+
+    def ids(self, basename, query):
+        r = self.client.get(f"{reverse(f'{basename}-list')}?{query}")
+        self.assertEqual(r.status_code, 200, r.content)
+        return sorted(row["id"] for row in r.json())
+
+    def test_every_resource(self):
+        patients = [p.pk for p in self.patients[:3]]
+        prescriptions = [p.pk for p in self.prescriptions[2:4]]
+        self.assertEqual(self.ids("patient", f"id={patients[0]},{patients[1]},{patients[2]}"), patients)
+        self.assertEqual(self.ids("patient", f"id={patients[0]}&id={patients[2]}"), [patients[0], patients[2]])
+        self.assertEqual(self.ids("medication", f"id={self.med.pk}"), [self.med.pk])
+        self.assertEqual(self.ids("prescription", f"id={prescriptions[0]},{prescriptions[1]}"), prescriptions)
+
+    def test_single_in_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.ids("patient", "id=" + ",".join(str(p.pk) for p in self.patients))
+        # Besides the data versions of the response cache
+        patient_queries = [query["sql"] for query in queries if '"medical_patient"' in query["sql"]]
+        self.assertEqual(len(patient_queries), 1)
+        self.assertIn(" IN (", patient_queries[0])
+
+    def test_never_a_full_scan(self):
+        self.assertEqual(self.ids("patient", "id="), [])
+        self.assertEqual(self.ids("patient", "id=,"), [])
+        r = self.client.get(reverse("patient-list"), {"id": "1,abc"})
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("id", r.json())
+
+    def test_too_many_ids(self):
+        r = self.client.get(reverse("prescription-list"), {"id": ",".join(map(str, range(1, batch.CHUNK_SIZE + 2)))})
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("batch_get", r.json()["id"][0])
+
+
+class BatchGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.patients = [Patient.objects.create(last_name=f"Nom{i}", first_name="Jean") for i in range(5)]
+        Prescription.objects.create(patient=cls.patients[0], medication=cls.med, start_date="2026-02-01",
+                                    end_date="2026-02-10")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def post(self, basename, body, query=""):
+        return self.client.post(reverse(f"{basename}-batch-get") + query, body, format="json")
+
+    def test_results_follow_request_order(self):
+        wanted = [self.patients[3].pk, self.patients[0].pk, 999999, self.patients[3].pk]
+        r = self.post("patient", {"ids": wanted})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual([row["id"] for row in r.json()["results"]], [self.patients[3].pk, self.patients[0].pk])
+        self.assertEqual(r.json()["missing"], [999999])
+        self.assertEqual(r.json()["results"][0]["last_name"], "Nom3")
+
+    def test_every_resource(self):
+        prescription = Prescription.objects.get()
+        self.assertEqual(self.post("medication", [self.med.pk]).json()["results"][0]["code"], "PARA500")
+        self.assertEqual(self.post("prescription", {"ids": [prescription.pk]}).json()["results"][0]["patient"],
+                         self.patients[0].pk)
+
+    def test_large_lists_are_chunked(self):
+        ids = [p.pk for p in self.patients]
+        with mock.patch.object(batch, "CHUNK_SIZE", 2), self.assertNumQueries(3):
+            r = self.post("patient", {"ids": ids})
+        self.assertEqual([row["id"] for row in r.json()["results"]], ids)
+
+    def test_expand(self):
+        r = self.post("patient", {"ids": [self.patients[0].pk]}, query="?expand=prescriptions")
+        self.assertEqual(len(r.json()["results"][0]["prescriptions"]), 1)
+
+    @override_settings(BATCH_GET_MAX_IDS=3)
+    def test_invalid_requests(self):
+        for body in ({"ids": [1, 2, 3, 4]}, {"ids": "1,2"}, {"ids": [1, "x"]}, {"ids": [True]}, {}):
+            with self.subTest(body=body):
+                r = self.post("patient", body)
+                self.assertEqual(r.status_code, 400)
+                self.assertIn("ids", r.json())
@@ -0,0 +1,78 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+class PrescriptionBulkTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-bulk")
+        self.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.existing = Prescription.objects.create(patient=self.patient, medication=self.med,
+                                                    start_date="2026-02-01", end_date="2026-02-10")
+
+    def row(self, **overrides):
+        data = {"patient": self.patient.id, "medication": self.med.id,
+                "start_date": "2026-03-01", "end_date": "2026-03-05", "status": Prescription.STATUS_VALIDE}
+        data.update(overrides)
+        return data
+
+    def test_bulk_create_json_array(self):
+        r = self.client.post(self.url, [self.row(), self.row(comment="second")], format="json")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.json()["created"]), 2)
+        self.assertEqual(r.json()["errors"], [])
+        self.assertEqual(Prescription.objects.count(), 3)
+
+    def test_bulk_create_ndjson(self):
+        body = "\n".join(json.dumps(self.row()) for _ in range(3)) + "\n"
+        r = self.client.post(self.url, body, content_type="application/x-ndjson")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.json()["created"]), 3)
+
+    def test_bulk_update_keeps_missing_fields(self):
+        r = self.client.post(self.url, [{"id": self.existing.id, "status": Prescription.STATUS_SUPPR}],
+                             format="json")
+        self.assertEqual(r.json()["updated"], [self.existing.id])
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.status, Prescription.STATUS_SUPPR)
+        self.assertEqual(str(self.existing.end_date), "2026-02-10")
+
+    def test_per_row_error_report(self):
+        rows = [
+            self.row(),
+            self.row(patient=999999),
+            self.row(end_date="2026-02-01"),
+            {"id": 999999, "status": Prescription.STATUS_SUPPR},
+            {"id": self.existing.id, "end_date": "2026-01-01"},
+            "not an object",
+        ]
+        r = self.client.post(self.url, rows, format="json")
+        self.assertEqual(r.status_code, 200)
+        errors = {e["index"]: e["errors"] for e in r.json()["errors"]}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4, 5])
+        self.assertIn("patient", errors[1])
+        self.assertIn("id", errors[3])
+        self.assertEqual(len(r.json()["created"]), 1)
+        self.assertEqual(Prescription.objects.count(), 2)
+
+    def test_references_checked_with_one_query_per_model(self):
+        other = Patient.objects.create(last_name="Durand", first_name="Jean")
+        rows = [self.row(patient=pid) for pid in (self.patient.id, other.id) * 50]
+        # savepoint + patients IN + medications IN + bulk INSERT + rollup build DELETE (rollup disabled)
+        # + change log INSERT + release
+        with self.assertNumQueries(7):
+            r = self.client.post(self.url, rows, format="json")
+        self.assertEqual(len(r.json()["created"]), 100)
+
+    def test_body_must_be_a_list(self):
+        r = self.client.post(self.url, self.row(), format="json")
+        self.assertEqual(r.status_code, 400)
@@ -0,0 +1,127 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.caching import response_cache
+from medical.models import Patient, Medication, DataVersion
+
+
+# OopCompanion:suppressRename
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        Patient.objects.create(last_name="Durand", first_name="Jean")
+        self.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        response_cache.reset_stats()
+
+    def test_second_list_is_served_without_queries(self):
+        url = reverse("patient-list")
+        first = self.client.get(url, {"nom": "mart"})
+        self.assertEqual(first["X-Cache"], "MISS")
+        # Only the data versions
+        with self.assertNumQueries(1):
+            second = self.client.get(url, {"nom": "mart"})
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(response_cache.stats()["hits"], 1)
+
+    def test_query_string_is_normalized(self):
+        url = reverse("patient-list")
+        self.client.get(url + "?nom=mart&prenom=je")
+        r = self.client.get(url + "?prenom=je&nom=mart&format=json")
+        self.assertEqual(r["X-Cache"], "HIT")
+
+    def test_write_invalidates_only_its_model(self):
+        patients, medications = reverse("patient-list"), reverse("medication-list")
+        self.client.get(patients)
+        self.client.get(medications)
+        with self.captureOnCommitCallbacks(execute=True):
+            Patient.objects.create(last_name="Bernard", first_name="Paul")
+        r = self.client.get(patients)
+        self.assertEqual(r["X-Cache"], "MISS")
+        self.assertEqual(len(r.json()), 3)
+        self.assertEqual(self.client.get(medications)["X-Cache"], "HIT")
+
+    def test_detail_is_cached_and_invalidated_on_delete(self):
+        url = reverse("medication-detail", args=[self.med.id])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.med.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_write_from_another_process_invalidates(self):
+        url = reverse("patient-list")
+        self.client.get(url)
+        # Another worker or a command: no signal in this process, only the version stored in the database
+        Patient.objects.bulk_create([Patient(last_name="Bernard", first_name="Paul")])
+        version, = response_cache.versions([Patient])
+        DataVersion.objects.update_or_create(model="medical.patient", defaults={"version": version + 1})
+        r = self.client.get(url)
+        self.assertEqual((r["X-Cache"], len(r.json())), ("MISS", 3))
+
+    def test_versions_change_only_once_the_write_is_committed(self):
+        url = reverse("patient-list")
+        self.client.get(url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Patient.objects.create(last_name="Bernard", first_name="Paul")
+            # A concurrent read before the commit still gets, and would cache, the previous rows
+            self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        for callback in callbacks:
+            callback()
+        r = self.client.get(url)
+        self.assertEqual((r["X-Cache"], len(r.json())), ("MISS", 3))
+
+    def test_stats_endpoint_is_admin_only(self):
+        url = reverse("cache-stats")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        admin = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        self.client.force_authenticate(admin)
+        r = self.client.get(url)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(set(r.json()), {"hits", "misses", "hit_ratio"})
+
+
+@override_settings(DATA_VERSIONS_STORE="cache")
+class CachedVersionsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Patient.objects.create(last_name="Martin", first_name="Jeanne")
+
+    def test_cached_read_runs_no_query(self):
+        url = reverse("patient-list")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            r = self.client.get(url)
+        self.assertEqual(r["X-Cache"], "HIT")
+
+    def test_bump_increments_the_cached_version_without_sql(self):
+        version, = response_cache.versions([Patient])
+        with self.assertNumQueries(0):
+            response_cache.bump(Patient)
+        self.assertEqual(response_cache.versions([Patient]), [version + 1])
+
+    def test_write_invalidates(self):
+        url = reverse("patient-list")
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Patient.objects.create(last_name="Bernard", first_name="Paul")
+        r = self.client.get(url)
+        self.assertEqual((r["X-Cache"], len(r.json())), ("MISS", 2))
+
+    def test_evicted_version_is_seeded_above_every_previous_one(self):
+        url = reverse("patient-list")
+        self.client.get(url)
+        version, = response_cache.versions([Patient])
+        # The version key is culled while a stale response remains
+        response_cache.cache.delete(response_cache.version_prefix + "medical.patient")
+        Patient.objects.bulk_create([Patient(last_name="Bernard", first_name="Paul")])
+        seeded, = response_cache.versions([Patient])
+        self.assertGreater(seeded, version)
+        r = self.client.get(url)
+        self.assertEqual((r["X-Cache"], len(r.json())), ("MISS", 2))
+        self.assertEqual(DataVersion.objects.get(model="medical.patient").version, seeded)
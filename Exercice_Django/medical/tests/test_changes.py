@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from medical import changes
+from medical.models import Patient, Medication, Prescription, PrescriptionChange
+
+
+# OopCompanion:suppressRename
+
+
+class PrescriptionChangeFeedTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-changes")
+        self.patient = Patient.objects.create(last_name="Martin", first_name="Jean")
+        self.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+
+    def create(self, **extra):
+        r = self.client.post(reverse("prescription-list"), {
+            "patient": self.patient.pk, "medication": self.med.pk, "start_date": "2026-02-01",
+            "end_date": "2026-02-10", **extra}, format="json")
+        self.assertEqual(r.status_code, 201)
+        return r.json()["id"]
+
+    def feed(self, since, **params):
+        r = self.client.get(self.url, {"since": since, **params})
+        self.assertEqual(r.status_code, 200, r.content)
+        return r.json()
+
+    def test_sync_follows_creates_updates_and_deletes(self):
+        head = self.client.get(self.url).json()
+        self.assertEqual(head["changes"], [])
+
+        first = self.create()
+        second = self.create(comment="Initial")
+        self.client.patch(reverse("prescription-detail", args=[second]), {"comment": "Modifié"}, format="json")
+        self.client.delete(reverse("prescription-detail", args=[first]))
+
+        batch = self.feed(head["next"])
+        self.assertEqual([(c["prescription"], c["action"]) for c in batch["changes"]],
+                         [(first, "create"), (second, "create"), (second, "update"), (first, "delete")])
+        # Every entry carries the current state; deleted prescriptions have none
+        self.assertIsNone(batch["changes"][0]["data"])
+        self.assertEqual(batch["changes"][1]["data"]["comment"], "Modifié")
+        self.assertFalse(batch["has_more"])
+
+        self.assertEqual(self.feed(batch["next"])["changes"], [])
+        third = self.create()
+        self.assertEqual([c["prescription"] for c in self.feed(batch["next"])["changes"]], [third])
+
+    def test_batches_and_cursor(self):
+        head = self.client.get(self.url).json()["next"]
+        created = [self.create() for _ in range(5)]
+        seen, cursor = [], head
+        while True:
+            batch = self.feed(cursor, limit=2)
+            seen.extend(c["prescription"] for c in batch["changes"])
+            cursor = batch["next"]
+            if not batch["has_more"]:
+                break
+        self.assertEqual(seen, created)
+
+    def test_cost_does_not_depend_on_table_size(self):
+        head = self.client.get(self.url).json()["next"]
+        self.create()
+        Prescription.objects.bulk_create(
+            Prescription(patient=self.patient, medication=self.med, start_date="2026-01-01", end_date="2026-01-02")
+            for _ in range(500))
+        # change log page + current state of the changed prescriptions
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.feed(head)["changes"]), 1)
+
+    def test_change_rolls_back_with_the_write(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Prescription.objects.create(patient=self.patient, medication=self.med, start_date="2026-02-01",
+                                        end_date="2026-02-10")
+            raise RuntimeError
+        failing = mock.patch.object(changes.PrescriptionChange.objects, "bulk_create", side_effect=RuntimeError)
+        with self.assertRaises(RuntimeError), failing:
+            Prescription.objects.create(patient=self.patient, medication=self.med, start_date="2026-02-01",
+                                        end_date="2026-02-10")
+        self.assertFalse(Prescription.objects.exists())
+        self.assertFalse(PrescriptionChange.objects.exists())
+
+    def test_bulk_import_is_logged(self):
+        head = self.client.get(self.url).json()["next"]
+        existing = self.create()
+        r = self.client.post(reverse("prescription-bulk"), [
+            {"patient": self.patient.pk, "medication": self.med.pk, "start_date": "2026-03-01",
+             "end_date": "2026-03-02"},
+            {"id": existing, "status": "suppr"},
+        ], format="json")
+        created = r.json()["created"][0]
+        self.assertEqual([(c["prescription"], c["action"]) for c in self.feed(head)["changes"]],
+                         [(existing, "create"), (created, "create"), (existing, "update")])
+
+    def test_invalid_and_expired_cursors(self):
+        r = self.client.get(self.url, {"since": "garbage"})
+        self.assertEqual(r.status_code, 400)
+        old = changes.encode_cursor(0, timezone.now() - timedelta(days=31))
+        with override_settings(PRESCRIPTION_CHANGES_RETENTION_DAYS=30):
+            r = self.client.get(self.url, {"since": old})
+        self.assertEqual(r.status_code, 410)
+
+    def test_compaction_and_retention(self):
+        head = self.client.get(self.url).json()["next"]
+        kept = self.create()
+        for comment in ("a", "b", "c"):
+            self.client.patch(reverse("prescription-detail", args=[kept]), {"comment": comment}, format="json")
+        expired = self.create()
+        PrescriptionChange.objects.filter(prescription_id=expired).update(
+            changed_at=timezone.now() - timedelta(days=60))
+
+        out = StringIO()
+        call_command("compact_prescription_changes", stdout=out)
+        self.assertIn("Purged 1 expired and 3 superseded", out.getvalue())
+        batch = self.feed(head)["changes"]
+        self.assertEqual([(c["prescription"], c["action"], c["data"]["comment"]) for c in batch],
+                         [(kept, "update", "c")])
@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.coalescing import single_flight
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+def create_prescriptions(count):
+    patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+    med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+    for i in range(count):
+        Prescription.objects.create(patient=patient, medication=med, start_date=date(2026, 1, 1 + i % 28),
+                                    end_date=date(2026, 2, 1))
+    return patient, med
+
+
+class CoalescingStressTests(TransactionTestCase):
+    def setUp(self):
+        create_prescriptions(30)
+        single_flight.clear()
+        single_flight.reset_stats()
+
+    def concurrent_get(self, callers, params):
+        """``callers`` threads demandent la même liste au même instant ; retourne (réponses, requêtes SQL)."""
+        barrier = threading.Barrier(callers)
+        lock = threading.Lock()
+        responses, statements = [], []
+
+        def slow_prescription_selects(execute, sql, params, many, context):
+            if sql.lstrip().startswith("SELECT") and '"medical_prescription"' in sql:
+                with lock:
+                    statements.append(sql)
+                # Keeps the first request in flight while the others arrive
+                time.sleep(0.2)
+            return execute(sql, params, many, context)
+
+        def call():
+            try:
+                with connection.execute_wrapper(slow_prescription_selects):
+                    barrier.wait()
+                    response = APIClient().get(reverse("prescription-list"), params)
+                with lock:
+                    responses.append(response)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses, statements
+
+    @override_settings(COALESCE_TTL=0)
+    def test_sql_runs_once_under_concurrent_callers(self):
+        _, alone = self.concurrent_get(1, {"status": "valide", "page_size": 10})
+        single_flight.reset_stats()
+
+        responses, statements = self.concurrent_get(20, {"page_size": 10, "status": "valide"})
+        self.assertEqual(len(statements), len(alone))
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertEqual(len({response.content for response in responses}), 1)
+        self.assertEqual(len({response["Link"] for response in responses}), 1)
+        self.assertEqual(len(responses[0].json()), 10)
+        stats = single_flight.stats()
+        self.assertEqual((stats["computed"], stats["coalesced_in_flight"]), (1, 19))
+        self.assertEqual(stats["coalesced_ratio"], 0.95)
+
+    @override_settings(COALESCE_LIST_REQUESTS=False)
+    def test_without_coalescing_every_caller_queries(self):
+        _, alone = self.concurrent_get(1, {"status": "valide"})
+        _, statements = self.concurrent_get(5, {"status": "valide"})
+        self.assertEqual(len(statements), 5 * len(alone))
+
+
+class CoalescingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient, cls.med = create_prescriptions(5)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-list")
+        single_flight.clear()
+        single_flight.reset_stats()
+
+    @override_settings(COALESCE_TTL=60)
+    def test_recent_result_is_reused_until_a_write(self):
+        first = self.client.get(self.url, {"patient": self.patient.pk})
+        # Only the data versions
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, {"patient": str(self.patient.pk)})
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        # Other parameters or format: another computation
+        self.client.get(self.url, {"patient": self.patient.pk, "page_size": 2})
+        self.assertEqual(single_flight.stats()["computed"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Prescription.objects.create(patient=self.patient, medication=self.med, start_date=date(2026, 5, 1),
+                                        end_date=date(2026, 5, 2))
+        third = self.client.get(self.url, {"patient": self.patient.pk})
+        self.assertEqual(len(third.json()), 6)
+        stats = single_flight.stats()
+        self.assertEqual((stats["computed"], stats["coalesced_recent"]), (3, 1))
+
+    @override_settings(COALESCE_TTL=60)
+    def test_conditional_and_invalid_requests_are_not_shared(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, {"start_date__gte": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"start_date__gte": "x"}).status_code, 400)
+        self.assertEqual(single_flight.stats()["coalesced_recent"], 0)
+
+    def test_stats_endpoint_is_admin_only(self):
+        url = reverse("coalescing-stats")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_authenticate(User.objects.create_superuser("admin", "admin@example.com", "secret"))
+        self.assertEqual(set(self.client.get(url).json()), {"computed", "coalesced_in_flight", "coalesced_recent",
+                                                            "coalesced_ratio", "in_flight", "ttl"})
@@ -0,0 +1,213 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.caching import response_cache
+from medical.cohort import PatientSet, leaf_cache
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+class PatientSetTests(SimpleTestCase):
+    def test_set_operations(self):
+        a, b = PatientSet.from_ids([1, 5, 9, 200, 5]), PatientSet.from_ids([5, 200, 3000])
+        self.assertEqual(list(a), [1, 5, 9, 200])
+        self.assertEqual(len(a), 4)
+        self.assertEqual(list(a & b), [5, 200])
+        self.assertEqual(list(a | b), [1, 5, 9, 200, 3000])
+        self.assertEqual(list(a - b), [1, 9])
+        self.assertEqual(list(a.ids(after=5)), [9, 200])
+        self.assertEqual(list(PatientSet.from_ids([])), [])
+
+
+class CohortTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.meds = [Medication.objects.create(code=f"MED{i}", label=f"Médicament {i}") for i in range(4)]
+        cls.patients = [Patient.objects.create(last_name=f"Nom{i}", first_name="Jean",
+                                               birth_date=date(1930, 1, 1) + timedelta(days=rng.randint(0, 25000)))
+                        for i in range(60)]
+        cls.prescriptions = []
+        for _ in range(250):
+            start = date(2024, 6, 1) + timedelta(days=rng.randint(0, 700))
+            cls.prescriptions.append(Prescription.objects.create(
+                patient=rng.choice(cls.patients), medication=rng.choice(cls.meds), start_date=start,
+                end_date=start + timedelta(days=rng.choice([0, 10, 90])),
+                status=rng.choice([Prescription.STATUS_VALIDE, Prescription.STATUS_EN_ATTENTE])))
+
+    def setUp(self):
+        self.client = APIClient()
+        # Test rollbacks send no signals: entries cached by another test could be stale
+        leaf_cache.clear()
+        leaf_cache.reset_stats()
+
+    def post(self, name, body):
+        return self.client.post(reverse(f"cohort-{name}"), body, format="json")
+
+    def takers(self, medication, status=None, year=None):
+        return {p.patient_id for p in self.prescriptions
+                if p.medication_id == medication.pk and status in (None, p.status)
+                and (year is None or (p.start_date <= date(year, 12, 31) and p.end_date >= date(year, 1, 1)))}
+
+    def test_example_cohort(self):
+        m, n = self.meds[0], self.meds[1]
+        criteria = {"and": [
+            {"prescription": {"medication": m.pk, "status": "valide", "overlaps": ["2025-01-01", "2025-12-31"]}},
+            {"patient": {"birth_date__lte": "1959-12-31"}},
+            {"not": {"prescription": {"medication": n.pk}}},
+        ]}
+        expected = {p.pk for p in self.patients if p.birth_date <= date(1959, 12, 31)}
+        expected &= self.takers(m, "valide", 2025)
+        expected -= self.takers(n)
+
+        # Data versions, one query per leaf, no universe query for a NOT under an AND
+        with self.assertNumQueries(4):
+            r = self.post("count", {"criteria": criteria})
+        self.assertEqual(r.status_code, 200, r.content)
+        data = r.json()
+        self.assertEqual(data["count"], len(expected))
+        self.assertEqual([leaf["path"] for leaf in data["leaves"]], [
+            "criteria.and[0].prescription", "criteria.and[1].patient", "criteria.and[2].not.prescription"])
+        self.assertTrue(all(leaf["ms"] >= 0 and "count" in leaf for leaf in data["leaves"]))
+
+        r = self.post("ids", {"criteria": criteria})
+        self.assertEqual(r.json()["ids"], sorted(expected))
+
+    def test_or_and_top_level_not(self):
+        a, b = self.meds[2], self.meds[3]
+        r = self.post("count", {"criteria": {"or": [{"prescription": {"medication": a.pk}},
+                                                    {"prescription": {"medication": b.pk}}]}})
+        self.assertEqual(r.json()["count"], len(self.takers(a) | self.takers(b)))
+
+        r = self.post("count", {"criteria": {"not": {"prescription": {"medication": a.pk}}}})
+        self.assertEqual(r.json()["count"], len({p.pk for p in self.patients} - self.takers(a)))
+        self.assertIn("universe", [leaf["path"] for leaf in r.json()["leaves"]])
+
+    def test_ids_pages(self):
+        criteria = {"patient": {"nom": "nom"}}
+        ids, after = [], None
+        while True:
+            data = self.post("ids", {"criteria": criteria, "limit": 25, "after": after}).json()
+            ids.extend(data["ids"])
+            after = data["next_after"]
+            if after is None:
+                break
+        self.assertEqual(ids, sorted(p.pk for p in self.patients))
+
+    def test_ids_invalid_page(self):
+        criteria = {"patient": {"nom": "nom"}}
+        r = self.post("ids", [{"criteria": criteria}])
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("non_field_errors", r.json())
+        r = self.post("ids", {"criteria": criteria, "after": -5})
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("after", r.json())
+        r = self.post("ids", {"criteria": criteria, "limit": "many"})
+        self.assertEqual(r.status_code, 400)
+
+    def test_invalid_criteria(self):
+        cases = [
+            ({}, "criteria"),
+            ({"criteria": {"xor": []}}, "criteria"),
+            ({"criteria": {"and": []}}, "criteria.and"),
+            ({"criteria": {"and": [{"patient": {"shoe_size": 42}}]}}, "criteria.and[0].patient"),
+            ({"criteria": {"prescription": {"active_on": "yesterday"}}}, "criteria.prescription"),
+            ({"criteria": {"or": [{"patient": {}}] * 40}}, "criteria"),
+        ]
+        for body, path in cases:
+            with self.subTest(body=body):
+                r = self.post("count", body)
+                self.assertEqual(r.status_code, 400)
+                self.assertIn(path, r.json())
+
+
+class CohortCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(code="MED0", label="Médicament")
+        cls.patients = [Patient.objects.create(last_name=f"Nom{i}", first_name="Jean", birth_date=date(1950 + i, 1, 1))
+                        for i in range(10)]
+        for patient in cls.patients[:6]:
+            Prescription.objects.create(patient=patient, medication=cls.med, start_date=date(2025, 3, 1),
+                                        end_date=date(2025, 3, 31), status=Prescription.STATUS_VALIDE)
+
+    def setUp(self):
+        self.client = APIClient()
+        leaf_cache.clear()
+        leaf_cache.reset_stats()
+        self.criteria = {"and": [
+            {"prescription": {"medication": self.med.pk, "overlaps": ["2025-01-01", "2025-12-31"]}},
+            {"patient": {"birth_date__lte": "1954-12-31"}},
+        ]}
+
+    def count(self, criteria):
+        return self.client.post(reverse("cohort-count"), {"criteria": criteria}, format="json").json()
+
+    def test_repeated_leaves_are_served_from_cache(self):
+        self.assertEqual(self.count(self.criteria)["count"], 5)
+        # Only the data versions
+        with self.assertNumQueries(1):
+            data = self.count(self.criteria)
+        self.assertEqual(data["count"], 5)
+        self.assertEqual([leaf["cached"] for leaf in data["leaves"]], [True, True])
+
+        # Same filters spelled differently, refined with a new leaf: only the new leaf and the versions are read
+        refined = {"and": [
+            {"patient": {"birth_date__lte": "1954-12-31 "}},
+            {"prescription": {"overlaps": "2025-01-01,2025-12-31", "medication": str(self.med.pk)}},
+            {"patient": {"prenom": "jean"}},
+        ]}
+        with self.assertNumQueries(2):
+            data = self.count(refined)
+        self.assertEqual([leaf["cached"] for leaf in data["leaves"]], [True, True, False])
+
+    def test_writes_invalidate_only_leaves_reading_the_model(self):
+        self.count(self.criteria)
+        with self.captureOnCommitCallbacks(execute=True):
+            Prescription.objects.create(patient=self.patients[1], medication=self.med, start_date=date(2025, 6, 1),
+                                        end_date=date(2025, 6, 2))
+        self.assertEqual(leaf_cache.stats()["entries"], 1)
+        data = self.count(self.criteria)
+        self.assertEqual([leaf["cached"] for leaf in data["leaves"]], [False, True])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patients[0].delete()
+        data = self.count(self.criteria)
+        self.assertEqual(data["count"], 4)
+        self.assertEqual([leaf["cached"] for leaf in data["leaves"]], [False, False])
+
+    def test_writes_without_signals_make_entries_stale(self):
+        self.count(self.criteria)
+        Prescription.objects.filter(patient=self.patients[2]).update(medication=Medication.objects.create(
+            code="MED1", label="Autre"))
+        # bulk writers and other processes only bump the shared model version
+        response_cache.bump(Prescription)
+        data = self.count(self.criteria)
+        self.assertEqual(data["count"], 4)
+        self.assertEqual([leaf["cached"] for leaf in data["leaves"]], [False, True])
+
+    @override_settings(COHORT_CACHE_MAX_ENTRIES=1)
+    def test_lru_bound(self):
+        self.count(self.criteria)
+        stats = leaf_cache.stats()
+        self.assertEqual((stats["entries"], stats["evictions"]), (1, 1))
+        self.assertGreater(stats["bytes"], 0)
+        # The patient leaf, evaluated last, is the one kept
+        data = self.count({"patient": {"birth_date__lte": "1954-12-31"}})
+        self.assertTrue(data["leaves"][0]["cached"])
+
+    def test_stats_endpoint_is_admin_only(self):
+        url = reverse("cohort-cache-stats")
+        self.assertIn(self.client.get(url).status_code, (401, 403))
+        self.count(self.criteria)
+        self.count(self.criteria)
+        self.client.force_authenticate(User.objects.create_superuser("admin", "admin@example.com", "secret"))
+        stats = self.client.get(url).json()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"], stats["hit_ratio"]), (2, 2, 2, 0.5))
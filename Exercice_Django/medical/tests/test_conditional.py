@@ -0,0 +1,109 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.caching import response_cache
+from medical.models import Patient, Medication, Prescription, DataVersion
+
+
+# OopCompanion:suppressRename
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.prescription = Prescription.objects.create(patient=self.patient, medication=self.med,
+                                                        start_date="2026-02-01", end_date="2026-02-10")
+
+    def test_list_etag_is_weak_and_detail_etag_is_strong(self):
+        self.assertTrue(self.client.get(reverse("prescription-list"))["ETag"].startswith('W/"'))
+        detail = self.client.get(reverse("prescription-detail", args=[self.prescription.id]))
+        self.assertTrue(detail["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", detail)
+
+    def test_lists_have_no_last_modified(self):
+        # The newest updated_at of a page does not change when one of its rows is deleted
+        for url in (reverse("prescription-list"), reverse("patient-list")):
+            self.assertNotIn("Last-Modified", self.client.get(url))
+
+    def test_row_appended_after_a_full_last_page_changes_the_etag(self):
+        url = reverse("prescription-list")
+        first = self.client.get(url, {"page_size": 1})
+        self.assertNotIn("Link", first)
+        Prescription.objects.create(patient=self.patient, medication=self.med,
+                                    start_date="2026-03-01", end_date="2026-03-10")
+        r = self.client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(r.status_code, 200)
+        self.assertIn('rel="next"', r["Link"])
+
+    def test_unchanged_prescription_list_returns_304(self):
+        url = reverse("prescription-list")
+        # The validator comes from the page list() reads: no second read, with or without If-None-Match
+        # (the data versions are read for the coalescing key, which conditional requests skip)
+        with self.assertNumQueries(2):
+            etag = self.client.get(url, {"patient": self.patient.id})["ETag"]
+        with self.assertNumQueries(1):
+            r = self.client.get(url, {"patient": self.patient.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+
+    def test_sparse_fields_list_etag(self):
+        url = reverse("prescription-list")
+        r = self.client.get(url, {"fields": "comment"})
+        self.assertEqual(list(r.json()[0]), ["comment"])
+        self.assertEqual(self.client.get(url, {"fields": "comment"}, HTTP_IF_NONE_MATCH=r["ETag"]).status_code, 304)
+        self.prescription.comment = "Changé"
+        self.prescription.save()
+        self.assertEqual(self.client.get(url, {"fields": "comment"}, HTTP_IF_NONE_MATCH=r["ETag"]).status_code, 200)
+
+    def test_update_changes_prescription_etags(self):
+        list_url = reverse("prescription-list")
+        detail_url = reverse("prescription-detail", args=[self.prescription.id])
+        list_etag = self.client.get(list_url)["ETag"]
+        detail_etag = self.client.get(detail_url)["ETag"]
+        self.client.patch(detail_url, {"status": Prescription.STATUS_SUPPR}, format="json")
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+
+    def test_delete_changes_list_etag(self):
+        other = Prescription.objects.create(patient=self.patient, medication=self.med,
+                                            start_date="2026-01-01", end_date="2026-01-10")
+        url = reverse("prescription-list")
+        etag = self.client.get(url)["ETag"]
+        other.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_filters(self):
+        url = reverse("prescription-list")
+        etag = self.client.get(url)["ETag"]
+        r = self.client.get(url, {"status": Prescription.STATUS_VALIDE}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+
+    def test_if_modified_since(self):
+        url = reverse("prescription-detail", args=[self.prescription.id])
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_patient_and_medication_use_model_versions(self):
+        for url in (reverse("patient-list"), reverse("medication-detail", args=[self.med.id])):
+            etag = self.client.get(url)["ETag"]
+            # Only the data versions
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        etag = self.client.get(reverse("patient-list"))["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Patient.objects.create(last_name="Durand", first_name="Jean")
+        self.assertEqual(self.client.get(reverse("patient-list"), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_write_from_another_process_changes_patient_etag(self):
+        url = reverse("patient-list")
+        etag = self.client.get(url)["ETag"]
+        # seed_demo, import_fhir or another worker: only the version stored in the database changes here
+        version, = response_cache.versions([Patient])
+        DataVersion.objects.update_or_create(model="medical.patient", defaults={"version": version + 1})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_detail_is_404(self):
+        self.assertEqual(self.client.get(reverse("prescription-detail", args=[999999])).status_code, 404)
+        self.assertEqual(self.client.get("/Prescription/abc").status_code, 404)
@@ -0,0 +1,58 @@
+import os
+import runpy
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+
+# OopCompanion:suppressRename
+
+
+class SQLiteTuningTests(SimpleTestCase):
+    """``SQLITE_PRAGMAS`` est appliqué à chaque nouvelle connexion (signal ``connection_created``)."""
+
+    def open(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = DatabaseWrapper({**connection.settings_dict, "NAME": os.path.join(directory.name, "db.sqlite3")},
+                                  alias="tuning")
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragmas(self, wrapper, *names):
+        with wrapper.cursor() as cursor:
+            return [cursor.execute(f"PRAGMA {name}").fetchone()[0] for name in names]
+
+    @override_settings(SQLITE_PRAGMAS={"journal_mode": "WAL", "synchronous": "NORMAL", "mmap_size": 1048576,
+                                       "busy_timeout": 1234})
+    def test_pragmas_applied_on_connection(self):
+        wrapper = self.open()
+        self.assertEqual(self.pragmas(wrapper, "journal_mode", "synchronous", "mmap_size", "busy_timeout"),
+                         ["wal", 1, 1048576, 1234])
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_default_journaling_without_tuning(self):
+        wrapper = self.open()
+        self.assertEqual(self.pragmas(wrapper, "journal_mode", "synchronous"), ["delete", 2])
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    """Profil de base choisi par ``DJANGO_DB_ENGINE`` (``config/settings.py``)."""
+
+    def load_settings(self, engine):
+        with mock.patch.dict(os.environ, {"DJANGO_DB_ENGINE": engine}):
+            return runpy.run_path(os.path.join(settings.BASE_DIR, "config", "settings.py"))
+
+    def test_known_engines(self):
+        self.assertEqual(self.load_settings("sqlite")["DATABASES"]["default"]["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(self.load_settings("postgresql")["DATABASES"]["default"]["ENGINE"],
+                         "django.db.backends.postgresql")
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "Unknown DJANGO_DB_ENGINE 'postgres'"):
+            self.load_settings("postgres")
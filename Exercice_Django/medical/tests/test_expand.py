@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.caching import response_cache
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+class PatientExpandTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("patient-list")
+        self.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+
+    def add_patients(self, count):
+        patients = Patient.objects.bulk_create(
+            Patient(last_name=f"Nom{i:04d}", first_name="Jean") for i in range(count))
+        Prescription.objects.bulk_create(
+            Prescription(patient=p, medication=self.med, start_date="2026-02-01", end_date="2026-02-10")
+            for p in patients for _ in range(2))
+        # bulk_create sends no signal
+        for model in (Patient, Prescription):
+            response_cache.bump(model)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        total = 0
+        for size in (10, 100, 1000):
+            self.add_patients(size - total)
+            total = size
+            # data versions + patients + prescriptions joined with their medication
+            with self.assertNumQueries(3):
+                r = self.client.get(self.url, {"expand": "prescriptions.medication", "page_size": size})
+            data = r.json()
+            self.assertEqual(len(data), size)
+            self.assertTrue(all(len(p["prescriptions"]) == 2 for p in data))
+            self.assertEqual(data[0]["prescriptions"][0]["medication"]["code"], "PARA500")
+
+    def test_expand_prescriptions_keeps_medication_ids(self):
+        self.add_patients(3)
+        with self.assertNumQueries(3):
+            r = self.client.get(self.url, {"expand": "prescriptions"})
+        self.assertEqual(r.json()[0]["prescriptions"][0]["medication"], self.med.id)
+
+    def test_no_expansion_by_default(self):
+        self.add_patients(1)
+        self.assertNotIn("prescriptions", self.client.get(self.url).json()[0])
+
+    def test_detail_expansion(self):
+        self.add_patients(1)
+        patient = Patient.objects.get()
+        r = self.client.get(reverse("patient-detail", args=[patient.id]), {"expand": "prescriptions"})
+        self.assertEqual(len(r.json()["prescriptions"]), 2)
+
+    def test_cached_expansion_follows_prescription_writes(self):
+        self.add_patients(1)
+        patient = Patient.objects.get()
+        self.client.get(self.url, {"expand": "prescriptions"})
+        with self.captureOnCommitCallbacks(execute=True):
+            Prescription.objects.create(patient=patient, medication=self.med,
+                                        start_date="2026-03-01", end_date="2026-03-10")
+        r = self.client.get(self.url, {"expand": "prescriptions"})
+        self.assertEqual(len(r.json()[0]["prescriptions"]), 3)
+
+    def test_unknown_expansion(self):
+        r = self.client.get(self.url, {"expand": "prescriptions.patient"})
+        self.assertEqual(r.status_code, 400)
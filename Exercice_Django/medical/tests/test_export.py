@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+class PrescriptionExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-export")
+        patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        other = Patient.objects.create(last_name="Durand", first_name="Jean")
+        med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.p1 = Prescription.objects.create(patient=patient, medication=med, start_date="2026-02-01",
+                                              end_date="2026-02-10", comment="à prendre après le repas")
+        self.p2 = Prescription.objects.create(patient=other, medication=med, start_date="2026-01-15",
+                                              end_date="2026-01-20", status=Prescription.STATUS_EN_ATTENTE)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_matches_list_payload(self):
+        r = self.client.get(self.url, {"format": "ndjson"})
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r["Content-Type"].startswith("application/x-ndjson"))
+        rows = [json.loads(line) for line in self.content(r).splitlines()]
+        self.assertEqual(rows, self.client.get(reverse("prescription-list")).json())
+
+    def test_csv_has_header_and_rows(self):
+        r = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(r.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(self.content(r))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["comment"] for row in rows}, {"à prendre après le repas", ""})
+
+    def test_export_accepts_prescription_filters(self):
+        r = self.client.get(self.url, {"format": "ndjson", "status": Prescription.STATUS_EN_ATTENTE})
+        rows = [json.loads(line) for line in self.content(r).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.p2.id])
+
+    def test_invalid_filter_is_rejected(self):
+        r = self.client.get(self.url, {"format": "csv", "start_date__gte": "not-a-date"})
+        self.assertEqual(r.status_code, 400)
+
+    def test_unknown_format(self):
+        r = self.client.get(self.url, {"format": "xml"})
+        self.assertEqual(r.status_code, 404)
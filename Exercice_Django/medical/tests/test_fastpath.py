@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from medical import fastpath, renderers
+from medical.caching import response_cache
+from medical.models import Patient, Medication, Prescription
+from medical.serializers import PatientSerializer, MedicationSerializer, PrescriptionSerializer
+from medical.tests.test_pagination import link_cursor
+
+
+# OopCompanion:suppressRename
+
+
+class FastListParityTests(TestCase):
+    """Le chemin rapide doit produire exactement les octets du serializer DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        names = ["Martin", "Lefèvre", "O'Brien \"Jr\"", "Ünïcödé 😀", "Line\u2028Sep\u2029", "Tab\tNew\nline"]
+        for i, name in enumerate(names):
+            patient = Patient.objects.create(last_name=name, first_name=f"Prénom{i}",
+                                             birth_date="1980-02-29" if i % 2 else None)
+            med = Medication.objects.create(code=f"MED{i}", label=name,
+                                            status=Medication.STATUS_SUPPR if i % 3 == 0 else Medication.STATUS_ACTIF)
+            Prescription.objects.create(patient=patient, medication=med, start_date="2026-01-31",
+                                        end_date="2026-12-31", status=Prescription.STATUS_EN_ATTENTE,
+                                        comment=None if i % 2 else name)
+            Prescription.objects.create(patient=patient, medication=med, start_date="2025-02-01",
+                                        end_date="2025-02-01", comment="")
+
+    def setUp(self):
+        self.client = APIClient()
+        for model in (Patient, Medication):
+            response_cache.bump(model)
+
+    def slow_path(self, serializer_class, queryset):
+        return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+    def assertParity(self, url, serializer_class, queryset, params=None):
+        for orjson in (renderers.orjson, None):
+            with self.subTest(url=url, params=params, orjson=orjson is not None):
+                with mock.patch.object(renderers, "orjson", orjson):
+                    response_cache.bump(queryset.model)
+                    r = self.client.get(url, params or {})
+                self.assertEqual(r.status_code, 200)
+                self.assertEqual(r.content, self.slow_path(serializer_class, queryset))
+
+    def test_prescriptions(self):
+        self.assertParity(reverse("prescription-list"), PrescriptionSerializer, Prescription.objects.all())
+
+    def test_patients(self):
+        self.assertParity(reverse("patient-list"), PatientSerializer, Patient.objects.all())
+
+    def test_medications(self):
+        self.assertParity(reverse("medication-list"), MedicationSerializer, Medication.objects.all())
+
+    def test_pages_and_cursor(self):
+        url = reverse("prescription-list")
+        first = self.client.get(url, {"page_size": 5})
+        with mock.patch.object(fastpath, "compile_serializer", return_value=None):
+            slow = self.client.get(url, {"page_size": 5})
+        self.assertEqual(first.content, slow.content)
+        self.assertEqual(first["Link"], slow["Link"])
+        cursor = link_cursor(first, "next")
+        self.assertEqual(self.client.get(url, {"page_size": 5, "cursor": cursor}).content,
+                         self.slow_path(PrescriptionSerializer, Prescription.objects.all()[5:10]))
+
+    def test_ranked_search_keeps_its_cursor(self):
+        url = reverse("patient-list")
+        fast = self.client.get(url, {"q": "prénom", "page_size": 2})
+        response_cache.bump(Patient)
+        with mock.patch.object(fastpath, "compile_serializer", return_value=None):
+            slow = self.client.get(url, {"q": "prénom", "page_size": 2})
+        self.assertEqual((fast.content, fast["Link"]), (slow.content, slow["Link"]))
+
+    def test_list_serializers_are_supported(self):
+        for serializer_class in (PatientSerializer, MedicationSerializer, PrescriptionSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertIsNotNone(fastpath.compile_serializer(serializer_class()))
+
+    def test_unsupported_serializer_falls_back(self):
+        serializer = PatientSerializer(context={"expand": {"prescriptions"}})
+        self.assertIsNone(fastpath.compile_serializer(serializer))
+        r = self.client.get(reverse("patient-list"), {"expand": "prescriptions"})
+        self.assertEqual(len(r.json()[0]["prescriptions"]), 2)
+
+    def test_renderer_only_uses_orjson_for_fast_rows(self):
+        data = {"ratio": 1e16}
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
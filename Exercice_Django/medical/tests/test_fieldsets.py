@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.caching import response_cache
+from medical.models import Patient, Medication, Prescription
+from medical.tests.test_pagination import link_cursor
+
+
+# OopCompanion:suppressRename
+
+
+class SparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        for i in range(5):
+            patient = Patient.objects.create(last_name=f"Nom{i}", first_name="Jean", birth_date="1980-01-01")
+            Prescription.objects.create(patient=patient, medication=cls.med, start_date="2026-02-01",
+                                        end_date="2026-02-10", comment=f"Commentaire {i}")
+        cls.patient = patient
+        cls.prescription = Prescription.objects.order_by("pk").first()
+
+    def setUp(self):
+        self.client = APIClient()
+        for model in (Patient, Medication, Prescription):
+            response_cache.bump(model)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.get(url, params)
+        self.assertEqual(r.status_code, 200, r.content)
+        return r, " ".join(q["sql"] for q in queries.captured_queries)
+
+    def test_list_and_detail_return_only_requested_fields(self):
+        cases = [
+            ("patient", self.patient.pk, "first_name", ["birth_date"]),
+            ("medication", self.med.pk, "label", ["status"]),
+            ("prescription", self.prescription.pk, "comment,status", ["start_date", "end_date"]),
+        ]
+        for basename, pk, fields, skipped in cases:
+            requested = fields.split(",")
+            for url in (reverse(f"{basename}-list"), reverse(f"{basename}-detail", args=[pk])):
+                with self.subTest(url=url):
+                    r, sql = self.get(url, {"fields": fields})
+                    data = r.json()
+                    rows = data if isinstance(data, list) else [data]
+                    self.assertTrue(rows)
+                    self.assertTrue(all(sorted(row) == sorted(requested) for row in rows))
+                    for name in requested:
+                        self.assertIn(f'"{name}"', sql)
+                    for name in skipped:
+                        self.assertNotIn(f'"{name}"', sql)
+
+    def test_fields_keep_serializer_order(self):
+        r = self.client.get(reverse("prescription-list"), {"fields": "status,id"})
+        self.assertEqual(list(r.json()[0]), ["id", "status"])
+
+    def test_unknown_field_is_rejected(self):
+        r = self.client.get(reverse("patient-list"), {"fields": "id,password"})
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("password", r.json()["fields"][0])
+
+    def test_cursor_pagination_still_works(self):
+        url = reverse("prescription-list")
+        first = self.client.get(url, {"fields": "id", "page_size": 2})
+        cursor = link_cursor(first, "next")
+        second = self.client.get(url, {"fields": "id", "page_size": 2, "cursor": cursor})
+        full = self.client.get(url, {"page_size": 2, "cursor": cursor})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), [{"id": row["id"]} for row in full.json()])
+
+    def test_with_expand(self):
+        r, sql = self.get(reverse("patient-list"), {"fields": "id,prescriptions", "expand": "prescriptions"})
+        data = r.json()
+        self.assertEqual(sorted(data[0]), ["id", "prescriptions"])
+        self.assertEqual(len(data[0]["prescriptions"]), 1)
+        self.assertNotIn('"birth_date"', sql)
+
+    def test_writes_ignore_fields(self):
+        url = reverse("prescription-list") + "?fields=id"
+        r = self.client.post(url, {"patient": self.patient.pk, "medication": self.med.pk,
+                                   "start_date": "2026-03-01", "end_date": "2026-03-02"}, format="json")
+        self.assertEqual(r.status_code, 201)
+        self.assertIn("status", r.json())
+        r = self.client.patch(reverse("prescription-detail", args=[r.json()["id"]]) + "?fields=id",
+                              {"comment": "Modifié"}, format="json")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["comment"], "Modifié")
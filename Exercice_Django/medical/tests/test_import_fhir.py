@@ -0,0 +1,185 @@
+import json
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+def patient(pk, family, given, birth_date=None):
+    resource = {"resourceType": "Patient", "id": pk, "name": [{"use": "official", "family": family, "given": given}]}
+    if birth_date:
+        resource["birthDate"] = birth_date
+    return resource
+
+
+def medication(pk, code, label, status="active"):
+    return {"resourceType": "Medication", "id": pk, "status": status,
+            "code": {"coding": [{"system": "http://www.nlm.nih.gov/research/umls/rxnorm", "code": code,
+                                 "display": label}]}}
+
+
+def request(pk, subject, start, end=None, medication_ref=None, concept=None, status="active", note=None):
+    resource = {"resourceType": "MedicationRequest", "id": pk, "status": status, "intent": "order",
+                "subject": {"reference": f"Patient/{subject}"},
+                "dosageInstruction": [{"timing": {"repeat": {"boundsPeriod": {"start": start, "end": end}}}}]}
+    if medication_ref:
+        resource["medicationReference"] = {"reference": f"Medication/{medication_ref}"}
+    else:
+        resource["medicationCodeableConcept"] = {"coding": [{"code": concept[0], "display": concept[1]}]}
+    if note:
+        resource["note"] = [{"text": note}]
+    return resource
+
+
+class ImportFHIRTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.files = [
+            self.write("MedicationRequest.ndjson", [
+                request("r1", "p1", "2025-01-01T08:00:00+01:00", "2025-01-10", medication_ref="m1", note="matin"),
+                request("r2", "p2", "2025-02-01", medication_ref="m2", status="cancelled"),
+                request("r3", "p1", "2025-03-01", "2025-03-05", concept=("313782", "Acetaminophen 325 MG"),
+                        status="draft"),
+                request("r4", "p3", "2025-04-01", "2025-04-02", concept=("313782", "Acetaminophen 325 MG")),
+                request("r5", "p2", "2025-05-01", "2025-05-02", medication_ref="m1"),
+            ]),
+            self.write("Patient.ndjson", [
+                patient("p1", "Martin", ["Jeanne", "Marie"], "1950-07-14"),
+                patient("p2", "Durand", ["Jean"], "1962"),
+                patient("p3", "Petit", ["Luc"]),
+            ]),
+            self.write("Medication.ndjson", [medication("m1", "PARA500", "Paracétamol 500mg"),
+                                             medication("m2", "IBU200", "Ibuprofène 200mg", status="inactive")]),
+        ]
+
+    def write(self, name, resources, raw=()):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as output:
+            for resource in resources:
+                output.write(json.dumps(resource) + "\n")
+            for line in raw:
+                output.write(line + "\n")
+        return path
+
+    def run_import(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_fhir", *self.files, "--chunk-size", "2", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def state(self):
+        return (
+            sorted(Patient.objects.values_list("fhir_id", "last_name", "first_name", "birth_date")),
+            sorted(Medication.objects.values_list("fhir_id", "code", "label", "status"), key=lambda row: row[1]),
+            sorted(Prescription.objects.values_list("fhir_id", "patient__fhir_id", "medication__code", "status",
+                                                    "start_date", "end_date", "comment")),
+        )
+
+    def test_import_maps_resources_and_references(self):
+        out, err = self.run_import()
+        self.assertIn("Imported 3 patients, 3 medications and 5 prescriptions (0 errors", out)
+        self.assertEqual(err, "")
+        patients, medications, prescriptions = self.state()
+        self.assertEqual(patients, [("p1", "Martin", "Jeanne Marie", date(1950, 7, 14)),
+                                    ("p2", "Durand", "Jean", None), ("p3", "Petit", "Luc", None)])
+        self.assertEqual(medications, [(None, "313782", "Acetaminophen 325 MG", "actif"),
+                                       ("m2", "IBU200", "Ibuprofène 200mg", "suppr"),
+                                       ("m1", "PARA500", "Paracétamol 500mg", "actif")])
+        self.assertEqual(prescriptions, [
+            ("r1", "p1", "PARA500", "valide", date(2025, 1, 1), date(2025, 1, 10), "matin"),
+            ("r2", "p2", "IBU200", "suppr", date(2025, 2, 1), date(2025, 2, 1), ""),
+            ("r3", "p1", "313782", "en_attente", date(2025, 3, 1), date(2025, 3, 5), ""),
+            ("r4", "p3", "313782", "valide", date(2025, 4, 1), date(2025, 4, 2), ""),
+            ("r5", "p2", "PARA500", "valide", date(2025, 5, 1), date(2025, 5, 2), ""),
+        ])
+        # span_class is set as save() would
+        self.assertEqual(Prescription.objects.get(fhir_id="r1").span_class, 4)
+
+    def test_existing_medication_code_is_reused(self):
+        existing = Medication.objects.create(code="PARA500", label="Déjà là")
+        self.run_import()
+        self.assertEqual(Medication.objects.filter(code="PARA500").count(), 1)
+        self.assertEqual(Prescription.objects.get(fhir_id="r1").medication, existing)
+
+    def test_invalid_lines_are_reported_and_skipped(self):
+        self.files.append(self.write("MedicationRequest-2.ndjson", [
+            request("r6", "unknown", "2025-01-01", medication_ref="m1"),
+            request("r7", "p1", "2025-01-10", "2025-01-01", medication_ref="m1"),
+            {"resourceType": "Observation", "id": "o1"},
+            request("r8", "p1", "2025-06-01", medication_ref="m1"),
+        ], raw=["{not json", ""]))
+        out, err = self.run_import()
+        self.assertIn("6 prescriptions (3 errors, 2 lines skipped)", out)
+        self.assertIn("MedicationRequest/r6: unknown Patient/unknown.", err)
+        self.assertIn("End date cannot be before start date.", err)
+        self.assertIn("Invalid resource", err)
+        self.assertTrue(Prescription.objects.filter(fhir_id="r8").exists())
+
+    def test_replaying_an_import_creates_nothing(self):
+        self.run_import()
+        before = self.state()
+        out, _ = self.run_import()
+        self.assertIn("Imported 0 patients, 0 medications", out)
+        self.assertEqual(self.state(), before)
+
+    def test_imported_prescriptions_are_in_the_change_feed(self):
+        client = APIClient()
+        url = reverse("prescription-changes")
+        head = client.get(url).json()["next"]
+        self.run_import()
+        feed = client.get(url, {"since": head}).json()
+        self.assertEqual(sorted((c["prescription"], c["action"]) for c in feed["changes"]),
+                         sorted((pk, "create") for pk in Prescription.objects.values_list("pk", flat=True)))
+
+        # A replayed import inserts nothing and logs nothing
+        out, _ = self.run_import()
+        self.assertIn("and 0 prescriptions", out)
+        self.assertEqual(client.get(url, {"since": feed["next"]}).json()["changes"], [])
+
+    def test_resume_from_checkpoint(self):
+        checkpoint = os.path.join(self.directory, "checkpoint.json")
+        bulk_create = Prescription.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("interrupted")
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Prescription.objects, "bulk_create", failing_bulk_create):
+            with self.assertRaises(RuntimeError):
+                self.run_import("--checkpoint", checkpoint)
+        # The first chunk of the MedicationRequest file (2 lines) is committed and checkpointed
+        self.assertEqual(Prescription.objects.count(), 2)
+        with open(checkpoint) as handle:
+            offsets = json.load(handle)
+        self.assertEqual(offsets[self.files[1]], os.path.getsize(self.files[1]))
+        self.assertLess(offsets[self.files[0]], os.path.getsize(self.files[0]))
+
+        out, _ = self.run_import("--checkpoint", checkpoint)
+        self.assertIn("resuming at byte", out)
+        self.assertIn("already imported", out)
+        self.assertEqual(Prescription.objects.count(), 5)
+        self.assertEqual(sorted(Prescription.objects.values_list("fhir_id", flat=True)), ["r1", "r2", "r3", "r4", "r5"])
+
+
+    def test_process_pool_gives_the_same_result(self):
+        self.run_import("--workers", "2")
+        pooled = self.state()
+        for model in (Prescription, Patient, Medication):
+            model.objects.all().delete()
+        self.run_import()
+        self.assertEqual(self.state(), pooled)
@@ -0,0 +1,79 @@
+import json
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.instrumentation import RequestMetrics, sql_template
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+class SqlTemplateTests(SimpleTestCase):
+    def test_collapses_value_lists(self):
+        self.assertEqual(sql_template("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+                         sql_template("SELECT * FROM t WHERE id IN (%s, %s)"))
+        self.assertEqual(sql_template("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"),
+                         sql_template("INSERT INTO t (a, b) VALUES (%s, %s)"))
+        self.assertNotEqual(sql_template("SELECT a FROM t"), sql_template("SELECT b FROM t"))
+
+
+class RequestMetricsTests(TestCase):
+    def test_repeated_queries(self):
+        patients = Patient.objects.bulk_create(Patient(last_name=f"Nom{i}", first_name="Jean") for i in range(5))
+        metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            for patient in patients:
+                Patient.objects.get(pk=patient.pk)
+            Medication.objects.count()
+        self.assertEqual(metrics.queries, 6)
+        [repeated] = metrics.repeated_queries(threshold=3)
+        self.assertEqual(repeated["count"], 5)
+        self.assertIn("medical_patient", repeated["sql"])
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        Prescription.objects.create(patient=patient, medication=med, start_date="2026-02-01", end_date="2026-02-10")
+
+    def test_disabled_by_default(self):
+        with self.assertNoLogs("medical.perf"):
+            r = self.client.get(reverse("prescription-list"))
+        self.assertNotIn("Server-Timing", r)
+
+    @override_settings(PERF_INSTRUMENTATION=True)
+    def test_server_timing_and_log(self):
+        with self.assertLogs("medical.perf", level="INFO") as logs:
+            r = self.client.get(reverse("prescription-list"))
+        timing = r["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(timing, r"serialize;dur=[\d.]+")
+        self.assertIn(f'size;desc="{len(r.content)} bytes"', timing)
+
+        [record] = logs.records
+        self.assertEqual(record.perf, json.loads(record.getMessage()))
+        self.assertEqual(record.perf["path"], "/Prescription")
+        self.assertEqual(record.perf["status"], 200)
+        self.assertGreater(record.perf["queries"], 0)
+        self.assertGreater(record.perf["serialize_ms"], 0)
+        self.assertNotIn("n_plus_one", record.perf)
+
+    @override_settings(PERF_INSTRUMENTATION=True, PERF_N_PLUS_ONE_THRESHOLD=0)
+    def test_repeated_sql_is_a_warning(self):
+        with self.assertLogs("medical.perf", level="WARNING") as logs:
+            self.client.get(reverse("medication-list"))
+        self.assertTrue(logs.records[0].perf["n_plus_one"])
+
+    @override_settings(PERF_INSTRUMENTATION=True)
+    def test_streaming_response(self):
+        with self.assertLogs("medical.perf") as logs:
+            r = self.client.get(reverse("prescription-export"), {"format": "ndjson"})
+            b"".join(r.streaming_content)
+        self.assertIsNone(logs.records[0].perf["size"])
+        self.assertNotIn("size;", r["Server-Timing"])
@@ -0,0 +1,116 @@
+import random
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.filters import PrescriptionFilter
+from medical.intervals import span_class
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+class PrescriptionIntervalFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.patients = [Patient.objects.create(last_name=f"Nom{i}", first_name="Jean") for i in range(3)]
+        cls.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.prescriptions = []
+        for _ in range(300):
+            start = date(2025, 1, 1) + timedelta(days=rng.randint(0, 600))
+            # From single-day prescriptions to multi-year ones, to exercise every duration class
+            end = start + timedelta(days=rng.choice([0, 1, 2, rng.randint(3, 40), rng.randint(100, 1500)]))
+            cls.prescriptions.append(Prescription.objects.create(
+                patient=rng.choice(cls.patients), medication=cls.med, start_date=start, end_date=end))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-list")
+
+    def expected(self, start, end, patient=None):
+        return sorted(p.id for p in self.prescriptions
+                      if p.start_date <= end and p.end_date >= start and patient in (None, p.patient_id))
+
+    def ids(self, params):
+        r = self.client.get(self.url, {**params, "page_size": 1000})
+        self.assertEqual(r.status_code, 200, r.content)
+        return sorted(p["id"] for p in r.json())
+
+    def test_active_on_matches_brute_force(self):
+        for day in ["2024-12-31", "2025-01-01", "2025-06-15", "2026-08-23", "2029-01-01"]:
+            with self.subTest(day=day):
+                self.assertEqual(self.ids({"active_on": day}), self.expected(date.fromisoformat(day),
+                                                                              date.fromisoformat(day)))
+
+    def test_overlaps_matches_brute_force(self):
+        for start, end in [("2025-03-01", "2025-03-31"), ("2024-01-01", "2025-01-01"), ("2026-01-01", "2030-12-31")]:
+            with self.subTest(window=(start, end)):
+                self.assertEqual(self.ids({"overlaps": f"{start},{end}"}),
+                                 self.expected(date.fromisoformat(start), date.fromisoformat(end)))
+
+    def test_dense_windows_fall_back_to_date_bounds(self):
+        # Same rows whichever access path the probe picks
+        with mock.patch.object(PrescriptionFilter, "interval_probe", 5):
+            self.assertEqual(self.ids({"active_on": "2025-09-01"}),
+                             self.expected(date(2025, 9, 1), date(2025, 9, 1)))
+
+    def test_interval_list_queries(self):
+        # Data versions (coalescing key), density probe and page: no MAX(span_class), no second plan
+        with self.assertNumQueries(3):
+            r = self.client.get(self.url, {"active_on": "2025-06-01"})
+        # A conditional request is not coalesced: probe and page only
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url, {"active_on": "2025-06-01"},
+                                             HTTP_IF_NONE_MATCH=r["ETag"]).status_code, 304)
+
+    def test_patient_and_interval(self):
+        patient = self.patients[0].id
+        self.assertEqual(self.ids({"patient": patient, "overlaps": "2025-05-01,2025-07-01"}),
+                         self.expected(date(2025, 5, 1), date(2025, 7, 1), patient))
+
+    def test_stats_count(self):
+        r = self.client.get(reverse("prescription-stats"), {"active_on": "2025-06-15"})
+        self.assertEqual(r.json()["results"], [{"count": len(self.expected(date(2025, 6, 15), date(2025, 6, 15)))}])
+
+    def test_invalid_values(self):
+        for params in ({"active_on": "demain"}, {"overlaps": "2025-01-01"}, {"overlaps": "2025-01-01,x"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class SpanClassTests(TestCase):
+    def setUp(self):
+        self.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+
+    def test_span_class(self):
+        self.assertEqual(span_class("2026-01-01", "2026-01-01"), 0)
+        self.assertEqual(span_class("2026-01-01", "2026-01-02"), 1)
+        self.assertEqual(span_class("2026-01-01", "2026-01-08"), 3)
+        self.assertEqual(span_class(date(2026, 1, 1), date(2026, 1, 9)), 4)
+
+    def test_save_keeps_span_class_up_to_date(self):
+        p = Prescription.objects.create(patient=self.patient, medication=self.med,
+                                        start_date="2026-01-01", end_date="2026-01-02")
+        self.assertEqual(p.span_class, 1)
+        p.end_date = "2026-03-01"
+        p.save(update_fields=["end_date"])
+        p.refresh_from_db()
+        self.assertEqual(p.span_class, 6)
+
+    def test_bulk_writes_set_span_class(self):
+        existing = Prescription.objects.create(patient=self.patient, medication=self.med,
+                                               start_date="2026-01-01", end_date="2026-01-01")
+        row = {"patient": self.patient.id, "medication": self.med.id, "start_date": "2026-01-01"}
+        r = APIClient().post(reverse("prescription-bulk"), [
+            {**row, "end_date": "2026-01-31"},
+            {"id": existing.id, "end_date": "2026-01-04"},
+        ], format="json")
+        created = Prescription.objects.get(pk=r.json()["created"][0])
+        existing.refresh_from_db()
+        self.assertEqual((created.span_class, existing.span_class), (5, 2))
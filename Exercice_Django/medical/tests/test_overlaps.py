@@ -0,0 +1,109 @@
+import json
+import random
+from datetime import date, timedelta
+from io import StringIO
+from itertools import combinations
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+from medical.overlaps import overlapping_pairs
+
+
+# OopCompanion:suppressRename
+
+
+def brute_force(rows):
+    pairs = set()
+    for a, b in combinations(rows, 2):
+        if a[3] <= b[4] and b[3] <= a[4]:
+            pairs.add(frozenset((a[0], b[0])))
+    return pairs
+
+
+class OverlappingPairsTests(SimpleTestCase):
+    def test_matches_quadratic_comparison(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            rows = []
+            for pk in range(rng.randint(0, 30)):
+                start = date(2026, 1, 1) + timedelta(days=rng.randint(0, 90))
+                rows.append((pk, 1, rng.randint(1, 4), start, start + timedelta(days=rng.randint(0, 20))))
+            rows.sort(key=lambda row: row[3])
+            pairs = list(overlapping_pairs(rows))
+            self.assertEqual({frozenset(p["prescriptions"]) for p in pairs}, brute_force(rows))
+            self.assertEqual(len(pairs), len(brute_force(rows)))
+
+    def test_pair_details(self):
+        rows = [(1, 1, 10, date(2026, 1, 1), date(2026, 1, 10)),
+                (2, 1, 10, date(2026, 1, 10), date(2026, 1, 20)),
+                (3, 1, 11, date(2026, 1, 5), date(2026, 1, 6))]
+        rows.sort(key=lambda row: row[3])
+        self.assertEqual(list(overlapping_pairs(rows)), [
+            {"kind": "concurrent", "prescriptions": [1, 3], "medications": [10, 11],
+             "start": date(2026, 1, 5), "end": date(2026, 1, 6)},
+            # Inclusive bounds: sharing the 10th is an overlap
+            {"kind": "duplicate", "prescriptions": [1, 2], "medications": [10, 10],
+             "start": date(2026, 1, 10), "end": date(2026, 1, 10)},
+        ])
+
+
+class PatientOverlapsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = Patient.objects.create(last_name="Martin", first_name="Alice")
+        self.bob = Patient.objects.create(last_name="Durand", first_name="Bob")
+        self.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        self.p1 = self.prescribe(self.alice, self.para, "2026-01-01", "2026-01-31")
+        self.p2 = self.prescribe(self.alice, self.ibu, "2026-01-15", "2026-02-15")
+        self.p3 = self.prescribe(self.alice, self.para, "2026-01-20", "2026-01-25")
+        self.prescribe(self.alice, self.ibu, "2026-03-01", "2026-03-05")
+        self.prescribe(self.bob, self.para, "2026-01-01", "2026-01-10")
+        self.prescribe(self.bob, self.para, "2026-01-05", "2026-01-15", status=Prescription.STATUS_SUPPR)
+
+    def prescribe(self, patient, med, start, end, status=Prescription.STATUS_VALIDE):
+        return Prescription.objects.create(patient=patient, medication=med, start_date=start, end_date=end,
+                                           status=status)
+
+    def overlaps(self, patient):
+        r = self.client.get(reverse("patient-overlaps", args=[patient.id]))
+        self.assertEqual(r.status_code, 200)
+        return r.json()
+
+    def test_patient_overlaps(self):
+        data = self.overlaps(self.alice)
+        self.assertEqual(data["patient"], self.alice.id)
+        self.assertEqual(
+            [(o["kind"], o["prescriptions"], o["start"], o["end"]) for o in data["overlaps"]],
+            [("concurrent", [self.p1.id, self.p2.id], "2026-01-15", "2026-01-31"),
+             ("duplicate", [self.p1.id, self.p3.id], "2026-01-20", "2026-01-25"),
+             ("concurrent", [self.p2.id, self.p3.id], "2026-01-20", "2026-01-25")])
+
+    def test_deleted_prescriptions_are_ignored(self):
+        self.assertEqual(self.overlaps(self.bob)["overlaps"], [])
+
+    def test_follows_prescription_writes(self):
+        self.overlaps(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prescribe(self.bob, self.ibu, "2026-01-10", "2026-01-12")
+        self.assertEqual(len(self.overlaps(self.bob)["overlaps"]), 1)
+
+    def test_unknown_patient(self):
+        self.assertEqual(self.client.get(reverse("patient-overlaps", args=[0])).status_code, 404)
+
+    def test_batch_command(self):
+        out, err = StringIO(), StringIO()
+        call_command("detect_overlaps", "--chunk-size", "2", stdout=out, stderr=err)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(lines, [self.overlaps(self.alice)])
+        self.assertIn("1 patient(s) flagged, 3 overlapping pair(s)", err.getvalue())
+
+    def test_batch_command_kind(self):
+        out = StringIO()
+        call_command("detect_overlaps", "--kind", "duplicate", stdout=out, stderr=StringIO())
+        [line] = out.getvalue().splitlines()
+        self.assertEqual([o["prescriptions"] for o in json.loads(line)["overlaps"]], [[self.p1.id, self.p3.id]])
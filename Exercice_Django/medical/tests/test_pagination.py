@@ -0,0 +1,78 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+def link_cursor(response, rel):
+    """Extrait le paramètre ``cursor`` du lien ``rel`` de l'en-tête Link."""
+    for part in response.headers.get("Link", "").split(","):
+        if f'rel="{rel}"' in part:
+            url = part.split(";")[0].strip()[1:-1]
+            return url.split("cursor=")[1].split("&")[0]
+    return None
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        # Duplicate last names force the cursor to use the whole ordering key
+        names = [("Martin", "Jeanne"), ("Martin", "Jean"), ("Durand", "Paul"),
+                 ("Martin", "Jean"), ("Bernard", "Lea")]
+        self.patients = [Patient.objects.create(last_name=ln, first_name=fn) for ln, fn in names]
+        self.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        for patient in self.patients:
+            for day in (1, 2):
+                Prescription.objects.create(patient=patient, medication=self.med,
+                                            start_date=f"2026-02-0{day}", end_date="2026-02-10")
+
+    def walk(self, url, params):
+        ids, cursor, pages = [], None, 0
+        while True:
+            query = dict(params, **({"cursor": cursor} if cursor else {}))
+            r = self.client.get(url, query)
+            self.assertEqual(r.status_code, 200)
+            ids.extend(row["id"] for row in r.json())
+            pages += 1
+            cursor = link_cursor(r, "next")
+            if cursor is None:
+                return ids, pages
+
+    def test_patient_pages_follow_meta_ordering(self):
+        ids, pages = self.walk(reverse("patient-list"), {"page_size": 2})
+        expected = list(Patient.objects.order_by("last_name", "first_name", "id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_prescription_pages_follow_meta_ordering(self):
+        ids, _ = self.walk(reverse("prescription-list"), {"page_size": 3})
+        expected = list(Prescription.objects.order_by("patient_id", "id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_pages_keep_filters(self):
+        ids, _ = self.walk(reverse("prescription-list"), {"page_size": 1, "start_date": "2026-02-02"})
+        self.assertEqual(len(ids), len(self.patients))
+
+    def test_previous_link_returns_previous_page(self):
+        url = reverse("medication-list")
+        for i in range(4):
+            Medication.objects.create(code=f"MED{i}", label=f"Med {i}")
+        first = self.client.get(url, {"page_size": 2})
+        self.assertIsNone(link_cursor(first, "prev"))
+        second = self.client.get(url, {"page_size": 2, "cursor": link_cursor(first, "next")})
+        back = self.client.get(url, {"page_size": 2, "cursor": link_cursor(second, "prev")})
+        self.assertEqual(back.json(), first.json())
+        self.assertIsNone(link_cursor(back, "prev"))
+
+    def test_single_page_has_no_link(self):
+        r = self.client.get(reverse("patient-list"))
+        self.assertEqual(len(r.json()), len(self.patients))
+        self.assertNotIn("Link", r.headers)
+
+    def test_invalid_cursor(self):
+        r = self.client.get(reverse("patient-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(r.status_code, 404)
@@ -0,0 +1,84 @@
+import itertools
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from medical.filters import PrescriptionFilter
+from medical.models import Patient, Medication, Prescription
+
+
+# OopCompanion:suppressRename
+
+
+FILTER_VALUES = {
+    "patient": "1",
+    "medication": "1",
+    "status": Prescription.STATUS_VALIDE,
+    "start_date": "2026-02-01",
+    "start_date__gte": "2026-01-01",
+    "start_date__lte": "2026-03-01",
+    "end_date": "2026-02-10",
+    "end_date__gte": "2026-01-01",
+    "end_date__lte": "2026-03-01",
+}
+
+TABLE = Prescription._meta.db_table
+
+
+def full_scan(plan):
+    """Indique si le plan parcourt toute la table des prescriptions."""
+    if connection.vendor == "sqlite":
+        # "SCAN <table>" (with or without "USING INDEX") walks every row; "SEARCH" uses an index range
+        return any(line.split("SCAN ", 1)[-1].startswith(TABLE) for line in plan.splitlines() if "SCAN " in line)
+    return f"Seq Scan on {TABLE}" in plan
+
+
+@unittest.skipUnless(connection.vendor in ("sqlite", "postgresql"), "EXPLAIN format not supported")
+class PrescriptionFilterQueryPlanTests(TestCase):
+    """Chaque combinaison de filtres doit être servie par un index, jamais par un parcours complet.
+
+    L'ordre est retiré avant l'EXPLAIN : on vérifie le chemin d'accès du prédicat,
+    pas l'arbitrage tri/parcours ordonné que le planificateur fait sous ``LIMIT``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if connection.vendor == "postgresql":
+            # Test tables are tiny: without this the planner always prefers a sequential scan
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    @classmethod
+    def tearDownClass(cls):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
+        super().tearDownClass()
+
+    def explain(self, params):
+        queryset = PrescriptionFilter(data=params, queryset=Prescription.objects.all()).qs
+        return queryset.order_by().explain()
+
+    def test_every_filter_combination_uses_an_index(self):
+        names = list(FILTER_VALUES)
+        for size in range(1, len(names) + 1):
+            for combination in itertools.combinations(names, size):
+                params = {name: FILTER_VALUES[name] for name in combination}
+                plan = self.explain(params)
+                with self.subTest(filters=combination):
+                    self.assertFalse(full_scan(plan), f"Full scan for {combination}:\n{plan}")
+
+    def test_interval_filters_use_an_index(self):
+        Prescription.objects.create(patient=Patient.objects.create(last_name="Martin", first_name="Jeanne"),
+                                    medication=Medication.objects.create(code="PARA500", label="Paracétamol"),
+                                    start_date="2026-02-01", end_date="2026-02-10")
+        for params in ({"active_on": "2026-02-05"}, {"overlaps": "2026-01-01,2026-03-01"}):
+            with self.subTest(filters=params):
+                plan = self.explain(params)
+                self.assertFalse(full_scan(plan), f"Full scan for {params}:\n{plan}")
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "planner may pick any index once seqscan is disabled")
+    def test_detector_flags_unfiltered_query(self):
+        self.assertTrue(full_scan(self.explain({})))
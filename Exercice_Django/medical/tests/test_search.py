@@ -0,0 +1,63 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication
+
+
+# OopCompanion:suppressRename
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("patient-list")
+        self.martin = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.martine = Patient.objects.create(last_name="Durand", first_name="Martine")
+        self.martinez = Patient.objects.create(last_name="Martinez", first_name="Paul")
+        Patient.objects.create(last_name="Bernard", first_name="Lucie")
+
+    def names(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [p["last_name"] for p in response.json()]
+
+    def test_prefix_match_ranks_last_name_first(self):
+        r = self.client.get(self.url, {"q": "mart"})
+        self.assertEqual(self.names(r), ["Martin", "Martinez", "Durand"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "mart jea"})), ["Martin"])
+
+    def test_search_ignores_case_and_accents(self):
+        Patient.objects.create(last_name="Hélène", first_name="Éloïse")
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "ELOI"})), ["Hélène"])
+
+    def test_index_follows_updates_deletes_and_bulk_inserts(self):
+        self.martin.last_name = "Lambert"
+        self.martin.save()
+        self.martinez.delete()
+        Patient.objects.bulk_create([Patient(last_name="Martel", first_name="Leo")])
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "mart"})), ["Martel", "Durand"])
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "lamb"})), ["Lambert"])
+
+    def test_ranked_results_are_paginated(self):
+        ids, params = [], {"q": "mart", "page_size": 1}
+        while True:
+            r = self.client.get(self.url, params)
+            ids.extend(p["id"] for p in r.json())
+            link = r.headers.get("Link", "")
+            if 'rel="next"' not in link:
+                break
+            params["cursor"] = link.split("cursor=")[1].split(">")[0].split("&")[0]
+        self.assertEqual(ids, [self.martin.id, self.martinez.id, self.martine.id])
+
+    def test_empty_query_matches_nothing(self):
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "!!"})), [])
+
+    def test_medication_search_on_code_and_label(self):
+        Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        r = self.client.get(reverse("medication-list"), {"q": "parac"})
+        self.assertEqual([m["code"] for m in r.json()], ["PARA500"])
+        r = self.client.get(reverse("medication-list"), {"q": "200"})
+        self.assertEqual([m["code"] for m in r.json()], ["IBU200"])
@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from medical.models import Patient, Medication, Prescription, PrescriptionChange
+
+
+# OopCompanion:suppressRename
+
+
+class SeedDemoTests(TestCase):
+    def seed(self, *args):
+        call_command("seed_demo", "--patients", "20", "--medications", "8", "--prescriptions", "50",
+                     "--chunk-size", "7", *args, stdout=StringIO())
+
+    def snapshot(self):
+        return (
+            list(Patient.objects.order_by("id").values_list("last_name", "first_name", "birth_date")),
+            list(Medication.objects.order_by("id").values_list("code", "label", "status")),
+            list(Prescription.objects.order_by("id").values_list(
+                "patient__last_name", "medication__code", "start_date", "end_date", "status", "comment")),
+        )
+
+    def test_counts(self):
+        self.seed("--seed", "1")
+        self.assertEqual((Patient.objects.count(), Medication.objects.count(), Prescription.objects.count()),
+                         (20, 8, 50))
+
+    def test_same_seed_same_data(self):
+        self.seed("--seed", "42")
+        first = self.snapshot()
+        self.seed("--seed", "42", "--flush")
+        self.assertEqual(self.snapshot(), first)
+
+    def test_workers_do_not_change_the_data(self):
+        self.seed("--seed", "7")
+        serial = self.snapshot()
+        self.seed("--seed", "7", "--flush", "--workers", "2")
+        self.assertEqual(self.snapshot(), serial)
+
+    def test_without_flush_existing_rows_are_kept(self):
+        self.seed("--seed", "1")
+        self.seed("--seed", "2")
+        self.assertEqual(Prescription.objects.count(), 100)
+
+    def test_rerun_with_the_same_seed_reuses_medications(self):
+        self.seed("--seed", "3")
+        codes = list(Medication.objects.order_by("id").values_list("code", "pk"))
+        self.seed("--seed", "3")
+        self.assertEqual(list(Medication.objects.order_by("id").values_list("code", "pk")), codes)
+        self.assertEqual((Patient.objects.count(), Prescription.objects.count()), (40, 100))
+
+    def test_creates_and_flushed_rows_are_logged(self):
+        self.seed("--seed", "5")
+        first = set(Prescription.objects.values_list("id", flat=True))
+        self.assertEqual(set(PrescriptionChange.objects.filter(action=PrescriptionChange.ACTION_CREATE)
+                             .values_list("prescription_id", flat=True)), first)
+
+        self.seed("--seed", "5", "--flush")
+        deleted = PrescriptionChange.objects.filter(action=PrescriptionChange.ACTION_DELETE)
+        self.assertEqual(set(deleted.values_list("prescription_id", flat=True)), first)
+        self.assertTrue(all(change.changed_at for change in deleted))
+        self.assertEqual(PrescriptionChange.objects.filter(action=PrescriptionChange.ACTION_CREATE).count(), 100)
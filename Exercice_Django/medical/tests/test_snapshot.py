@@ -0,0 +1,168 @@
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from unittest import skipIf
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from medical import snapshot
+from medical.models import Patient, Medication, Prescription
+
+if snapshot.pa is not None:
+    import pyarrow.parquet as pq
+
+
+# OopCompanion:suppressRename
+
+
+@skipIf(snapshot.pa is None, "pyarrow is not installed")
+class ParquetSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patients = [Patient.objects.create(last_name=f"Nom{i}", first_name="Jeanne",
+                                               birth_date=date(1950, 1, i + 1)) for i in range(3)]
+        cls.med = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        for i in range(7):
+            Prescription.objects.create(patient=cls.patients[i % 3], medication=cls.med,
+                                        start_date=date(2023 + i % 3, 3, 1), end_date=date(2023 + i % 3, 3, 10),
+                                        comment=None if i == 0 else f"note {i}")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def snapshot(self, *args):
+        out = io.StringIO()
+        call_command("snapshot_parquet", "--output", self.directory, "--batch-size", "2", *args,
+                     stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def current_state(self):
+        """Lignes de plus grand ``snapshot`` par prescription, moins les suppressions postérieures."""
+        latest = {}
+        for row in pq.read_table(os.path.join(self.directory, "prescription")).to_pylist():
+            if row["id"] not in latest or row["snapshot"] > latest[row["id"]]["snapshot"]:
+                latest[row["id"]] = row
+        deleted = os.path.join(self.directory, "prescription_deleted")
+        if os.path.exists(deleted):
+            for row in pq.read_table(deleted).to_pylist():
+                if row["id"] in latest and row["snapshot"] > latest[row["id"]]["snapshot"]:
+                    del latest[row["id"]]
+        return {pk: (row["patient_id"], row["start_date"], row["end_date"], row["comment"], int(row["start_year"]))
+                for pk, row in latest.items()}
+
+    def expected_state(self):
+        return {p.pk: (p.patient_id, p.start_date, p.end_date, p.comment, p.start_date.year)
+                for p in Prescription.objects.all()}
+
+    def test_full_snapshot_layout_and_types(self):
+        self.assertIn("3 patients, 1 medications, 7 prescriptions", self.snapshot())
+        self.assertEqual(sorted(os.listdir(os.path.join(self.directory, "prescription"))),
+                         ["start_year=2023", "start_year=2024", "start_year=2025"])
+        table = pq.read_table(os.path.join(self.directory, "prescription"))
+        self.assertEqual(str(table.schema.field("start_date").type), "date32[day]")
+        self.assertEqual(str(table.schema.field("updated_at").type), "timestamp[us, tz=UTC]")
+        self.assertEqual(self.current_state(), self.expected_state())
+
+        patients = pq.read_table(os.path.join(self.directory, "patient.parquet"))
+        self.assertEqual(patients.column("birth_date").to_pylist(), [date(1950, 1, 1), date(1950, 1, 2),
+                                                                     date(1950, 1, 3)])
+        # Record batches of --batch-size rows: one row group each
+        metadata = pq.ParquetFile(os.path.join(self.directory, "prescription", "start_year=2023",
+                                               "part-00001.parquet")).metadata
+        self.assertEqual([metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)], [2, 1])
+
+    def test_incremental_snapshot_only_writes_changes(self):
+        self.snapshot()
+        moved, removed = Prescription.objects.order_by("id")[:2]
+        moved.start_date, moved.end_date = date(2026, 1, 1), date(2026, 1, 5)
+        moved.save()
+        removed.delete()
+        Prescription.objects.create(patient=self.patients[0], medication=self.med, start_date=date(2024, 5, 1),
+                                    end_date=date(2024, 5, 2))
+
+        output = self.snapshot("--incremental")
+        self.assertIn("Snapshot 2 (incremental)", output)
+        self.assertIn("2 prescriptions, 1 deleted", output)
+        self.assertEqual(self.current_state(), self.expected_state())
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "prescription", "start_year=2026",
+                                                    "part-00002.parquet")))
+
+        # Nothing changed since: empty incremental snapshot
+        self.assertIn("0 prescriptions, 0 deleted", self.snapshot("--incremental"))
+        self.assertEqual(self.current_state(), self.expected_state())
+
+        # A full snapshot starts over
+        self.snapshot()
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "prescription_deleted")))
+        self.assertEqual(self.current_state(), self.expected_state())
+        with open(os.path.join(self.directory, "_manifest.json")) as manifest:
+            self.assertEqual([entry["snapshot"] for entry in json.load(manifest)["snapshots"]], [4])
+
+    def test_incremental_snapshot_after_bulk_writes(self):
+        self.snapshot()
+        # Bulk writes send no signals: they log their changes themselves
+        resources = [
+            {"resourceType": "Patient", "id": "p1", "name": [{"family": "Durand", "given": ["Luc"]}]},
+            *({"resourceType": "MedicationRequest", "id": f"r{i}", "status": "active", "intent": "order",
+               "subject": {"reference": "Patient/p1"},
+               "medicationCodeableConcept": {"coding": [{"code": "PARA500", "display": "Paracétamol"}]},
+               "dosageInstruction": [{"timing": {"repeat": {"boundsPeriod": {"start": start, "end": start}}}}]}
+              for i, start in enumerate(["2024-06-01", "2027-01-01"])),
+        ]
+        path = os.path.join(self.directory, "import.ndjson")
+        with open(path, "w", encoding="utf-8") as output:
+            output.writelines(json.dumps(resource) + "\n" for resource in resources)
+        call_command("import_fhir", path, stdout=io.StringIO(), stderr=io.StringIO())
+        first = Prescription.objects.order_by("id").first()
+        r = APIClient().post(reverse("prescription-bulk"), [
+            {"id": first.pk, "start_date": "2025-09-01", "end_date": "2025-09-02"},
+            {"patient": self.patients[1].pk, "medication": self.med.pk, "start_date": "2023-01-01",
+             "end_date": "2023-01-02", "status": Prescription.STATUS_VALIDE},
+        ], format="json")
+        self.assertEqual(r.json()["errors"], [])
+
+        self.assertIn("4 prescriptions, 0 deleted", self.snapshot("--incremental"))
+        self.assertEqual(self.current_state(), self.expected_state())
+
+    def test_ordered_writer_closes_each_year_before_the_next(self):
+        schema = snapshot.arrow_schema(Prescription, snapshot.PRESCRIPTION_FIELDS)
+        writer = snapshot.PartitionedWriter(self.directory, schema, "part.parquet", 10, ordered=True)
+        rows = Prescription.objects.order_by("start_date", "id").values_list(*snapshot.PRESCRIPTION_FIELDS)
+        for row in rows:
+            writer.write(row)
+            if row[3].year == 2024:
+                # The 2023 file is complete and closed as soon as the scan reaches 2024
+                self.assertEqual(set(writer.buffers) | set(writer.writers), {2024})
+                self.assertEqual(pq.read_table(os.path.join(self.directory, "start_year=2023")).num_rows, 3)
+        self.assertEqual(writer.close(), 7)
+        self.assertEqual(set(writer.buffers) | set(writer.writers), set())
+
+    @override_settings(PRESCRIPTION_CHANGES_RETENTION_DAYS=1)
+    def test_incremental_falls_back_to_full(self):
+        self.assertIn("(full)", self.snapshot("--incremental"))
+        manifest = snapshot.read_manifest(self.directory)
+        manifest["snapshots"][-1]["created_at"] = (timezone.now() - timedelta(days=2)).isoformat()
+        snapshot.write_manifest(self.directory, manifest)
+        self.assertIn("Snapshot 2 (full)", self.snapshot("--incremental"))
+        self.assertEqual(self.current_state(), self.expected_state())
+
+    def test_parquet_export(self):
+        r = APIClient().get(reverse("prescription-export"), {"format": "parquet", "patient": self.patients[0].pk})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], "application/vnd.apache.parquet")
+        rows = pq.read_table(io.BytesIO(b"".join(r.streaming_content))).to_pylist()
+        self.assertEqual([row["id"] for row in rows],
+                         list(Prescription.objects.filter(patient=self.patients[0]).values_list("id", flat=True)))
+        self.assertEqual(set(rows[0]), {"id", "patient", "medication", "start_date", "end_date", "status", "comment"})
+
+        r = APIClient().get(reverse("prescription-export"), {"format": "parquet", "start_date__gte": "x"})
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r["Content-Type"], "application/json")
@@ -0,0 +1,172 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import (Patient, Medication, Prescription, PrescriptionRollup, PrescriptionRollupBuild,
+                            PrescriptionRollupDirtyMonth)
+from medical.stats import refresh_rollup
+
+
+# OopCompanion:suppressRename
+
+
+class PrescriptionStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-stats")
+        self.alice = Patient.objects.create(last_name="Martin", first_name="Alice")
+        self.bob = Patient.objects.create(last_name="Durand", first_name="Bob")
+        self.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        for patient, med, start, status in [
+            (self.alice, self.para, "2026-01-05", "actif"),
+            (self.alice, self.ibu, "2026-01-20", "suspendu"),
+            (self.bob, self.para, "2026-02-01", "actif"),
+            (self.bob, self.para, "2026-02-15", "actif"),
+        ]:
+            Prescription.objects.create(patient=patient, medication=med, start_date=start,
+                                        end_date="2026-03-31", status=status)
+
+    def stats(self, **params):
+        r = self.client.get(self.url, params)
+        self.assertEqual(r.status_code, 200, r.content)
+        return r.json()
+
+    def test_total_without_group(self):
+        data = self.stats()
+        self.assertEqual(data["results"], [{"count": 4}])
+        self.assertEqual(data["source"], "live")
+
+    def test_group_by_status_and_month(self):
+        data = self.stats(group_by="status,month")
+        self.assertEqual(data["group_by"], ["status", "month"])
+        self.assertEqual(data["results"], [
+            {"status": "actif", "month": "2026-01", "count": 1},
+            {"status": "actif", "month": "2026-02", "count": 2},
+            {"status": "suspendu", "month": "2026-01", "count": 1},
+        ])
+
+    def test_group_by_patient_with_filters(self):
+        data = self.stats(group_by="patient", medication=self.para.id, start_date__gte="2026-01-10")
+        self.assertEqual(data["results"], [{"patient": self.bob.id, "count": 2}])
+
+    def test_patient_grouping_is_paged(self):
+        first = self.stats(group_by="patient,status", limit=2)
+        self.assertEqual(first["results"], [
+            {"patient": self.alice.id, "status": "actif", "count": 1},
+            {"patient": self.alice.id, "status": "suspendu", "count": 1},
+        ])
+        self.assertEqual(first["next_offset"], 2)
+        last = self.stats(group_by="patient,status", limit=2, offset=2)
+        self.assertEqual(last["results"], [{"patient": self.bob.id, "status": "actif", "count": 2}])
+        self.assertIsNone(last["next_offset"])
+        self.assertNotIn("next_offset", self.stats(group_by="status"))
+        self.assertEqual(self.client.get(self.url, {"group_by": "patient", "offset": "-1"}).status_code, 400)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"group_by": "medication"})
+
+    def test_unknown_group(self):
+        r = self.client.get(self.url, {"group_by": "label"})
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("group_by", r.json())
+
+    def test_invalid_filter(self):
+        self.assertEqual(self.client.get(self.url, {"start_date__gte": "hier"}).status_code, 400)
+
+
+@override_settings(PRESCRIPTION_ROLLUP_ENABLED=True)
+class PrescriptionRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-stats")
+        self.patient = Patient.objects.create(last_name="Martin", first_name="Alice")
+        self.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        self.first = self.prescribe(self.para, "2026-01-05")
+        self.prescribe(self.ibu, "2026-02-10", status="suspendu")
+        refresh_rollup(full=True)
+
+    def prescribe(self, med, start, status="actif"):
+        return Prescription.objects.create(patient=self.patient, medication=med, start_date=start,
+                                           end_date="2026-12-31", status=status)
+
+    def assertMatchesLive(self, **params):
+        rollup = self.client.get(self.url, params).json()
+        live = self.client.get(self.url, {**params, "source": "live"}).json()
+        self.assertEqual(rollup["source"], "rollup")
+        self.assertEqual(live["source"], "live")
+        self.assertEqual(rollup["results"], live["results"])
+        return rollup["results"]
+
+    def test_rollup_follows_writes(self):
+        self.assertMatchesLive(group_by="month,status")
+
+        self.prescribe(self.para, "2026-02-20")
+        results = self.assertMatchesLive(group_by="month,medication")
+        self.assertIn({"month": "2026-02", "medication": self.para.id, "count": 1}, results)
+
+        # Moving a prescription to another month refreshes both months
+        self.first.start_date = "2026-03-01"
+        self.first.save()
+        results = self.assertMatchesLive(group_by="month")
+        self.assertEqual(results, [{"month": "2026-02", "count": 2}, {"month": "2026-03", "count": 1}])
+
+        self.first.delete()
+        self.assertMatchesLive(group_by="month")
+        self.assertMatchesLive(status="suspendu", medication=self.ibu.id)
+
+    def test_reads_do_not_write(self):
+        self.prescribe(self.para, "2026-04-01")
+        dirty = set(PrescriptionRollupDirtyMonth.objects.values_list("month", flat=True))
+        self.assertTrue(dirty)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertMatchesLive(group_by="month,status")
+            self.assertMatchesLive()
+        self.assertTrue(all(query["sql"].lstrip().upper().startswith("SELECT") for query in queries))
+        self.assertEqual(set(PrescriptionRollupDirtyMonth.objects.values_list("month", flat=True)), dirty)
+
+        call_command("refresh_prescription_rollup", stdout=StringIO())
+        self.assertFalse(PrescriptionRollupDirtyMonth.objects.exists())
+        self.assertMatchesLive(group_by="month,status")
+
+    def test_patient_grouping_and_date_filters_stay_live(self):
+        self.assertEqual(self.client.get(self.url, {"group_by": "patient"}).json()["source"], "live")
+        self.assertEqual(self.client.get(self.url, {"start_date__gte": "2026-02-01"}).json()["source"], "live")
+
+    def test_full_refresh_command(self):
+        PrescriptionRollup.objects.all().delete()
+        call_command("refresh_prescription_rollup", full=True, stdout=StringIO())
+        self.assertMatchesLive(group_by="medication")
+
+    def test_never_built_rollup_is_not_read(self):
+        PrescriptionRollupBuild.objects.all().delete()
+        PrescriptionRollup.objects.all().delete()
+        data = self.client.get(self.url, {"group_by": "month"}).json()
+        self.assertEqual(data["source"], "live")
+        self.assertEqual(data["results"], [{"month": "2026-01", "count": 1}, {"month": "2026-02", "count": 1}])
+
+        err = StringIO()
+        call_command("refresh_prescription_rollup", stdout=StringIO(), stderr=err)
+        self.assertIn("--full", err.getvalue())
+        call_command("refresh_prescription_rollup", full=True, stdout=StringIO())
+        self.assertMatchesLive(group_by="month")
+
+    def test_writes_while_disabled_require_a_full_rebuild(self):
+        with override_settings(PRESCRIPTION_ROLLUP_ENABLED=False):
+            self.prescribe(self.para, "2026-05-01")
+            self.first.delete()
+        # Those writes marked no month: the stored counts are stale and must not be served
+        self.assertFalse(PrescriptionRollupDirtyMonth.objects.exists())
+        data = self.client.get(self.url, {"group_by": "month"}).json()
+        self.assertEqual(data["source"], "live")
+        self.assertEqual(data["results"], [{"month": "2026-02", "count": 1}, {"month": "2026-05", "count": 1}])
+
+        call_command("refresh_prescription_rollup", full=True, stdout=StringIO())
+        self.assertMatchesLive(group_by="month")
@@ -1,13 +1,23 @@
 from django.urls import path, include
 from rest_framework.routers import SimpleRouter
 
-from .views import PatientViewSet, MedicationViewSet, PrescriptionViewSet
+from .async_views import AsyncPatientView, AsyncMedicationView, AsyncPrescriptionView
+from .views import PatientViewSet, MedicationViewSet, PrescriptionViewSet, CohortViewSet, CacheStatsView, CoalescingStatsView
 
 router = SimpleRouter(trailing_slash=False)
 router.register(r"Patient", PatientViewSet, basename="patient")
 router.register(r"Medication", MedicationViewSet, basename="medication")
 router.register(r"Prescription", PrescriptionViewSet, basename="prescription")
+router.register(r"Cohort", CohortViewSet, basename="cohort")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("cache/stats", CacheStatsView.as_view(), name="cache-stats"),
+    path("coalescing/stats", CoalescingStatsView.as_view(), name="coalescing-stats"),
+    path("async/Patient", AsyncPatientView.as_view(), name="async-patient-list"),
+    path("async/Patient/<str:pk>", AsyncPatientView.as_view(), name="async-patient-detail"),
+    path("async/Medication", AsyncMedicationView.as_view(), name="async-medication-list"),
+    path("async/Medication/<str:pk>", AsyncMedicationView.as_view(), name="async-medication-detail"),
+    path("async/Prescription", AsyncPrescriptionView.as_view(), name="async-prescription-list"),
+    path("async/Prescription/<str:pk>", AsyncPrescriptionView.as_view(), name="async-prescription-detail"),
 ]
@@ -1,37 +1,278 @@
+from itertools import islice
+
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets
+from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .batch import BatchGetMixin
+from .bulk import PrescriptionBulkWriter
+from .caching import VersionedCacheMixin, response_cache
+from .coalescing import CoalescedListMixin, single_flight
+from .changes import head_cursor, read_changes
+from .cohort import CohortRun, CriteriaError, build, leaf_cache
+from .conditional import ConditionalGetMixin
+from .fastpath import FastListMixin
+from .fieldsets import SparseFieldsMixin
 from .models import Patient, Medication, Prescription
+from .overlaps import patient_overlaps
 from .filters import PatientFilter, MedicationFilter, PrescriptionFilter
+from .instrumentation import InstrumentedViewMixin
+from .parsers import NDJSONParser
+from .renderers import NDJSONRenderer, CSVRenderer
+from .search import RankedSearchMixin
+from .stats import GROUPS, ROLLUP_FILTERS, ROLLUP_GROUPS, live_stats, parse_group_by, rollup_enabled, rollup_stats
 from .serializers import PatientSerializer, MedicationSerializer, PrescriptionSerializer
+from .snapshot import ParquetRenderer, pa
 
 
 # OopCompanion:suppressRename
 
 
-class PatientViewSet(viewsets.ReadOnlyModelViewSet):
+class PatientViewSet(InstrumentedViewMixin, ConditionalGetMixin, VersionedCacheMixin, CoalescedListMixin,
+                     RankedSearchMixin, SparseFieldsMixin, FastListMixin, BatchGetMixin, viewsets.ReadOnlyModelViewSet):
     """Lecture seule des patients avec filtrage via query params."""
 
     serializer_class = PatientSerializer
     queryset = Patient.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = PatientFilter
+    cache_models = (Patient,)
+    expandable = ("prescriptions", "prescriptions.medication")
+
+    def get_expand(self):
+        """Relations demandées par ``?expand=a,b`` ; ``a.b`` implique ``a``."""
+        if not hasattr(self, "_expand"):
+            requested = {v.strip() for v in self.request.query_params.get("expand", "").split(",") if v.strip()}
+            unknown = requested.difference(self.expandable)
+            if unknown:
+                raise ValidationError({"expand": [f"Unknown expansion: {', '.join(sorted(unknown))}. "
+                                                  f"Allowed: {', '.join(self.expandable)}."]})
+            self._expand = requested | {name.rsplit(".", 1)[0] for name in requested}
+        return self._expand
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        expand = self.get_expand()
+        if "prescriptions" in expand:
+            prescriptions = Prescription.objects.all()
+            if "prescriptions.medication" in expand:
+                prescriptions = prescriptions.select_related("medication")
+            # One extra query for the whole page, whatever the number of patients
+            queryset = queryset.prefetch_related(Prefetch("prescriptions", queryset=prescriptions))
+        return queryset
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "expand": self.get_expand()}
 
+    @action(detail=True, methods=["get"])
+    def overlaps(self, request, pk=None):
+        """Prescriptions du patient actives en même temps (même médicament ou non)."""
+        return self.cached(self.get_overlaps, request, pk=pk)
 
-class MedicationViewSet(viewsets.ReadOnlyModelViewSet):
+    def get_overlaps(self, request, pk=None):
+        patient = self.get_object()
+        return Response({"patient": patient.pk, "overlaps": patient_overlaps(patient.pk)})
+
+    def get_cache_models(self):
+        if self.action == "overlaps":
+            return (Patient, Prescription)
+        expand = self.get_expand()
+        return (Patient,
+                *((Prescription,) if "prescriptions" in expand else ()),
+                *((Medication,) if "prescriptions.medication" in expand else ()))
+
+
+class MedicationViewSet(InstrumentedViewMixin, ConditionalGetMixin, VersionedCacheMixin, CoalescedListMixin,
+                        RankedSearchMixin, SparseFieldsMixin, FastListMixin, BatchGetMixin,
+                        viewsets.ReadOnlyModelViewSet):
     """Lecture seule des médicaments avec filtrage via query params."""
 
     serializer_class = MedicationSerializer
     queryset = Medication.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = MedicationFilter
+    cache_models = (Medication,)
 
 
-class PrescriptionViewSet(viewsets.ModelViewSet):
+class PrescriptionViewSet(InstrumentedViewMixin, CoalescedListMixin, ConditionalGetMixin, SparseFieldsMixin,
+                          FastListMixin, BatchGetMixin, viewsets.ModelViewSet):
     """Permettre de créer, consulter et mettre à jour des prescriptions."""
 
+    # CoalescedListMixin comes before ConditionalGetMixin here, whose list validators come from the page
+    # list() reads; for patients and medications, it only wraps response cache misses
+
     serializer_class = PrescriptionSerializer
     queryset = Prescription.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = PrescriptionFilter
+    last_modified_field = "updated_at"
+    export_chunk_size = 2000
+    changes_limit = 500
+    changes_max_limit = 1000
+    # Groupings by patient have one row per patient: served by pages of stats_limit groups
+    stats_limit = 1000
+    stats_max_limit = 10000
+
+    # ?format=parquet only when pyarrow is installed (404 otherwise, like any unknown format)
+    @action(detail=False, methods=["get"],
+            renderer_classes=[NDJSONRenderer, CSVRenderer, *([ParquetRenderer] if pa is not None else [])])
+    def export(self, request):
+        """Export en flux (NDJSON, CSV ou Parquet) des prescriptions filtrées, à mémoire constante."""
+        fields = PrescriptionSerializer.Meta.fields
+        queryset = self.filter_queryset(self.get_queryset())
+        # Tuples read through a server-side cursor: no model instances, no serializer
+        rows = queryset.values_list(*fields).iterator(chunk_size=self.export_chunk_size)
+        renderer = request.accepted_renderer
+        if isinstance(renderer, ParquetRenderer):
+            stream, content_type = renderer.stream(fields, rows, queryset.model), renderer.media_type
+        else:
+            stream, content_type = renderer.stream(fields, rows), f"{renderer.media_type}; charset={renderer.charset}"
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="prescriptions.{renderer.format}"'
+        return response
+
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def stats(self, request):
+        """Nombre de prescriptions filtrées, groupées par ``group_by`` (status, medication, patient, month).
+
+        Groupé par patient, le résultat est paginé : ``limit`` groupes à partir de ``offset``.
+        """
+        try:
+            groups = parse_group_by(request.query_params.getlist("group_by"))
+        except ValueError as exc:
+            raise ValidationError({"group_by": [f"Unknown group: {exc}. Allowed: {', '.join(GROUPS)}."]})
+
+        filterset = self.filterset_class(request.query_params, queryset=self.get_queryset(), request=request)
+        # Whole-set aggregates: always read active_on / overlaps from the interval index
+        filterset.interval_probe = None
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        used_filters = {name for name, value in filterset.form.cleaned_data.items() if value not in (None, "")}
+        data = {"group_by": groups}
+        results = None
+        if (rollup_enabled() and request.query_params.get("source") != "live"
+                and set(groups) <= ROLLUP_GROUPS and used_filters <= ROLLUP_FILTERS):
+            # None until the rollup has been fully built: counted live meanwhile
+            results = rollup_stats(groups, status=filterset.form.cleaned_data.get("status"),
+                                   medication=filterset.form.cleaned_data.get("medication"))
+        if results is not None:
+            data.update(source="rollup", results=results)
+        elif "patient" in groups:
+            limit, offset = self.get_stats_page(request)
+            # One extra group tells whether another page follows
+            results = live_stats(filterset.qs, groups, limit + 1, offset)
+            data.update(source="live", results=results[:limit],
+                        next_offset=offset + limit if len(results) > limit else None)
+        else:
+            data.update(source="live", results=live_stats(filterset.qs, groups))
+        return Response(data)
+
+    def get_stats_page(self, request):
+        """``(limit, offset)`` d'une page de statistiques groupées par patient."""
+        try:
+            limit = min(int(request.query_params.get("limit", self.stats_limit)), self.stats_max_limit)
+        except ValueError:
+            limit = self.stats_limit
+        try:
+            offset = int(request.query_params.get("offset", 0))
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            raise ValidationError({"offset": ["Expected a non-negative integer."]})
+        return max(limit, 1), offset
+
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def changes(self, request):
+        """Changements après ``since`` (créations, modifications, suppressions) et curseur suivant."""
+        since = request.query_params.get("since")
+        if not since:
+            return Response({"changes": [], "next": head_cursor(), "has_more": False})
+        try:
+            limit = min(int(request.query_params.get("limit", self.changes_limit)), self.changes_max_limit)
+        except ValueError:
+            limit = self.changes_limit
+        try:
+            return Response(read_changes(since, max(limit, 1)))
+        except ValueError:
+            raise ValidationError({"since": ["Invalid cursor."]})
+
+    @action(detail=False, methods=["post"], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """Crée (sans ``id``) ou met à jour (avec ``id``) un tableau JSON / NDJSON de prescriptions."""
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of prescriptions."]})
+        return Response(PrescriptionBulkWriter().write(request.data))
+
+
+class CohortViewSet(InstrumentedViewMixin, viewsets.ViewSet):
+    """Cohortes de patients définies par un arbre de critères ET / OU / NON (voir :mod:`medical.cohort`)."""
+
+    ids_limit = 10000
+    ids_max_limit = 100000
+
+    def evaluate(self, request):
+        criteria = request.data.get("criteria") if isinstance(request.data, dict) else None
+        try:
+            run = CohortRun(build(criteria))
+        except CriteriaError as exc:
+            raise ValidationError(exc.detail)
+        return run, run.evaluate()
+
+    @action(detail=False, methods=["post"])
+    def count(self, request):
+        """Nombre de patients distincts de la cohorte, et durée de chaque critère."""
+        run, patients = self.evaluate(request)
+        return Response({"count": len(patients), "leaves": run.timings, "ms": round(run.total_ms, 3)})
+
+    @action(detail=False, methods=["post"])
+    def ids(self, request):
+        """IDs croissants des patients de la cohorte, par pages de ``limit`` après ``after``."""
+        if not isinstance(request.data, dict):
+            raise ValidationError({"non_field_errors": ["Expected a JSON object."]})
+        try:
+            limit = max(1, min(int(request.data.get("limit", self.ids_limit)), self.ids_max_limit))
+            after = request.data.get("after")
+            after = None if after is None else int(after)
+        except (TypeError, ValueError):
+            raise ValidationError({"non_field_errors": ["limit and after must be integers."]})
+        if after is not None and after < 0:
+            raise ValidationError({"after": ["Must be a non-negative integer."]})
+        run, patients = self.evaluate(request)
+        ids = list(islice(patients.ids(after), limit + 1))
+        return Response({
+            "count": len(patients),
+            "ids": ids[:limit],
+            "next_after": ids[limit - 1] if len(ids) > limit else None,
+            "leaves": run.timings,
+            "ms": round(run.total_ms, 3),
+        })
+
+    @action(detail=False, methods=["get"], url_path="cache/stats", permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request):
+        """Taille, mémoire et taux de succès du cache des feuilles (administrateurs)."""
+        return Response(leaf_cache.stats())
+
+
+class CacheStatsView(APIView):
+    """Compteurs hits / misses du cache de réponses (administrateurs)."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
+
+class CoalescingStatsView(APIView):
+    """Listes calculées et requêtes regroupées (en vol ou dans le délai ``COALESCE_TTL``) ; administrateurs."""
+
+    permission_classes = [permissions.IsAdminUser]
 
+    def get(self, request):
+        return Response(single_flight.stats())
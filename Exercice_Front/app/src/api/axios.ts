@@ -7,3 +7,35 @@ export const api = axios.create({
     },
 });
 
+
+// List endpoints are keyset-paginated: the body is one page and the next page is
+// announced in the `Link: <...?cursor=...>; rel="next"` header.
+const nextCursor = (link?: string): string | null => {
+    const next = link?.split(",").find((part) => part.includes('rel="next"'));
+    const url = next?.match(/<([^>]+)>/)?.[1];
+    return url ? new URL(url).searchParams.get("cursor") : null;
+};
+
+export interface Page<T> {
+    rows: T[];
+    next: string | null; // cursor of the next page, null on the last one
+}
+
+// One page only: callers keep `next` in their state and ask for it when the user wants more rows.
+export const getPage = async <T>(url: string, params?: object, cursor?: string | null): Promise<Page<T>> => {
+    const response = await api.get<T[]>(url, { params: { ...params, ...(cursor ? { cursor } : {}) } });
+    return { rows: response.data, next: nextCursor(response.headers["link"]) };
+};
+
+// Rows by id, one request per 500 ids (`?id=1,2,3`), e.g. the names shown next to a page of prescriptions.
+const MAX_IDS = 500;
+
+export const getById = async <T>(url: string, ids: number[]): Promise<T[]> => {
+    const unique = [...new Set(ids)]; // an empty id list matches nothing server-side: no request at all
+    const chunks: number[][] = [];
+    for (let i = 0; i < unique.length; i += MAX_IDS) chunks.push(unique.slice(i, i + MAX_IDS));
+    const responses = await Promise.all(chunks.map((chunk) =>
+        api.get<T[]>(url, { params: { id: chunk.join(","), page_size: chunk.length } })
+    ));
+    return responses.flatMap((response) => response.data);
+};
@@ -1,7 +1,11 @@
-import { api } from "./axios";
+import { getById, getPage } from "./axios";
+import type { Page } from "./axios";
 import type {Medication} from "../types/Medication";
 
-export const getMedications = async (): Promise<Medication[]> => {
-    const response = await api.get("/Medication");
-    return response.data;
+export const getMedications = async (cursor: string | null = null): Promise<Page<Medication>> => {
+    return getPage<Medication>("/Medication", {}, cursor);
+};
+
+export const getMedicationsById = async (ids: number[]): Promise<Medication[]> => {
+    return getById<Medication>("/Medication", ids);
 };
@@ -1,7 +1,11 @@
-import { api } from "./axios";
+import { getById, getPage } from "./axios";
+import type { Page } from "./axios";
 import type {Patient} from "../types/Patient";
 
-export const getPatients = async (): Promise<Patient[]> => {
-    const response = await api.get("/Patient");
-    return response.data;
+export const getPatients = async (cursor: string | null = null): Promise<Page<Patient>> => {
+    return getPage<Patient>("/Patient", {}, cursor);
+};
+
+export const getPatientsById = async (ids: number[]): Promise<Patient[]> => {
+    return getById<Patient>("/Patient", ids);
 };
@@ -1,4 +1,5 @@
-import { api } from "./axios";
+import { api, getPage } from "./axios";
+import type { Page } from "./axios";
 import type {Prescription} from "../types/Prescription";
 
 
@@ -14,9 +15,11 @@ interface FilterParams {
     end_date__lte?: string;
 }
 
-export const getPrescriptions = async (filters?: FilterParams): Promise<Prescription[]> => {
-    const response = await api.get("/Prescription", { params: filters });
-    return response.data;
+export const getPrescriptions = async (
+    filters?: FilterParams,
+    cursor: string | null = null
+): Promise<Page<Prescription>> => {
+    return getPage<Prescription>("/Prescription", filters, cursor);
 };
 
 export const createPrescription = async (data: {
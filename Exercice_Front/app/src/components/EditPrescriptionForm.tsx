@@ -1,9 +1,9 @@
 import { useEffect, useState } from "react";
-import type {Patient} from "../types/Patient";
-import type {Medication} from "../types/Medication";
 import type {Prescription} from "../types/Prescription";
-import { getPatients } from "../api/patients";
-import { getMedications } from "../api/medications";
+import { getPatients, getPatientsById } from "../api/patients";
+import { getMedications, getMedicationsById } from "../api/medications";
+import { mergeById, usePagedList } from "../hooks/usePagedList";
+import LoadMoreButton from "./LoadMoreButton";
 import { updatePrescription } from "../api/prescriptions";
 import * as React from "react";
 
@@ -13,8 +13,11 @@ interface Props {
 }
 
 export default function EditPrescriptionForm({ prescription, onSuccess }: Props) {
-    const [patients, setPatients] = useState<Patient[]>([]);
-    const [medications, setMedications] = useState<Medication[]>([]);
+    // First page of each list, the next ones on demand
+    const patientOptions = usePagedList(getPatients);
+    const medicationOptions = usePagedList(getMedications);
+    const {reload: reloadPatients, setRows: setPatients} = patientOptions;
+    const {reload: reloadMedications, setRows: setMedications} = medicationOptions;
 
     const [patientId, setPatientId] = useState(prescription.patient);
     const [medicationId, setMedicationId] = useState(prescription.medication);
@@ -26,19 +29,22 @@ export default function EditPrescriptionForm({ prescription, onSuccess }: Props)
     useEffect(() => {
         const loadData = async () => {
             try {
-                const [patData, medData] = await Promise.all([
-                    getPatients(),
-                    getMedications(),
+                const [, , patData, medData] = await Promise.all([
+                    reloadPatients(),
+                    reloadMedications(),
+                    // The current choices may be on a page not loaded yet
+                    getPatientsById([prescription.patient]),
+                    getMedicationsById([prescription.medication]),
                 ]);
-                setPatients(patData);
-                setMedications(medData);
+                setPatients((prev) => mergeById(prev, patData));
+                setMedications((prev) => mergeById(prev, medData));
             } catch (error) {
                 console.error("Error loading patients or medications:", error);
             }
         };
 
         loadData();
-    }, []);
+    }, [prescription.patient, prescription.medication, reloadPatients, reloadMedications, setPatients, setMedications]);
 
     const handleSubmit = async (e: React.SubmitEvent) => {
         e.preventDefault();
@@ -73,12 +79,15 @@ export default function EditPrescriptionForm({ prescription, onSuccess }: Props)
                     required
                 >
                     <option value="">Select patient</option>
-                    {patients.map((p) => (
+                    {patientOptions.rows.map((p) => (
                         <option key={p.id} value={p.id}>
                             {p.last_name} {p.first_name}
                         </option>
                     ))}
                 </select>
+                {patientOptions.hasMore && (
+                    <LoadMoreButton onClick={patientOptions.loadMore} label="Plus de patients"/>
+                )}
 
                 {/* Medication */}
                 <select
@@ -88,7 +97,7 @@ export default function EditPrescriptionForm({ prescription, onSuccess }: Props)
                     required
                 >
                     <option value="">Select medication</option>
-                    {medications
+                    {medicationOptions.rows
                         .filter((m) => m.status === "actif")
                         .map((m) => (
                             <option key={m.id} value={m.id}>
@@ -96,6 +105,9 @@ export default function EditPrescriptionForm({ prescription, onSuccess }: Props)
                             </option>
                         ))}
                 </select>
+                {medicationOptions.hasMore && (
+                    <LoadMoreButton onClick={medicationOptions.loadMore} label="Plus de médicaments"/>
+                )}
 
                 {/* Start Date */}
                 <input
@@ -0,0 +1,18 @@
+interface Props {
+    onClick: () => void;
+    loading?: boolean;
+    label?: string;
+}
+
+export default function LoadMoreButton({onClick, loading = false, label = "Charger plus"}: Props) {
+    return (
+        <button
+            type="button"
+            onClick={onClick}
+            disabled={loading}
+            className="text-sm text-blue-600 hover:underline disabled:opacity-50"
+        >
+            {loading ? "Chargement..." : label}
+        </button>
+    );
+}
@@ -1,9 +1,14 @@
 import type {Patient} from "../types/Patient";
 import type {Medication} from "../types/Medication";
+import LoadMoreButton from "./LoadMoreButton";
 
 interface Props {
     patients: Patient[];
     medications: Medication[];
+    hasMorePatients: boolean;
+    onMorePatients: () => void;
+    hasMoreMedications: boolean;
+    onMoreMedications: () => void;
     filterPatient: string | "";
     setFilterPatient: (id: string | "") => void;
     filterMedication: string | "";
@@ -24,6 +29,10 @@ interface Props {
 export default function PrescriptionFilters({
                                                 patients,
                                                 medications,
+                                                hasMorePatients,
+                                                onMorePatients,
+                                                hasMoreMedications,
+                                                onMoreMedications,
                                                 filterPatient,
                                                 setFilterPatient,
                                                 filterMedication,
@@ -57,6 +66,7 @@ export default function PrescriptionFilters({
                         </option>
                     ))}
                 </select>
+                {hasMorePatients && <LoadMoreButton onClick={onMorePatients} label="Plus de patients"/>}
             </div>
 
             {/* Medication Filter */}
@@ -74,6 +84,7 @@ export default function PrescriptionFilters({
                         </option>
                     ))}
                 </select>
+                {hasMoreMedications && <LoadMoreButton onClick={onMoreMedications} label="Plus de médicaments"/>}
             </div>
 
             {/* Status Filter */}
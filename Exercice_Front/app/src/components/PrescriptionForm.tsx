@@ -1,9 +1,9 @@
 import { useEffect, useState } from "react";
-import type {Patient} from "../types/Patient";
-import type {Medication} from "../types/Medication";
 import { createPrescription } from "../api/prescriptions";
 import { getPatients } from "../api/patients";
 import { getMedications } from "../api/medications";
+import { usePagedList } from "../hooks/usePagedList";
+import LoadMoreButton from "./LoadMoreButton";
 import * as React from "react";
 
 interface Props {
@@ -12,8 +12,11 @@ interface Props {
 
 
 export default function PrescriptionForm({ onSuccess }: Props) {
-    const [patients, setPatients] = useState<Patient[]>([]);
-    const [medications, setMedications] = useState<Medication[]>([]);
+    // First page of each list, the next ones on demand
+    const patientOptions = usePagedList(getPatients);
+    const medicationOptions = usePagedList(getMedications);
+    const {reload: reloadPatients} = patientOptions;
+    const {reload: reloadMedications} = medicationOptions;
 
     const [patientId, setPatientId] = useState("");
     const [medicationId, setMedicationId] = useState("");
@@ -25,17 +28,14 @@ export default function PrescriptionForm({ onSuccess }: Props) {
 
     useEffect(() => {
         const loadData = async () => {
-            const [patData, medData] = await Promise.all([
-                getPatients(),
-                getMedications(),
+            await Promise.all([
+                reloadPatients(),
+                reloadMedications(),
             ]);
-
-            setPatients(patData);
-            setMedications(medData);
         };
 
         loadData();
-    }, []);
+    }, [reloadPatients, reloadMedications]);
 
 
     const handleSubmit = async (e: React.SubmitEvent) => {
@@ -73,12 +73,15 @@ export default function PrescriptionForm({ onSuccess }: Props) {
                     required
                 >
                     <option value="">Patient (obligatoire)</option>
-                    {patients.map(p => (
+                    {patientOptions.rows.map(p => (
                         <option key={p.id} value={p.id}>
                             {p.last_name} {p.first_name}
                         </option>
                     ))}
                 </select>
+                {patientOptions.hasMore && (
+                    <LoadMoreButton onClick={patientOptions.loadMore} label="Plus de patients"/>
+                )}
 
                 {/* Medication */}
                 <select
@@ -88,7 +91,7 @@ export default function PrescriptionForm({ onSuccess }: Props) {
                     required
                 >
                     <option value="">Médicament (obligatoire)</option>
-                    {medications
+                    {medicationOptions.rows
                         .filter(m => m.status === "actif")
                         .map(m => (
                             <option key={m.id} value={m.id}>
@@ -96,6 +99,9 @@ export default function PrescriptionForm({ onSuccess }: Props) {
                             </option>
                         ))}
                 </select>
+                {medicationOptions.hasMore && (
+                    <LoadMoreButton onClick={medicationOptions.loadMore} label="Plus de médicaments"/>
+                )}
 
                 <input
                     type="date"
@@ -0,0 +1,33 @@
+import {useCallback, useState} from "react";
+import type {Page} from "../api/axios";
+
+// Appends the rows not already present (a row may have been added by id before its page is loaded).
+export const mergeById = <T extends { id: number }>(rows: T[], more: T[]): T[] => {
+    const known = new Set(rows.map((row) => row.id));
+    return [...rows, ...more.filter((row) => !known.has(row.id))];
+};
+
+// Rows loaded so far and the cursor of the next page, kept in the component state: a page is only
+// fetched by reload() (first page) or loadMore() (the next one), never the whole list up front.
+export function usePagedList<T extends { id: number }>(fetchPage: (cursor: string | null) => Promise<Page<T>>) {
+    const [rows, setRows] = useState<T[]>([]);
+    const [next, setNext] = useState<string | null>(null);
+    const [loading, setLoading] = useState(false);
+
+    const load = useCallback(async (cursor: string | null): Promise<T[]> => {
+        setLoading(true);
+        try {
+            const page = await fetchPage(cursor);
+            setRows((prev) => (cursor ? mergeById(prev, page.rows) : page.rows));
+            setNext(page.next);
+            return page.rows;
+        } finally {
+            setLoading(false);
+        }
+    }, [fetchPage]);
+
+    const reload = useCallback(() => load(null), [load]);
+    const loadMore = useCallback(async () => (next ? load(next) : []), [load, next]);
+
+    return {rows, setRows, hasMore: next !== null, loading, reload, loadMore};
+}
@@ -1,13 +1,15 @@
-import {useCallback, useEffect, useState} from "react";
+import {useCallback, useEffect, useMemo, useState} from "react";
 import type {Prescription} from "../types/Prescription";
 import type {Patient} from "../types/Patient";
 import type {Medication} from "../types/Medication";
 import type {PrescriptionFiltersType} from "../types/PrescriptionFilters.ts";
 import PrescriptionTable from "../components/PrescriptionTable";
+import LoadMoreButton from "../components/LoadMoreButton";
+import {mergeById, usePagedList} from "../hooks/usePagedList";
 
 import {deletePrescription, getPrescriptions} from "../api/prescriptions";
-import {getPatients} from "../api/patients";
-import {getMedications} from "../api/medications";
+import {getPatients, getPatientsById} from "../api/patients";
+import {getMedications, getMedicationsById} from "../api/medications";
 import PrescriptionFilters from "../components/PrescriptionFilters.tsx";
 
 interface Props {
@@ -16,7 +18,12 @@ interface Props {
 
 
 export default function PrescriptionsPage({onEdit}: Props) {
-    const [prescriptions, setPrescriptions] = useState<Prescription[]>([]);
+    // Choices of the filter selects, one page at a time
+    const patientOptions = usePagedList(getPatients);
+    const medicationOptions = usePagedList(getMedications);
+    const {reload: reloadPatients} = patientOptions;
+    const {reload: reloadMedications} = medicationOptions;
+    // Names shown in the table: only those referenced by the prescriptions loaded so far
     const [patients, setPatients] = useState<Patient[]>([]);
     const [medications, setMedications] = useState<Medication[]>([]);
     const [loading, setLoading] = useState(true);
@@ -31,26 +38,16 @@ export default function PrescriptionsPage({onEdit}: Props) {
     const [filterEndFrom, setFilterEndFrom] = useState<string | "">("");
     const [filterEndTo, setFilterEndTo] = useState<string | "">("");
 
-    // Load prescriptions with filters
-    const loadPrescriptions = useCallback(async () => {
-        setLoading(true);
-        try {
-            const filters: PrescriptionFiltersType = {};
-            if (filterPatient) filters.patient = filterPatient;
-            if (filterMedication) filters.medication = filterMedication;
-            if (filterStatus) filters.status = filterStatus;
-            if (filterStartFrom) filters.start_date__gte = filterStartFrom;
-            if (filterStartTo) filters.start_date__lte = filterStartTo;
-            if (filterEndFrom) filters.end_date__gte = filterEndFrom;
-            if (filterEndTo) filters.end_date__lte = filterEndTo;
-
-            const presData = await getPrescriptions(filters);
-            setPrescriptions(presData);
-        } catch (error) {
-            console.error("Error fetching prescriptions", error);
-        } finally {
-            setLoading(false);
-        }
+    const filters = useMemo(() => {
+        const filters: PrescriptionFiltersType = {};
+        if (filterPatient) filters.patient = filterPatient;
+        if (filterMedication) filters.medication = filterMedication;
+        if (filterStatus) filters.status = filterStatus;
+        if (filterStartFrom) filters.start_date__gte = filterStartFrom;
+        if (filterStartTo) filters.start_date__lte = filterStartTo;
+        if (filterEndFrom) filters.end_date__gte = filterEndFrom;
+        if (filterEndTo) filters.end_date__lte = filterEndTo;
+        return filters;
     }, [
         filterPatient,
         filterMedication,
@@ -61,23 +58,52 @@ export default function PrescriptionsPage({onEdit}: Props) {
         filterEndTo,
     ]);
 
+    const fetchPrescriptions = useCallback(
+        (cursor: string | null) => getPrescriptions(filters, cursor),
+        [filters]
+    );
+    const prescriptionList = usePagedList(fetchPrescriptions);
+    const {reload: reloadPrescriptions, loadMore: loadMorePrescriptions} = prescriptionList;
+
+    // One request per resource for the names of a page of prescriptions
+    const loadNames = useCallback(async (rows: Prescription[]) => {
+        const [patData, medData] = await Promise.all([
+            getPatientsById(rows.map((p) => p.patient)),
+            getMedicationsById(rows.map((p) => p.medication)),
+        ]);
+        setPatients((prev) => mergeById(prev, patData));
+        setMedications((prev) => mergeById(prev, medData));
+    }, []);
+
+    // Load the first page of prescriptions with filters
+    const loadPrescriptions = useCallback(async () => {
+        setLoading(true);
+        try {
+            await loadNames(await reloadPrescriptions());
+        } catch (error) {
+            console.error("Error fetching prescriptions", error);
+        } finally {
+            setLoading(false);
+        }
+    }, [reloadPrescriptions, loadNames]);
+
+    const handleLoadMore = async () => {
+        try {
+            await loadNames(await loadMorePrescriptions());
+        } catch (error) {
+            console.error("Error fetching prescriptions", error);
+        }
+    };
+
 
     useEffect(() => {
-        const fetchAll = async () => {
-            try {
-                const [patData, medData] = await Promise.all([getPatients(), getMedications()]);
-                setPatients(patData);
-                setMedications(medData);
-
-                await loadPrescriptions(); // load prescriptions after patients/medications
-            } catch (error) {
-                console.error("Error loading data", error);
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        fetchAll();
+        Promise.all([reloadPatients(), reloadMedications()]).catch((error) => {
+            console.error("Error loading data", error);
+        });
+    }, [reloadPatients, reloadMedications]);
+
+    useEffect(() => {
+        loadPrescriptions();
     }, [loadPrescriptions]);
 
 
@@ -86,7 +112,7 @@ export default function PrescriptionsPage({onEdit}: Props) {
         try {
             await deletePrescription(prescription.id); // call your API
             // Remove from state to update table
-            setPrescriptions((prev) =>
+            prescriptionList.setRows((prev) =>
                 prev.filter((p) => p.id !== prescription.id)
             );
         } catch (error) {
@@ -109,8 +135,12 @@ export default function PrescriptionsPage({onEdit}: Props) {
         <div className="p-2">
             <h2 className="text-2xl font-bold mb-4 p-2">Liste des prescriptions existantes</h2>
             <PrescriptionFilters
-                patients={patients}
-                medications={medications}
+                patients={patientOptions.rows}
+                medications={medicationOptions.rows}
+                hasMorePatients={patientOptions.hasMore}
+                onMorePatients={patientOptions.loadMore}
+                hasMoreMedications={medicationOptions.hasMore}
+                onMoreMedications={medicationOptions.loadMore}
                 filterPatient={filterPatient}
                 setFilterPatient={setFilterPatient}
                 filterMedication={filterMedication}
@@ -128,12 +158,21 @@ export default function PrescriptionsPage({onEdit}: Props) {
                 onApplyFilters={loadPrescriptions}
             />
             <PrescriptionTable
-                prescriptions={prescriptions}
+                prescriptions={prescriptionList.rows}
                 patients={patients}
                 medications={medications}
                 onEdit={onEdit}
                 onDelete={handleDeletePrescription}
             />
+            {prescriptionList.hasMore && (
+                <div className="p-4 text-center">
+                    <LoadMoreButton
+                        onClick={handleLoadMore}
+                        loading={prescriptionList.loading}
+                        label="Afficher plus de prescriptions"
+                    />
+                </div>
+            )}
         </div>
     );
 }